@@ -0,0 +1,122 @@
+"""ComTime 여러 컴퓨터 집계 벤치마크.
+
+가상의 실습실 DB 파일을 만들어 fleet.aggregate(파일마다 SQL 두 번, 프로세스 풀)와
+파일마다 날짜별로 Database.get_total_seconds_for_date를 부르는 기존 방식을 비교하고,
+두 결과(날짜별 총 사용 시간, 날짜별 카테고리 합계)가 같은지 확인한다.
+
+    python bench_fleet.py
+    python bench_fleet.py --machines 300 --days 120 --baseline 10
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+_APPS = ("Chrome", "Minecraft", "Word", "KakaoTalk", "YouTube", "Roblox", "EXCEL", "Discord")
+
+
+def _make_db(path, days, end, seed):
+    """하루 세 번 사용, 밤 세션은 자정을 넘기고, 가끔 다른 컴퓨터에서 병합한 겹치는 세션."""
+    from db import Database
+    db = Database(path)
+    categorize = db.categorize
+    conn = db.conn
+    sessions, apps = [], []
+    sid = 0
+    for i in range(days):
+        day = datetime.combine(end - timedelta(days=i), datetime.min.time())
+        for h, minutes in ((9, 50), (14, 95), (23, 80)):
+            s = day + timedelta(hours=h, minutes=(seed + i) % 40, seconds=seed % 7)
+            e = s + timedelta(minutes=minutes)
+            sid += 1
+            sessions.append((sid, s.isoformat(), e.isoformat(), int((e - s).total_seconds()), None))
+            for k in range(3):
+                app = _APPS[(seed + i + h + k) % len(_APPS)]
+                apps.append((sid, app, s.isoformat(), 300 * (k + 1), categorize(app)))
+            if (seed + i) % 5 == 0 and h == 14:
+                sid += 1
+                o_s, o_e = s + timedelta(minutes=30), e + timedelta(minutes=20)
+                sessions.append((sid, o_s.isoformat(), o_e.isoformat(),
+                                 int((o_e - o_s).total_seconds()), f"other:{sid}"))
+                apps.append((sid, "Steam", o_s.isoformat(), 900, categorize("Steam")))
+    conn.executemany(
+        "INSERT INTO sessions (id, start_ts, end_ts, duration_seconds, origin_id) VALUES (?,?,?,?,?)", sessions
+    )
+    conn.executemany(
+        "INSERT INTO app_usage (session_id, app_name, started_at, duration_seconds, category) VALUES (?,?,?,?,?)",
+        apps,
+    )
+    conn.commit()
+    conn.close()
+
+
+def _baseline(path, start, end):
+    """기존 방식: 파일을 열고 날짜마다 get_total_seconds_for_date."""
+    from db import Database
+    db = Database(path, readonly=True)
+    totals = {}
+    d = start
+    while d <= end:
+        secs = db.get_total_seconds_for_date(d)
+        if secs:
+            totals[d.isoformat()] = secs
+        d += timedelta(days=1)
+    categories = {(c["date"], c["category"]): c["total_seconds"] for c in db.get_category_daily_totals(start, end)}
+    db.conn.close()
+    return totals, categories
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--machines", type=int, default=300, help="컴퓨터(DB 파일) 수")
+    parser.add_argument("--days", type=int, default=120, help="집계 기간 일 수 (한 학기)")
+    parser.add_argument("--history", type=int, default=365, help="파일마다 쌓인 기록 일 수")
+    parser.add_argument("--baseline", type=int, default=5, help="기존 방식으로 잴 파일 수 (전체는 추정)")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    from fleet import aggregate, find_databases
+
+    end = date.today() - timedelta(days=1)
+    start = end - timedelta(days=args.days - 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        for m in range(args.machines):
+            _make_db(os.path.join(tmp, f"lab-{m:03d}.db"), max(args.history, args.days), end, m)
+        paths = find_databases(tmp)
+
+        t0 = time.perf_counter()
+        daily, apps, errors = aggregate(paths, start, end, args.workers, root=tmp)
+        fleet_s = time.perf_counter() - t0
+
+        sample = paths[: args.baseline]
+        t0 = time.perf_counter()
+        expected = {p: _baseline(p, start, end) for p in sample}
+        base_s = (time.perf_counter() - t0) / max(1, len(sample)) * len(paths)
+
+        mismatches = 0
+        for p in sample:
+            machine = os.path.splitext(os.path.relpath(p, tmp))[0]
+            got_days = {r[3]: r[4] for r in daily if r[0] == machine}
+            got_categories = {}
+            for r in apps:
+                if r[0] == machine:
+                    key = (r[3], r[5])
+                    got_categories[key] = got_categories.get(key, 0) + r[6]
+            exp_days, exp_categories = expected[p]
+            mismatches += sum(1 for d, secs in exp_days.items() if abs(got_days.get(d, 0) - secs) > 1)
+            mismatches += got_categories != exp_categories
+
+    print(f"컴퓨터 {args.machines}대 × {args.days}일, 프로세스 {args.workers or os.cpu_count()}개")
+    print(f"fleet 집계: {fleet_s:.2f}초 (daily {len(daily)}행, apps {len(apps)}행, 오류 {len(errors)})")
+    print(f"기존 방식(날짜마다 조회): {base_s:.1f}초 추정 ({len(sample)}개 파일 측정)")
+    print("OK" if not mismatches and not errors else f"FAIL (불일치 {mismatches})")
+    return 0 if not mismatches and not errors else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
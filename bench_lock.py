@@ -0,0 +1,75 @@
+"""ComTime 잠금 지연 벤치마크.
+
+"사용 중지"를 누른 뒤 잠금 화면이 처음 그려질 때까지의 시간을 잰다.
+미리 만들어 둔 잠금 화면(KioskSurfaces.lock)과, 잠금할 때마다 잠금 창을 새로 만드는
+방식(이전 동작)을 비교한다. 기준은 60Hz 한두 프레임(33ms) 이내.
+
+    QT_QPA_PLATFORM=offscreen python bench_lock.py
+    python bench_lock.py -n 50 --budget-ms 33
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+
+def _wait_painted(app, kiosk, timeout=2.0):
+    deadline = time.perf_counter() + timeout
+    while kiosk._lock_t0 is not None and time.perf_counter() < deadline:
+        app.processEvents()
+    return kiosk.last_lock_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=20, help="반복 횟수")
+    parser.add_argument("--budget-ms", type=float, default=33.0, help="허용 중앙값(ms)")
+    args = parser.parse_args()
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    from PyQt6.QtCore import qInstallMessageHandler
+    from PyQt6.QtWidgets import QApplication
+    from main import KioskSurfaces
+
+    app = QApplication.instance() or QApplication([])
+    app.setQuitOnLastWindowClosed(False)
+    qInstallMessageHandler(lambda *_args: None)
+
+    # 미리 만들어 둔 잠금 화면: lock()은 표시만
+    kiosk = KioskSurfaces()
+    warm = []
+    for _ in range(args.n):
+        kiosk.lock()
+        warm.append(_wait_painted(app, kiosk))
+        kiosk.unlock()
+        app.processEvents()
+    kiosk.dispose()
+
+    # 이전 동작: 잠금할 때마다 잠금 창을 새로 만들고 표시
+    cold = []
+    for _ in range(args.n):
+        t0 = time.perf_counter()
+        k = KioskSurfaces()
+        k.lock()
+        k._lock_t0 = t0
+        cold.append(_wait_painted(app, k))
+        k.dispose()
+        app.processEvents()
+
+    screens = len(app.screens())
+    warm_ms = statistics.median(m for m in warm if m is not None)
+    cold_ms = statistics.median(m for m in cold if m is not None)
+    print(f"화면 {screens}개, {args.n}회")
+    print(f"미리 만든 잠금 화면: median {warm_ms:.1f} ms, max {max(warm):.1f} ms")
+    print(f"매번 새로 만들기:   median {cold_ms:.1f} ms, max {max(cold):.1f} ms")
+    ok = warm_ms <= args.budget_ms
+    print("OK" if ok else f"FAIL (budget {args.budget_ms:.0f} ms)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""ComTime 메모리 벤치마크: 창 모드와 트레이 모드의 RSS, 트레이 모드의 DB 조회 횟수.
+
+MainWindow를 띄워 창 모드 RSS를 재고, 창을 트레이로 보내 (숨기고 메인 위젯 해제)
+트레이 모드 RSS를 잰다. 열기/닫기를 여러 번 반복해 메모리가 계속 늘지 않는지 확인하고,
+트레이 모드에서 1초 타이머를 60번 돌리는 동안 실행된 SELECT 수를 센다
+(툴팁의 오늘 사용 시간은 변경 피드 세대가 바뀔 때만 다시 조회).
+
+숨긴 창의 네이티브 윈도우와 백킹 스토어까지 재려면 실제 플랫폼(Windows, xcb)에서
+실행해야 한다. 리눅스에서 디스플레이가 없을 때만 오프스크린으로 대신한다.
+
+    python bench_memory.py
+    QT_QPA_PLATFORM=xcb python bench_memory.py --cycles 10 --sessions 300
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+
+def _make_db(path, sessions, apps):
+    """오늘 날짜에 세션/앱 기록이 많은 DB (표가 채워진 상태의 창 모드를 재기 위해)."""
+    from db import Database
+    db = Database(path)
+    db.set_pin("0000")
+    start = datetime.combine(datetime.now().date(), datetime.min.time())
+    step = max(1, int((datetime.now() - start).total_seconds()) // (sessions + 1))
+    for i in range(sessions):
+        s = start + timedelta(seconds=i * step)
+        sid = db.start_session(s.isoformat())
+        db.record_app_usage(sid, f"app-{i % apps:03d}", 5)
+        db.end_session(sid, (s + timedelta(seconds=step // 2)).isoformat())
+    db.conn.close()
+
+
+def _settle(app):
+    from PyQt6.QtCore import QCoreApplication, QEvent
+    for _ in range(3):
+        app.processEvents()
+        QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+    gc.collect()
+
+
+def _mb(n):
+    return f"{n / 1048576:.1f} MB" if n is not None else "알 수 없음"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=5, help="창 열기/트레이 반복 횟수")
+    parser.add_argument("--sessions", type=int, default=200, help="오늘 세션 수")
+    parser.add_argument("--apps", type=int, default=50, help="서로 다른 프로그램 수")
+    args = parser.parse_args()
+    if (sys.platform.startswith("linux") and not os.environ.get("DISPLAY")
+            and not os.environ.get("WAYLAND_DISPLAY")):
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    from PyQt6.QtCore import qInstallMessageHandler
+    from PyQt6.QtWidgets import QApplication
+    import ipc
+    import main as comtime
+    from memstat import rss_bytes
+
+    app = QApplication.instance() or QApplication([])
+    app.setQuitOnLastWindowClosed(False)
+    qInstallMessageHandler(lambda *_args: None)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "comtime.db")
+        _make_db(db_path, args.sessions, args.apps)
+        comtime._DB_PATH = db_path
+        sock = os.path.join(tmp, "comtime-bench.sock")
+        ipc.server_name = lambda *args: sock
+
+        _settle(app)
+        base = rss_bytes()
+        win = comtime.MainWindow()
+        win.resize(600, 550)
+        win.show()
+        _settle(app)
+        window_rss = [rss_bytes()]
+        win._enter_tray()
+        _settle(app)
+        tray_rss = [rss_bytes()]
+        for _ in range(args.cycles - 1):
+            win.raise_window()
+            _settle(app)
+            window_rss.append(rss_bytes())
+            win._enter_tray()
+            _settle(app)
+            tray_rss.append(rss_bytes())
+
+        if win._tray is None:
+            # 오프스크린에는 시스템 트레이가 없으므로 툴팁만 받는 보이지 않는 아이콘
+            from PyQt6.QtWidgets import QSystemTrayIcon
+            win._tray = QSystemTrayIcon(win)
+        selects = []
+        win.db.conn.set_trace_callback(
+            lambda sql: selects.append(sql) if sql.lstrip().upper().startswith("SELECT") else None
+        )
+        for _ in range(60):
+            win.update_timer()
+        win.db.conn.set_trace_callback(None)
+
+        for t in (win.timer, win._app_timer, win._heartbeat_timer, win._title_flush_timer,
+                  win._os_user_timer):
+            t.stop()
+        win._control_server.close()
+        win.db.conn.close()
+
+    print(f"플랫폼: {app.platformName()}")
+    print(f"QApplication만: {_mb(base)}")
+    print(f"창 모드:   {_mb(window_rss[0])} (첫 회), {_mb(window_rss[-1])} ({args.cycles}회째)")
+    print(f"트레이 모드: {_mb(tray_rss[0])} (첫 회), {_mb(tray_rss[-1])} ({args.cycles}회째)")
+    if None not in (window_rss[-1], tray_rss[-1]):
+        print(f"차이: {_mb(window_rss[-1] - tray_rss[-1])}")
+    print(f"트레이 모드 1분(타이머 60회) 동안 SELECT: {len(selects)}회")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""ComTime 주간/월간 요약 벤치마크.
+
+몇 년치 기록이 쌓인 DB에서 기간마다 범위 조회 두 번(get_daily_totals, get_app_usage_for_range)으로
+요약을 채우는 방식과 날짜마다 get_total_seconds_for_date/get_app_usage_for_date를 부르는 방식을
+비교하고 결과가 같은지 확인한다. PyQt6가 있으면 요약 창에서 기간을 바꿔 가며 조회+그리기 시간도 잰다.
+
+    python bench_overview.py
+    python bench_overview.py --years 5 --budget-ms 30
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+_APPS = ("Chrome", "Minecraft", "Word", "KakaoTalk", "YouTube", "Roblox", "EXCEL", "Discord")
+
+
+def _make_db(path, days, end):
+    """하루 네 번 사용 (밤 세션은 자정을 넘김), 세션마다 프로그램 세 개."""
+    from db import Database
+    db = Database(path)
+    categorize = db.categorize
+    sessions, apps = [], []
+    sid = 0
+    for i in range(days):
+        day = datetime.combine(end - timedelta(days=i), datetime.min.time())
+        for h, minutes in ((8, 40), (13, 70), (17, 90), (23, 75)):
+            s = day + timedelta(hours=h, minutes=i % 30)
+            e = s + timedelta(minutes=minutes + i % 11)
+            sid += 1
+            sessions.append((sid, s.isoformat(), e.isoformat(), int((e - s).total_seconds())))
+            for k in range(3):
+                app = _APPS[(i + h + k) % len(_APPS)]
+                apps.append((sid, app, s.isoformat(), 300 * (k + 1) + i % 7, categorize(app)))
+    db.conn.executemany("INSERT INTO sessions (id, start_ts, end_ts, duration_seconds) VALUES (?,?,?,?)", sessions)
+    db.conn.executemany(
+        "INSERT INTO app_usage (session_id, app_name, started_at, duration_seconds, category) VALUES (?,?,?,?,?)",
+        apps,
+    )
+    db.conn.commit()
+    return db
+
+
+def _periods(end, count):
+    """end가 속한 달부터 거슬러 올라가는 count개의 달 (시작, 끝)."""
+    from overview import MONTH, shift_period, period_range
+    start, stop = period_range(MONTH, end)
+    result = []
+    for _ in range(count):
+        result.append((start, min(stop, end)))
+        start, stop = shift_period(MONTH, start, -1)
+    return result
+
+
+def _per_day(db, start, end):
+    """기존 방식: 날짜마다 총 사용 시간과 프로그램별 사용 시간을 따로 조회."""
+    totals, apps = {}, {}
+    d = start
+    while d <= end:
+        totals[d.isoformat()] = db.get_total_seconds_for_date(d)
+        for u in db.get_app_usage_for_date(d):
+            apps[u["app_name"]] = apps.get(u["app_name"], 0) + (u["total_seconds"] or 0)
+        d += timedelta(days=1)
+    return totals, apps
+
+
+def _ranged(db, start, end):
+    totals = {r["date"]: r["total_seconds"] for r in db.get_daily_totals(start, end)}
+    apps = {u["app_name"]: u["total_seconds"] for u in db.get_app_usage_for_range(start, end)}
+    return totals, apps
+
+
+def _median_ms(fn, periods):
+    times = []
+    for start, end in periods:
+        t0 = time.perf_counter()
+        fn(start, end)
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=int, default=3, help="쌓인 기록 연수")
+    parser.add_argument("--months", type=int, default=24, help="최근 몇 달을 오가며 잴지")
+    parser.add_argument("--budget-ms", type=float, default=50, help="기간 전환(조회+그리기) 중앙값 예산")
+    args = parser.parse_args()
+
+    end = date.today() - timedelta(days=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = _make_db(os.path.join(tmp, "comtime.db"), 365 * args.years, end)
+        periods = _periods(end, args.months)
+
+        # 날짜별 합계만 비교: 프로그램별 합계는 자정을 넘는 세션을 날짜마다 세는 기존 방식과 달리
+        # 기간에서 한 번만 센다
+        mismatches = 0
+        for start, stop in periods[:3]:
+            exp_days, _ = _per_day(db, start, stop)
+            got_days, _ = _ranged(db, start, stop)
+            mismatches += sum(1 for d, secs in exp_days.items() if got_days.get(d, 0) != secs)
+        per_day_ms = _median_ms(lambda s, e: _per_day(db, s, e), periods)
+        ranged_ms = _median_ms(lambda s, e: _ranged(db, s, e), periods)
+        print(f"기록 {args.years}년, 최근 {args.months}개월 월간 요약")
+        print(f"날짜마다 조회:      median {per_day_ms:.1f} ms")
+        print(f"범위 조회 두 번:    median {ranged_ms:.1f} ms")
+
+        switch_ms = None
+        try:
+            from PyQt6.QtWidgets import QApplication
+        except ImportError:
+            print("PyQt6 없음: 화면 전환은 건너뜀")
+        else:
+            from overview import MONTH, OverviewDialog
+            app = QApplication.instance() or QApplication(sys.argv)
+            dlg = OverviewDialog(db, end)
+            dlg.kind_combo.setCurrentText(MONTH)
+            dlg.resize(560, 620)
+            times = []
+            for step in [-1] * (args.months - 1) + [1] * (args.months - 1):
+                t0 = time.perf_counter()
+                dlg._shift(step)
+                dlg.grab()  # 화면에 그리는 것과 같은 paintEvent
+                times.append((time.perf_counter() - t0) * 1000)
+            app.processEvents()
+            back, forth = times[: args.months - 1], times[args.months - 1:]
+            switch_ms = statistics.median(times)
+            print(f"요약 창 기간 전환:  처음 median {statistics.median(back):.1f} ms, "
+                  f"다시 볼 때 median {statistics.median(forth):.1f} ms")
+        db.conn.close()
+
+    ok = not mismatches and (switch_ms is None or switch_ms <= args.budget_ms)
+    print("OK" if ok else f"FAIL (불일치 {mismatches}, 예산 {args.budget_ms} ms)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""ComTime 시작 시간 벤치마크.
+
+comtime-cli(src/cli.py)를 새 프로세스로 여러 번 실행해 시작 시간 중앙값을 재고,
+PyQt6 등 무거운 모듈이 import 경로에 섞여 들어오지 않았는지 확인한다.
+
+    python bench_startup.py            # 기본 20회
+    python bench_startup.py -n 50 --budget-ms 100
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CLI = os.path.join(ROOT, "src", "cli.py")
+# cli 경로에 들어오면 안 되는 모듈
+FORBIDDEN = ("PyQt6", "asyncio", "http", "ctypes")
+
+
+def _make_db(path):
+    sys.path.insert(0, os.path.join(ROOT, "src"))
+    from db import Database
+    from datetime import datetime, timedelta
+    db = Database(path)
+    start = datetime.now() - timedelta(hours=1)
+    sid = db.start_session(start.isoformat())
+    db.record_app_usage(sid, "bench", 60)
+    db.end_session(sid, (start + timedelta(minutes=30)).isoformat())
+    db.conn.close()
+
+
+def _imported_modules(db_path):
+    """-X importtime 출력에서 cli 실행 중 import된 최상위 모듈 목록."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", CLI, "today", "--db", db_path],
+        capture_output=True, text=True,
+    )
+    mods = set()
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            mods.add(line.rsplit("|", 1)[1].strip().split(".")[0])
+    return mods
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=20, help="반복 횟수")
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="허용 중앙값(ms)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "comtime.db")
+        _make_db(db_path)
+        cmd = [sys.executable, CLI, "today", "--db", db_path]
+        samples = []
+        for _ in range(args.n):
+            t0 = time.perf_counter()
+            subprocess.run(cmd, stdout=subprocess.DEVNULL, check=True)
+            samples.append((time.perf_counter() - t0) * 1000)
+        baseline = []
+        for _ in range(args.n):
+            t0 = time.perf_counter()
+            subprocess.run([sys.executable, "-c", "pass"], check=True)
+            baseline.append((time.perf_counter() - t0) * 1000)
+        leaked = sorted(m for m in _imported_modules(db_path) if m in FORBIDDEN)
+
+    median = statistics.median(samples)
+    print(f"cli today: median {median:.1f} ms, min {min(samples):.1f} ms ({args.n} runs)")
+    print(f"python -c pass: median {statistics.median(baseline):.1f} ms")
+    if leaked:
+        print(f"금지된 모듈 import: {', '.join(leaked)}")
+    ok = median <= args.budget_ms and not leaked
+    print("OK" if ok else f"FAIL (budget {args.budget_ms:.0f} ms)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,426 @@
+"""오래된 사용 기록의 월별 컬럼 아카이브.
+
+보관 기간(개월)이 지난 달의 sessions/app_usage 행을 SQLite에서 빼내어
+월별 바이너리 파일(<db이름>_archive/YYYY-MM.cta, 기본 외 프로필은 YYYY-MM.<프로필>.cta)에 저장한다.
+파일은 고정 폭 리틀엔디언 컬럼으로 되어 있어 mmap 후 memoryview로 바로 읽고,
+앱 이름 사전만 zlib으로 압축한다. Database는 아카이브된 날짜를 조회할 때
+이 파일들을 자동으로 함께 읽는다.
+
+파일 구조 (각 컬럼은 8바이트 정렬):
+    header   "<4sIII"  magic, 세션 수 n, 앱 기록 수 m, 이름 사전 길이(압축)
+    sid      int64[n]   원래 sessions.id (중복 보관 방지)
+    start    int64[n]   시작 시각 (로컬 시각 기준 epoch 초, start 오름차순)
+    end      int64[n]   종료 시각
+    app_off  uint32[n+1] 세션별 앱 기록 범위 (app_id/dur 인덱스)
+    app_id   uint32[m]  이름 사전 인덱스
+    dur      uint32[m]  사용 시간(초)
+    names    zlib(JSON 리스트)
+"""
+import bisect
+import json
+import mmap
+import os
+import struct
+import zlib
+from datetime import datetime, date, timedelta
+
+from db import DEFAULT_PROFILE
+
+_MAGIC = b"CTA1"
+_HEADER = struct.Struct("<4sIII")
+_EPOCH = datetime(1970, 1, 1)
+_MAX_OPEN = 24  # 동시에 열어둘 월 파일 수
+
+
+def _to_epoch(dt: datetime) -> int:
+    return int((dt - _EPOCH).total_seconds())
+
+
+def _from_epoch(sec: int) -> datetime:
+    return _EPOCH + timedelta(seconds=sec)
+
+
+def _month_key(d) -> str:
+    return f"{d.year:04d}-{d.month:02d}"
+
+
+def _month_start(key: str) -> datetime:
+    return datetime.strptime(key + "-01", "%Y-%m-%d")
+
+
+def _next_month(dt: datetime) -> datetime:
+    return datetime(dt.year + (dt.month == 12), dt.month % 12 + 1, 1)
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def archive_dir_for(db_path: str) -> str:
+    return os.path.splitext(os.path.abspath(db_path))[0] + "_archive"
+
+
+class _MonthFile:
+    """mmap으로 연 월별 아카이브 파일."""
+
+    def __init__(self, path):
+        self._f = open(path, "rb")
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n, m, names_len = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"not a ComTime archive: {path}")
+        view = memoryview(self._mm)
+        self._views = [view]  # close() 전에 모두 release 해야 mmap을 닫을 수 있다
+        off = _align(_HEADER.size)
+
+        def take(count, fmt, size):
+            nonlocal off
+            raw = view[off:off + count * size]
+            col = raw.cast(fmt)
+            self._views += [raw, col]
+            off = _align(off + count * size)
+            return col
+
+        self.sid = take(n, "q", 8)
+        self.start = take(n, "q", 8)
+        self.end = take(n, "q", 8)
+        self.app_off = take(n + 1, "I", 4)
+        self.app_id = take(m, "I", 4)
+        self.dur = take(m, "I", 4)
+        self.names = json.loads(zlib.decompress(bytes(view[off:off + names_len])).decode("utf-8"))
+
+    def overlapping(self, lo: int, hi: int):
+        """[lo, hi) 구간과 겹치는 세션 인덱스."""
+        # start 오름차순이므로 start < hi 인 세션만 보면 된다
+        stop = bisect.bisect_left(self.start, hi)
+        return [i for i in range(stop) if self.end[i] > lo]
+
+    def apps_of(self, i):
+        for k in range(self.app_off[i], self.app_off[i + 1]):
+            yield self.names[self.app_id[k]], self.dur[k]
+
+    def close(self):
+        for v in reversed(self._views):
+            v.release()
+        self._mm.close()
+        self._f.close()
+
+
+class ColumnArchive:
+    """한 프로필의 월별 아카이브 (같은 폴더에 프로필별 파일)."""
+
+    def __init__(self, directory: str, profile_id: str = DEFAULT_PROFILE):
+        self.directory = directory
+        self._suffix = ".cta" if profile_id == DEFAULT_PROFILE else f".{profile_id}.cta"
+        self._open = {}
+        self.refresh()
+
+    def refresh(self):
+        """보관된 월 목록을 다시 읽는다 (조회 때마다 파일 존재를 확인하지 않도록 캐시)."""
+        if os.path.isdir(self.directory):
+            n = len("YYYY-MM") + len(self._suffix)
+            self._available = {
+                f[:7] for f in os.listdir(self.directory) if len(f) == n and f.endswith(self._suffix)
+            }
+        else:
+            self._available = set()
+
+    def months(self):
+        return sorted(self._available)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self._suffix)
+
+    def _month(self, key):
+        mf = self._open.get(key)
+        if mf is None:
+            if key not in self._available:
+                return None
+            if len(self._open) >= _MAX_OPEN:
+                self.close()
+            mf = self._open[key] = _MonthFile(self._path(key))
+        return mf
+
+    def close(self, key=None):
+        keys = [key] if key else list(self._open)
+        for k in keys:
+            mf = self._open.pop(k, None)
+            if mf:
+                mf.close()
+
+    def _files_for(self, range_start: datetime, range_end: datetime):
+        """범위와 겹칠 수 있는 월 파일 (월 경계를 넘는 세션을 위해 전월 포함)."""
+        if not self._available:
+            return
+        m = _month_start(_month_key(range_start))
+        m = datetime(m.year - (m.month == 1), (m.month - 2) % 12 + 1, 1)
+        while m < range_end:
+            mf = self._month(_month_key(m))
+            if mf:
+                yield mf
+            m = _next_month(m)
+
+    # ── 조회 (Database가 사용) ──
+
+    def intervals(self, range_start: datetime, range_end: datetime):
+        """범위와 겹치는 보관된 세션 (start, end) 목록."""
+        lo, hi = _to_epoch(range_start), _to_epoch(range_end)
+        result = []
+        for mf in self._files_for(range_start, range_end):
+            for i in mf.overlapping(lo, hi):
+                result.append((_from_epoch(mf.start[i]), _from_epoch(mf.end[i])))
+        return result
+
+    def sessions(self, range_start: datetime, range_end: datetime):
+        lo, hi = _to_epoch(range_start), _to_epoch(range_end)
+        result = []
+        for mf in self._files_for(range_start, range_end):
+            for i in mf.overlapping(lo, hi):
+                result.append({
+                    "id": None,
+                    "start_ts": _from_epoch(mf.start[i]).isoformat(),
+                    "end_ts": _from_epoch(mf.end[i]).isoformat(),
+                    "duration_seconds": mf.end[i] - mf.start[i],
+                    "origin_id": None,
+                })
+        return result
+
+    def app_totals(self, range_start: datetime, range_end: datetime) -> dict:
+        lo, hi = _to_epoch(range_start), _to_epoch(range_end)
+        totals = {}
+        for mf in self._files_for(range_start, range_end):
+            for i in mf.overlapping(lo, hi):
+                for name, dur in mf.apps_of(i):
+                    totals[name] = totals.get(name, 0) + dur
+        return totals
+
+    # ── 보관 ──
+
+    def write_month(self, key, sessions, apps):
+        """sessions: [(sid, start_dt, end_dt)], apps: [(sid, app_name, dur)]. 기존 파일과 합쳐서 다시 쓴다."""
+        existing = []
+        old = self._month(key)
+        if old:
+            for i in range(len(old.sid)):
+                existing.append((old.sid[i], old.start[i], old.end[i], list(old.apps_of(i))))
+            self.close(key)
+        known = {e[0] for e in existing}
+        by_sid = {}
+        for sid, name, dur in apps:
+            by_sid.setdefault(sid, []).append((name, dur))
+        rows = existing + [
+            (sid, _to_epoch(s), _to_epoch(e), by_sid.get(sid, []))
+            for sid, s, e in sessions if sid not in known
+        ]
+        rows.sort(key=lambda r: r[1])
+
+        names, name_idx = [], {}
+        app_off, app_id, dur = [0], [], []
+        for _, _, _, usage in rows:
+            for name, d in usage:
+                if name not in name_idx:
+                    name_idx[name] = len(names)
+                    names.append(name)
+                app_id.append(name_idx[name])
+                dur.append(max(0, int(d or 0)))
+            app_off.append(len(app_id))
+        names_blob = zlib.compress(json.dumps(names, ensure_ascii=False).encode("utf-8"), 9)
+
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self._path(key) + ".tmp"
+        with open(tmp, "wb") as f:
+            def put(data: bytes):
+                f.write(data)
+                f.write(b"\0" * (_align(len(data)) - len(data)))
+
+            put(_HEADER.pack(_MAGIC, len(rows), len(app_id), len(names_blob)))
+            put(struct.pack(f"<{len(rows)}q", *(r[0] for r in rows)))
+            put(struct.pack(f"<{len(rows)}q", *(r[1] for r in rows)))
+            put(struct.pack(f"<{len(rows)}q", *(r[2] for r in rows)))
+            put(struct.pack(f"<{len(app_off)}I", *app_off))
+            put(struct.pack(f"<{len(app_id)}I", *app_id))
+            put(struct.pack(f"<{len(dur)}I", *dur))
+            f.write(names_blob)
+            f.flush()
+            os.fsync(f.fileno())
+        return tmp
+
+
+def _finish_pending(db):
+    """이전 실행이 커밋한 뒤 파일을 교체하기 전에 중단됐으면 남은 .tmp 파일로 교체를 마친다.
+    커밋 전에 중단된 .tmp는 SQLite 행이 그대로 있으므로 버린다 (다음 write_month가 다시 쓴다)."""
+    directory = archive_dir_for(db.path)
+    pending = db.get_setting("archive_pending")
+    if pending:
+        tmp = os.path.join(directory, pending + ".tmp")
+        if os.path.exists(tmp):
+            if db.archive is not None:
+                db.archive.close()
+            os.replace(tmp, os.path.join(directory, pending))
+        db.set_setting("archive_pending", None)
+    if os.path.isdir(directory):
+        for f in os.listdir(directory):
+            if f.endswith(".cta.tmp"):
+                os.remove(os.path.join(directory, f))
+
+
+def drop_archived_rows(db) -> int:
+    """SQLite와 아카이브에 함께 있는 세션(보관 전에 만든 백업을 복원한 경우)을 SQLite에서 지운다.
+    조회는 두 쪽을 더하므로 두 번 세지 않도록 아카이브 쪽을 남긴다. 보관된 달에서 세션 ID와
+    시작 시각이 모두 같은 행만 지우고, 지운 세션 수를 반환한다."""
+    if not db.path or db.path == ":memory:":
+        return 0
+    directory = archive_dir_for(db.path)
+    if not os.path.isdir(directory):
+        return 0
+    cur = db.conn.cursor()
+    ids, last_month = [], None
+    for profile in db.get_profiles():
+        profile_id = profile["id"]
+        if db.archive is not None and profile_id == db.profile_id:
+            archive = db.archive
+            archive.refresh()
+        else:
+            archive = ColumnArchive(directory, profile_id)
+        try:
+            for key in archive.months():
+                mf = archive._month(key)
+                archived = {(mf.sid[i], mf.start[i]) for i in range(len(mf.sid))}
+                month = _month_start(key)
+                cur.execute(
+                    "SELECT id, start_ts FROM sessions WHERE profile_id = ? AND start_ts >= ? AND start_ts < ?",
+                    (profile_id, month.isoformat(), _next_month(month).isoformat()),
+                )
+                for sid, start_ts in cur.fetchall():
+                    try:
+                        if (sid, _to_epoch(datetime.fromisoformat(start_ts))) in archived:
+                            ids.append(sid)
+                    except (TypeError, ValueError):
+                        continue
+                last_month = max(last_month or key, key)
+        finally:
+            if archive is not db.archive:
+                archive.close()
+    if ids:
+        cur.execute("CREATE TEMP TABLE IF NOT EXISTS archive_ids (id INTEGER PRIMARY KEY)")
+        cur.execute("DELETE FROM archive_ids")
+        cur.executemany("INSERT INTO archive_ids (id) VALUES (?)", [(sid,) for sid in ids])
+        try:
+            cur.execute("DELETE FROM app_usage WHERE session_id IN (SELECT id FROM archive_ids)")
+            cur.execute("DELETE FROM sessions WHERE id IN (SELECT id FROM archive_ids)")
+            db.conn.commit()
+        except Exception:
+            db.conn.rollback()
+            raise
+        db.notify_changed("sessions")
+        db.notify_changed("app_usage")
+    if last_month:
+        # 복원한 설정의 경계가 아카이브보다 이르면 병합이 보관된 달을 다시 가져오지 않도록 올린다
+        cutoff = _next_month(_month_start(last_month)).date().isoformat()
+        prev = db.get_setting("archive_cutoff")
+        if not prev or prev < cutoff:
+            db.set_setting("archive_cutoff", cutoff)
+    return len(ids)
+
+
+def archive_old_months(db, horizon_months: int, today: date = None) -> dict:
+    """보관 기간이 지난 달의 종료된 세션과 앱 기록을 아카이브로 옮긴다 (모든 프로필).
+
+    월별로 임시 파일을 끝까지 쓴 뒤, 그 파일에 담은 행만 SQLite에서 지우고 "교체할 파일"
+    표시(archive_pending)와 함께 커밋하고, 그다음 파일을 교체한다. 커밋 전에 중단되면 SQLite가
+    그대로이고, 커밋 뒤 교체 전에 중단되면 다음 실행의 _finish_pending이 교체를 마친다.
+    어느 쪽이든 같은 세션이 SQLite와 아카이브에 함께 있지 않다. 시각을 읽을 수 없는 행은
+    보관하지 않고 SQLite에 남긴다.
+    """
+    if horizon_months <= 0 or not db.path or db.path == ":memory:":
+        return {"months": [], "sessions": 0}
+    _finish_pending(db)
+    if db.archive is None:
+        db.archive = ColumnArchive(archive_dir_for(db.path), db.profile_id)
+    else:
+        db.archive.refresh()
+    today = today or date.today()
+    cutoff = datetime(today.year, today.month, 1)
+    for _ in range(horizon_months):
+        cutoff = datetime(cutoff.year - (cutoff.month == 1), (cutoff.month - 2) % 12 + 1, 1)
+    cur = db.conn.cursor()
+    cur.execute(
+        "SELECT profile_id, MIN(start_ts) FROM sessions "
+        "WHERE start_ts < ? AND end_ts IS NOT NULL GROUP BY profile_id",
+        (cutoff.isoformat(),),
+    )
+    archived_months, moved = [], 0
+    for profile_id, first in cur.fetchall():
+        if profile_id == db.profile_id:
+            archive = db.archive
+        else:
+            archive = ColumnArchive(archive_dir_for(db.path), profile_id)
+        month = _month_start(first[:7])
+        while month < cutoff:
+            nxt = _next_month(month)
+            cur.execute(
+                "SELECT id, start_ts, end_ts FROM sessions "
+                "WHERE profile_id = ? AND start_ts >= ? AND start_ts < ? AND end_ts IS NOT NULL",
+                (profile_id, month.isoformat(), nxt.isoformat()),
+            )
+            sessions = []
+            for r in cur.fetchall():
+                try:
+                    sessions.append((r[0], datetime.fromisoformat(r[1]), datetime.fromisoformat(r[2])))
+                except Exception:
+                    continue  # 보관하지 않고 SQLite에 남긴다
+            if sessions:
+                cur.execute("CREATE TEMP TABLE IF NOT EXISTS archive_ids (id INTEGER PRIMARY KEY)")
+                cur.execute("DELETE FROM archive_ids")
+                cur.executemany("INSERT INTO archive_ids (id) VALUES (?)", [(sid,) for sid, _, _ in sessions])
+                cur.execute(
+                    "SELECT session_id, app_name, duration_seconds FROM app_usage "
+                    "WHERE session_id IN (SELECT id FROM archive_ids)"
+                )
+                apps = [tuple(r) for r in cur.fetchall()]
+                key = _month_key(month)
+                path = archive._path(key)
+                tmp = archive.write_month(key, sessions, apps)
+                cur.execute("DELETE FROM app_usage WHERE session_id IN (SELECT id FROM archive_ids)")
+                cur.execute("DELETE FROM sessions WHERE id IN (SELECT id FROM archive_ids)")
+                cur.execute(
+                    "INSERT OR REPLACE INTO settings (profile_id, key, value) VALUES ('', 'archive_pending', ?)",
+                    (os.path.basename(path),),
+                )
+                try:
+                    db.conn.commit()
+                except Exception:
+                    db.conn.rollback()
+                    os.remove(tmp)
+                    raise
+                os.replace(tmp, path)
+                db.set_setting("archive_pending", None)
+                archive._available.add(key)
+                db.notify_changed("sessions")
+                db.notify_changed("app_usage")
+                if key not in archived_months:
+                    archived_months.append(key)
+                moved += len(sessions)
+            month = nxt
+        if archive is not db.archive:
+            archive.close()
+    archived_months.sort()
+    # 병합(merge.py)이 이미 보관된 기간의 기록을 다시 가져오지 않도록 경계 기록
+    prev = db.get_setting("archive_cutoff")
+    if not prev or prev < cutoff.date().isoformat():
+        db.set_setting("archive_cutoff", cutoff.date().isoformat())
+    return {"months": archived_months, "sessions": moved}
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    from db import Database
+
+    parser = argparse.ArgumentParser(description="오래된 ComTime 기록을 월별 아카이브로 이동")
+    parser.add_argument("db", help="comtime.db 경로")
+    parser.add_argument("--months", type=int, default=12, help="SQLite에 남길 개월 수 (기본 12)")
+    args = parser.parse_args()
+    result = archive_old_months(Database(args.db), args.months)
+    print(f"보관한 달: {', '.join(result['months']) or '없음'} (세션 {result['sessions']}개)")
+    sys.exit(0)
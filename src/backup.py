@@ -0,0 +1,296 @@
+"""comtime.db 온라인 백업 - SQLite 증분 백업 API.
+
+ComTime이 5초마다 기록하는 중에도 sqlite3.Connection.backup으로 작은 페이지 묶음씩
+복사하고 묶음 사이에 잠깐 쉬어(progress 콜백에서 time.sleep), 기록 쓰기가 오래 막히지 않게 한다.
+Connection.backup의 sleep 인자는 묶음 사이가 아니라 원본이 BUSY/LOCKED일 때만 쉬므로 쓰지 않는다.
+다른 연결이 원본에 쓰면 SQLite는 복사를 처음부터 다시 하므로, 쓰기가 잦아 max_restarts번 넘게
+다시 시작되면 남은 전체를 한 번에 복사해 끝낸다 (그동안만 쓰기가 잠깐 기다림).
+파일 복사와 달리 중간에 쓰인 내용이 섞인(찢어진) 상태가 저장되지 않는다.
+
+백업은 DB 옆 <이름>_backups/ 폴더에 comtime-YYYYMMDD-HHMMSS.db로 저장하며,
+무결성 검사를 통과한 것만 남긴다. 보관 정책: 최근 keep개 + 최근 keep_weekly주의 주별 1개.
+오래된 달을 옮겨 둔 월별 아카이브(<이름>_archive/*.cta, archive.py)도 SQLite에는 없는 기록이므로
+같은 이름의 comtime-YYYYMMDD-HHMMSS.archive/ 폴더에 SHA-256 목록(manifest.json)과 함께 복사하고,
+복원할 때 DB와 함께 되돌린다. 아카이브는 DB를 복사한 뒤에 복사한다: 그 사이에 보관이 실행되면
+같은 세션이 양쪽에 들어갈 수는 있어도 (복원 후 archive.drop_archived_rows가 정리) 빠지는 달은 없다.
+
+    python src/backup.py now [--db comtime.db]
+    python src/backup.py list
+    python src/backup.py verify <백업 파일>
+"""
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import time
+from datetime import datetime
+
+from db import _readonly_uri
+
+DEFAULT_PAGES = 64  # 묶음당 페이지 수 (4KB 페이지 기준 256KB)
+DEFAULT_SLEEP = 0.01  # 묶음 사이 대기(초) - 이 사이에 앱의 쓰기가 진행된다
+DEFAULT_MAX_RESTARTS = 3  # 원본 쓰기로 복사가 처음부터 다시 시작된 횟수가 이보다 많으면 한 번에 복사
+DEFAULT_KEEP = 7
+DEFAULT_KEEP_WEEKLY = 4
+_PREFIX = "comtime-"
+_SUFFIX = ".db"
+_ARCHIVE_SUFFIX = ".archive"
+_MANIFEST = "manifest.json"
+_STAMP = "%Y%m%d-%H%M%S"
+_REQUIRED_TABLES = {"sessions", "settings", "app_usage"}
+
+
+def backup_dir(db_path: str) -> str:
+    return os.path.splitext(os.path.abspath(db_path))[0] + "_backups"
+
+
+def archive_set_dir(backup_path: str) -> str:
+    """백업 파일과 짝인 아카이브 폴더 (아카이브가 없던 때의 백업에는 없다)."""
+    return backup_path[:-len(_SUFFIX)] + _ARCHIVE_SUFFIX
+
+
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _copy_archive(archive_dir: str, dest: str):
+    """archive_dir의 월별 파일(교체 대기 중인 .tmp 포함)을 dest에 복사하고 manifest.json을 쓴다."""
+    os.makedirs(dest)
+    manifest = {}
+    for name in sorted(os.listdir(archive_dir)):
+        if not name.endswith((".cta", ".cta.tmp")):
+            continue
+        shutil.copyfile(os.path.join(archive_dir, name), os.path.join(dest, name))
+        manifest[name] = _sha256(os.path.join(dest, name))
+    with open(os.path.join(dest, _MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def verify_archive_set(directory: str):
+    """백업 아카이브 폴더 검사: 목록의 파일이 모두 있고 SHA-256과 아카이브 헤더가 맞는지.
+    정상이면 None, 아니면 오류 설명 문자열."""
+    from archive import _MAGIC
+    try:
+        with open(os.path.join(directory, _MANIFEST), encoding="utf-8") as f:
+            manifest = json.load(f)
+        for name, digest in manifest.items():
+            path = os.path.join(directory, name)
+            if _sha256(path) != digest:
+                return f"아카이브 파일이 손상되었습니다: {name}"
+            with open(path, "rb") as f:
+                if f.read(len(_MAGIC)) != _MAGIC:
+                    return f"ComTime 아카이브가 아닙니다: {name}"
+    except (OSError, ValueError, AttributeError) as e:
+        return f"아카이브 확인 실패: {e}"
+    return None
+
+
+def verify_backup(path: str):
+    """무결성 검사 (짝인 아카이브 폴더가 있으면 그것도). 정상이면 None, 아니면 오류 설명 문자열."""
+    try:
+        conn = sqlite3.connect(_readonly_uri(path), uri=True)
+    except sqlite3.Error as e:
+        return str(e)
+    try:
+        rows = [r[0] for r in conn.execute("PRAGMA integrity_check")]
+        if rows != ["ok"]:
+            return "; ".join(rows[:5])
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        missing = _REQUIRED_TABLES - tables
+        if missing:
+            return f"ComTime DB가 아닙니다 (없는 테이블: {', '.join(sorted(missing))})"
+    except sqlite3.Error as e:
+        return str(e)
+    finally:
+        conn.close()
+    if os.path.isdir(archive_set_dir(path)):
+        return verify_archive_set(archive_set_dir(path))
+    return None
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def create_backup(db_path: str, dest_dir: str = None, pages: int = DEFAULT_PAGES,
+                  sleep: float = DEFAULT_SLEEP, progress=None, now: datetime = None,
+                  max_restarts: int = DEFAULT_MAX_RESTARTS) -> str:
+    """db_path(와 월별 아카이브)를 dest_dir에 백업하고 경로를 반환. 전용 연결을 쓰므로 작업 스레드에서 호출 가능.
+
+    pages 페이지씩 복사하고 묶음마다 sleep초 쉰다. progress(status, remaining, total)는 묶음마다
+    호출된다 (sqlite3 backup 콜백 형식).
+    """
+    dest_dir = dest_dir or backup_dir(db_path)
+    os.makedirs(dest_dir, exist_ok=True)
+    final = os.path.join(dest_dir, _PREFIX + (now or datetime.now()).strftime(_STAMP) + _SUFFIX)
+    tmp = final + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    archive_tmp = archive_set_dir(final) + ".tmp"
+    if os.path.isdir(archive_tmp):
+        shutil.rmtree(archive_tmp)
+    src = sqlite3.connect(_readonly_uri(db_path), uri=True)
+    try:
+        dst = sqlite3.connect(tmp)
+        last = [None, 0]  # 직전 남은 페이지 수, 다시 시작된 횟수
+
+        def step(status, remaining, total):
+            if last[0] is not None and remaining >= last[0]:
+                # 남은 페이지가 줄지 않음: 다른 연결이 원본에 써서 처음부터 다시 복사 중
+                last[1] += 1
+                if last[1] > max_restarts:
+                    raise _TooManyRestarts()
+            last[0] = remaining
+            if progress:
+                progress(status, remaining, total)
+            if remaining and sleep:
+                time.sleep(sleep)  # 잠금 없이 쉬는 동안 앱의 쓰기가 진행된다
+
+        try:
+            try:
+                src.backup(dst, pages=pages, progress=step)
+            except _TooManyRestarts:
+                src.backup(dst, pages=-1, progress=progress)
+        finally:
+            dst.close()
+    finally:
+        src.close()
+    error = verify_backup(tmp)
+    if error:
+        os.remove(tmp)
+        raise ValueError(f"백업 무결성 검사 실패: {error}")
+    from archive import archive_dir_for
+    archive_dir = archive_dir_for(db_path)
+    if os.path.isdir(archive_dir):
+        _copy_archive(archive_dir, archive_tmp)
+        error = verify_archive_set(archive_tmp)
+        if error:
+            os.remove(tmp)
+            shutil.rmtree(archive_tmp)
+            raise ValueError(f"백업 무결성 검사 실패: {error}")
+        os.replace(archive_tmp, archive_set_dir(final))
+    # .db 파일이 있어야 완성된 백업 (list_backups는 .db만 본다)
+    os.replace(tmp, final)
+    return final
+
+
+def list_backups(dest_dir: str):
+    """[(백업 시각, 경로)] 최신순."""
+    if not os.path.isdir(dest_dir):
+        return []
+    result = []
+    for name in os.listdir(dest_dir):
+        if not (name.startswith(_PREFIX) and name.endswith(_SUFFIX)):
+            continue
+        try:
+            ts = datetime.strptime(name[len(_PREFIX):-len(_SUFFIX)], _STAMP)
+        except ValueError:
+            continue
+        result.append((ts, os.path.join(dest_dir, name)))
+    result.sort(reverse=True)
+    return result
+
+
+def apply_retention(dest_dir: str, keep: int = DEFAULT_KEEP, keep_weekly: int = DEFAULT_KEEP_WEEKLY):
+    """보관 정책 밖의 백업과 남은 임시 파일을 지우고, 지운 경로 목록을 반환."""
+    backups = list_backups(dest_dir)
+    retained = {p for _, p in backups[:keep]}
+    weeks = set()
+    for ts, p in backups:
+        week = ts.isocalendar()[:2]
+        if week in weeks:
+            continue
+        if len(weeks) >= keep_weekly:
+            break
+        weeks.add(week)
+        retained.add(p)
+    removed = []
+    for _, p in backups:
+        if p not in retained:
+            os.remove(p)
+            removed.append(p)
+            if os.path.isdir(archive_set_dir(p)):
+                shutil.rmtree(archive_set_dir(p))
+    for name in os.listdir(dest_dir):
+        path = os.path.join(dest_dir, name)
+        if not name.startswith(_PREFIX):
+            continue
+        if name.endswith(_SUFFIX + ".tmp"):
+            os.remove(path)
+            removed.append(path)
+        elif name.endswith(_ARCHIVE_SUFFIX + ".tmp") or (
+            name.endswith(_ARCHIVE_SUFFIX) and not os.path.exists(path[:-len(_ARCHIVE_SUFFIX)] + _SUFFIX)
+        ):
+            # 중단된 백업의 아카이브 폴더
+            shutil.rmtree(path)
+            removed.append(path)
+    return removed
+
+
+def _restore_archive(archive_set: str, archive_dir: str):
+    """아카이브 폴더를 백업의 것으로 바꾼다. 새 폴더를 다 만든 뒤 이름만 바꿔서 교체."""
+    staging = archive_dir + ".restore"
+    old = archive_dir + ".old"
+    for path in (staging, old):
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+    os.makedirs(staging)
+    for name in os.listdir(archive_set):
+        if name != _MANIFEST:
+            shutil.copyfile(os.path.join(archive_set, name), os.path.join(staging, name))
+    if os.path.isdir(archive_dir):
+        os.replace(archive_dir, old)
+    os.replace(staging, archive_dir)
+    if os.path.isdir(old):
+        shutil.rmtree(old)
+
+
+def restore_backup(backup_path: str, conn: sqlite3.Connection, archive_dir: str = None):
+    """백업 내용으로 conn의 DB 전체를 덮어쓴다 (열린 연결을 그대로 유지한 채 교체).
+    archive_dir를 주고 백업에 아카이브 폴더가 있으면 아카이브도 백업의 것으로 바꾼다
+    (열어 둔 아카이브 파일은 호출 전에 닫아야 한다). 아카이브 없이 만든 예전 백업이면
+    지금 아카이브를 그대로 둔다 (백업 이후 옮긴 달을 잃지 않도록)."""
+    error = verify_backup(backup_path)
+    if error:
+        raise ValueError(f"백업 무결성 검사 실패: {error}")
+    conn.commit()
+    src = sqlite3.connect(_readonly_uri(backup_path), uri=True)
+    try:
+        src.backup(conn)
+    finally:
+        src.close()
+    if archive_dir and os.path.isdir(archive_set_dir(backup_path)):
+        _restore_archive(archive_set_dir(backup_path), archive_dir)
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    from cli import default_db_path
+
+    parser = argparse.ArgumentParser(description="ComTime DB 백업")
+    parser.add_argument("command", choices=("now", "list", "verify"))
+    parser.add_argument("path", nargs="?", help="verify할 백업 파일")
+    parser.add_argument("--db", default=None, help="comtime.db 경로")
+    args = parser.parse_args()
+    db_path = args.db or default_db_path()
+    if args.command == "now":
+        path = create_backup(db_path)
+        apply_retention(backup_dir(db_path))
+        print(path)
+    elif args.command == "list":
+        for ts, path in list_backups(backup_dir(db_path)):
+            print(f"{ts:%Y-%m-%d %H:%M:%S}  {os.path.getsize(path):>10}  {path}")
+    else:
+        if not args.path:
+            parser.error("verify에는 백업 파일 경로가 필요합니다")
+        error = verify_backup(args.path)
+        print(error or "ok")
+        sys.exit(1 if error else 0)
@@ -0,0 +1,109 @@
+"""프로그램 이름 → 카테고리(게임, 동영상, 숙제, 채팅 등) 분류 규칙.
+
+규칙 종류 (대소문자 무시):
+- exact   이름 전체 일치
+- prefix  이름 앞부분 일치
+- regex   이름 안에서 정규식 검색
+
+우선순위: exact > prefix(긴 것 먼저) > regex. prefix/regex 규칙은 모두 하나의 정규식으로
+합쳐 한 번에 검사하고, 결과는 앱 이름별로 캐시하므로 같은 앱은 dict 조회 한 번으로 끝난다.
+합치면 뜻이 바뀌는 정규식(역참조 \\1·(?P=이름), 이름 있는 그룹, 전역 인라인 플래그)은
+그룹 번호·이름이 다른 규칙과 섞이지 않게 따로 컴파일해, 합친 정규식이 맞지 않을 때
+규칙 순서대로 시도한다.
+"""
+import re
+
+# 다른 규칙과 합치면 그룹 번호가 밀리는 역참조/조건 그룹
+_GROUP_REF = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+_DEFAULT_FLAGS = re.compile("").flags
+
+KINDS = ("exact", "prefix", "regex")
+UNCATEGORIZED = "기타"
+
+# 처음 실행 시 넣어 두는 기본 규칙 (macOS 앱 이름과 Windows 실행 파일 이름을 함께)
+DEFAULT_RULES = [
+    ("exact", "Minecraft", "게임"),
+    ("prefix", "Roblox", "게임"),
+    ("prefix", "Steam", "게임"),
+    ("regex", r"league of legends|leagueclient|fortnite|overwatch", "게임"),
+    ("exact", "VLC", "동영상"),
+    ("exact", "IINA", "동영상"),
+    ("exact", "QuickTime Player", "동영상"),
+    ("prefix", "PotPlayer", "동영상"),
+    ("prefix", "Netflix", "동영상"),
+    ("prefix", "Microsoft Word", "숙제"),
+    ("prefix", "Microsoft Excel", "숙제"),
+    ("prefix", "Microsoft PowerPoint", "숙제"),
+    ("exact", "Word", "숙제"),
+    ("exact", "WINWORD", "숙제"),
+    ("exact", "EXCEL", "숙제"),
+    ("exact", "POWERPNT", "숙제"),
+    ("exact", "Hwp", "숙제"),
+    ("exact", "Pages", "숙제"),
+    ("exact", "Keynote", "숙제"),
+    ("exact", "KakaoTalk", "채팅"),
+    ("exact", "Discord", "채팅"),
+]
+
+
+class CategoryMatcher:
+    """rules: [(kind, pattern, category)]. categorize(app_name) -> 카테고리 또는 None."""
+
+    def __init__(self, rules):
+        self._exact = {}
+        alternatives = []
+        self._group_category = {}
+        prefixes = []
+        regexes = []
+        self._separate = []  # [(compiled, category)] 합치지 않고 따로 검사하는 정규식
+        for kind, pattern, category in rules:
+            if kind == "exact":
+                self._exact.setdefault(pattern.casefold(), category)
+            elif kind == "prefix":
+                prefixes.append((pattern, category))
+            elif kind == "regex":
+                try:
+                    compiled = re.compile(pattern)
+                except re.error as e:
+                    raise ValueError(f"잘못된 정규식 '{pattern}': {e}") from None
+                if (_GROUP_REF.search(pattern) or compiled.groupindex
+                        or compiled.flags != _DEFAULT_FLAGS):
+                    self._separate.append((re.compile(pattern, re.IGNORECASE), category))
+                else:
+                    regexes.append((pattern, category))
+            else:
+                raise ValueError(f"알 수 없는 규칙 종류: {kind}")
+        # 긴 prefix가 먼저 시도되도록 (예: "Microsoft Word"가 "Microsoft"보다 우선)
+        prefixes.sort(key=lambda pc: len(pc[0]), reverse=True)
+        for pattern, category in prefixes:
+            name = f"g{len(alternatives)}"
+            alternatives.append(rf"\A(?P<{name}>{re.escape(pattern)})")
+            self._group_category[name] = category
+        for pattern, category in regexes:
+            name = f"g{len(alternatives)}"
+            alternatives.append(f"(?P<{name}>{pattern})")
+            self._group_category[name] = category
+        try:
+            self._combined = re.compile("|".join(alternatives), re.IGNORECASE) if alternatives else None
+        except re.error as e:
+            raise ValueError(f"정규식 규칙을 합칠 수 없습니다: {e}") from None
+        self._memo = {}
+
+    def categorize(self, app_name):
+        try:
+            return self._memo[app_name]
+        except KeyError:
+            pass
+        category = self._exact.get(app_name.casefold())
+        if category is None and self._combined is not None:
+            m = self._combined.search(app_name)
+            if m:
+                category = self._group_category[m.lastgroup]
+        if category is None:
+            for compiled, category in self._separate:
+                if compiled.search(app_name):
+                    break
+            else:
+                category = None
+        self._memo[app_name] = category
+        return category
@@ -0,0 +1,187 @@
+"""comtime-cli: PyQt6 없이 사용 기록을 조회하는 명령줄 도구.
+
+db.py와 표준 라이브러리만 불러오고 comtime.db를 읽기 전용으로 열기 때문에
+ComTime이 실행 중이어도 쓰기 잠금을 잡지 않는다. 원격 지원(SSH)용.
+
+    python src/cli.py today
+    python src/cli.py daily --days 7
+    python src/cli.py top --month 2026-03 --limit 10 --json
+    python src/cli.py categories --days 7
+    python src/cli.py sessions --date 2026-03-14
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import date, timedelta
+
+from db import Database
+
+
+def default_db_path() -> str:
+    # main.py의 _DB_PATH와 같은 규칙: exe면 exe 위치, 스크립트면 스크립트 위치
+    if getattr(sys, "frozen", False):
+        base = os.path.dirname(sys.executable)
+    else:
+        base = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base, "comtime.db")
+
+
+def _fmt_duration(seconds) -> str:
+    if seconds is None:
+        return "진행 중"
+    s = int(seconds)
+    return f"{s // 3600:02d}:{(s % 3600) // 60:02d}:{s % 60:02d}"
+
+
+def _month_range(month: str):
+    start = date.fromisoformat(month + "-01")
+    nxt = date(start.year + (start.month == 12), start.month % 12 + 1, 1)
+    return start, nxt - timedelta(days=1)
+
+
+def _period(args):
+    """--month / --from --to / --days 옵션을 (start, end)로."""
+    today = date.today()
+    if getattr(args, "month", None):
+        return _month_range(args.month)
+    if getattr(args, "start", None):
+        start = date.fromisoformat(args.start)
+        end = date.fromisoformat(args.end) if args.end else today
+        return start, end
+    return today - timedelta(days=args.days - 1), today
+
+
+def _print_table(headers, rows):
+    widths = [len(h) for h in headers]
+    for r in rows:
+        widths = [max(w, len(str(c))) for w, c in zip(widths, r)]
+    print("  ".join(h.ljust(w) for h, w in zip(headers, widths)))
+    print("  ".join("-" * w for w in widths))
+    for r in rows:
+        print("  ".join(str(c).ljust(w) for c, w in zip(r, widths)))
+
+
+def cmd_today(db, args):
+    today = date.today()
+    data = {
+        "date": today.isoformat(),
+        "total_seconds": db.get_total_seconds_for_date(today),
+        "apps": db.get_app_usage_for_date(today),
+    }
+    if args.json:
+        return data
+    print(f"오늘 사용: {_fmt_duration(data['total_seconds'])}")
+    if data["apps"]:
+        print()
+        _print_table(["프로그램", "사용 시간"],
+                     [(a["app_name"], _fmt_duration(a["total_seconds"] or 0)) for a in data["apps"]])
+    return None
+
+
+def cmd_daily(db, args):
+    start, end = _period(args)
+    days = db.get_daily_totals(start, end)
+    if args.json:
+        return days
+    _print_table(["날짜", "사용 시간"], [(d["date"], _fmt_duration(d["total_seconds"])) for d in days])
+    return None
+
+
+def cmd_top(db, args):
+    start, end = _period(args)
+    apps = db.get_app_usage_for_range(start, end)[: args.limit]
+    if args.json:
+        return {"start": start.isoformat(), "end": end.isoformat(), "apps": apps}
+    print(f"{start} ~ {end}")
+    _print_table(["프로그램", "사용 시간"],
+                 [(a["app_name"], _fmt_duration(a["total_seconds"] or 0)) for a in apps])
+    return None
+
+
+def cmd_categories(db, args):
+    start, end = _period(args)
+    days = db.get_category_daily_totals(start, end)
+    if args.json:
+        return days
+    totals = {}
+    for d in days:
+        totals[d["category"]] = totals.get(d["category"], 0) + d["total_seconds"]
+    print(f"{start} ~ {end}")
+    _print_table(["카테고리", "사용 시간"],
+                 [(c, _fmt_duration(secs)) for c, secs in sorted(totals.items(), key=lambda kv: -kv[1])])
+    return None
+
+
+def cmd_sessions(db, args):
+    d = date.fromisoformat(args.date) if args.date else date.today()
+    sessions = db.get_sessions_for_date(d)
+    if args.json:
+        return sessions
+    _print_table(
+        ["시작", "종료", "사용 시간"],
+        [(s["start_ts"], s["end_ts"] or "", _fmt_duration(s["duration_seconds"])) for s in sessions],
+    )
+    return None
+
+
+def _resolve_profile(db, profile: str) -> str:
+    for p in db.get_profiles():
+        if profile in (p["id"], p["name"]):
+            return p["id"]
+    raise ValueError(f"프로필을 찾을 수 없습니다: {profile}")
+
+
+def _add_period_args(p, default_days):
+    p.add_argument("--days", type=int, default=default_days, help=f"최근 N일 (기본 {default_days})")
+    p.add_argument("--month", help="YYYY-MM")
+    p.add_argument("--from", dest="start", help="YYYY-MM-DD")
+    p.add_argument("--to", dest="end", help="YYYY-MM-DD (기본: 오늘)")
+
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--db", default=None, help="comtime.db 경로")
+    common.add_argument("--json", action="store_true", help="JSON으로 출력")
+    common.add_argument("--profile", default=None, help="프로필 ID 또는 이름 (기본: 기본 프로필)")
+    parser = argparse.ArgumentParser(prog="comtime-cli", description="ComTime 사용 기록 조회 (읽기 전용)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("today", parents=[common], help="오늘 사용 시간과 프로그램별 사용").set_defaults(func=cmd_today)
+    p = sub.add_parser("daily", parents=[common], help="날짜별 사용 시간")
+    _add_period_args(p, 7)
+    p.set_defaults(func=cmd_daily)
+    p = sub.add_parser("top", parents=[common], help="기간 내 많이 사용한 프로그램")
+    _add_period_args(p, 30)
+    p.add_argument("--limit", type=int, default=10)
+    p.set_defaults(func=cmd_top)
+    p = sub.add_parser("categories", parents=[common], help="기간 내 카테고리별 사용 시간")
+    _add_period_args(p, 7)
+    p.set_defaults(func=cmd_categories)
+    p = sub.add_parser("sessions", parents=[common], help="날짜별 세션 목록")
+    p.add_argument("--date", help="YYYY-MM-DD (기본: 오늘)")
+    p.set_defaults(func=cmd_sessions)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    path = args.db or default_db_path()
+    if not os.path.exists(path):
+        print(f"DB 파일을 찾을 수 없습니다: {path}", file=sys.stderr)
+        return 1
+    try:
+        db = Database(path, readonly=True)
+        if args.profile:
+            db.set_profile(_resolve_profile(db, args.profile))
+        result = args.func(db, args)
+    except ValueError as e:
+        print(f"잘못된 입력: {e}", file=sys.stderr)
+        return 2
+    if result is not None:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,61 @@
 import sqlite3
 from datetime import datetime, date, timedelta
 import hashlib
+import secrets
+import os
+from urllib.parse import quote
+
+# 기존(프로필 도입 전) 기록이 속하는 프로필
+DEFAULT_PROFILE = "default"
+# 프로필마다 따로 저장하는 설정. 나머지는 컴퓨터 공통 (settings.profile_id = '')
+PROFILE_SETTINGS = ("pin_sha256", "last_heartbeat", "idle_threshold_seconds", "title_tracking")
 
 
 class Database:
-    def __init__(self, path="timelimiter.db"):
-        self.conn = sqlite3.connect(path, check_same_thread=False)
+    def __init__(self, path="timelimiter.db", readonly=False, profile_id=DEFAULT_PROFILE):
+        if readonly:
+            # 조회 전용: 스키마 생성/쓰기 없이 읽기 전용으로 연다 (쓰기 잠금을 잡지 않음)
+            uri = _readonly_uri(path)
+            self.conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            self.conn = sqlite3.connect(path, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
-        self.init_db()
+        self.path = path
+        # 모든 세션/앱 기록 조회와 쓰기는 현재 프로필 기준 (set_profile로 전환)
+        self.profile_id = profile_id
+        # 변경 피드: 커밋된 쓰기마다 (테이블, 날짜) 세대 번호 증가. 화면은 세대가 바뀔 때만 다시 조회
+        self._table_gen = {}
+        self._day_gen = {}
+        self._external_gen = 0
+        self._data_version = None
+        self._categories = None  # CategoryMatcher, 처음 필요할 때 규칙 테이블에서 생성
+        # 마지막 하트비트 이후 이벤트를 기록한 프로필 (그 이벤트가 하트비트를 대신함)
+        self._fresh_events = set()
+        # SQL에서 규칙 분류를 쓸 수 있도록 (재분류 UPDATE, 병합 INSERT ... SELECT)
+        self.conn.create_function("comtime_category", 1, self.categorize, deterministic=True)
+        # 오래된 달은 월별 컬럼 아카이브(archive.py)에서 읽는다. 아카이브가 있을 때만 로드
+        self.archive = None
+        self._load_archive()
+        if not readonly:
+            self.init_db()
+
+    def is_archived(self, d: date) -> bool:
+        """d가 월별 아카이브(archive.py)로 옮긴 달인지. 보관된 기록은 수정/삭제할 수 없다."""
+        return self.archive is not None and f"{d.year:04d}-{d.month:02d}" in self.archive.months()
+
+    def _load_archive(self):
+        self.archive = None
+        if self.path != ":memory:":
+            archive_dir = os.path.splitext(os.path.abspath(self.path))[0] + "_archive"
+            if os.path.isdir(archive_dir):
+                from archive import ColumnArchive
+                self.archive = ColumnArchive(archive_dir, self.profile_id)
 
     def init_db(self):
         cur = self.conn.cursor()
+        # 새 DB는 지운 행의 빈 페이지를 조금씩 돌려줄 수 있게 (retention.py). 테이블 생성 전에만 적용됨
+        if cur.execute("PRAGMA page_count").fetchone()[0] == 0:
+            cur.execute("PRAGMA auto_vacuum = INCREMENTAL")
         cur.execute("""
         CREATE TABLE IF NOT EXISTS sessions (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -21,10 +66,13 @@ class Database:
         """)
         cur.execute("""
         CREATE TABLE IF NOT EXISTS settings (
-            key TEXT PRIMARY KEY,
-            value TEXT
+            profile_id TEXT NOT NULL DEFAULT '',
+            key TEXT NOT NULL,
+            value TEXT,
+            PRIMARY KEY (profile_id, key)
         )
         """)
+        self._migrate_settings(cur)
         cur.execute("""
         CREATE TABLE IF NOT EXISTS app_usage (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -35,12 +83,229 @@ class Database:
             FOREIGN KEY (session_id) REFERENCES sessions(id)
         )
         """)
+        # 프로필(아이)별 기록 분리. 프로필 도입 전 기록은 기본 프로필
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS profiles (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            os_user TEXT
+        )
+        """)
+        cur.execute("INSERT OR IGNORE INTO profiles (id, name) VALUES (?, '기본')", (DEFAULT_PROFILE,))
+        self._ensure_column(cur, "sessions", "profile_id", f"TEXT NOT NULL DEFAULT '{DEFAULT_PROFILE}'")
+        self._ensure_column(cur, "app_usage", "profile_id", f"TEXT NOT NULL DEFAULT '{DEFAULT_PROFILE}'")
+        # 다른 컴퓨터에서 가져온 행의 출처 ID ("<device_id>:<원본 id>"). 로컬 행은 NULL.
+        self._ensure_column(cur, "sessions", "origin_id", "TEXT")
+        self._ensure_column(cur, "app_usage", "origin_id", "TEXT")
+        cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_sessions_origin ON sessions(origin_id)")
+        cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_app_usage_origin ON app_usage(origin_id)")
+        # 세션 조회는 항상 프로필 + 시작 시각 범위
+        cur.execute("DROP INDEX IF EXISTS idx_sessions_start")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_sessions_profile_start ON sessions(profile_id, start_ts)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_app_usage_session ON app_usage(session_id)")
+        # 창 제목 top-K (titles.py). 프로필/앱/날짜마다 최대 K개 행
+        self._migrate_app_titles(cur)
+        cur.execute(f"""
+        CREATE TABLE IF NOT EXISTS app_titles (
+            profile_id TEXT NOT NULL DEFAULT '{DEFAULT_PROFILE}',
+            day TEXT NOT NULL,
+            app_name TEXT NOT NULL,
+            title TEXT NOT NULL,
+            seconds INTEGER NOT NULL,
+            error INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (profile_id, day, app_name, title)
+        )
+        """)
+        # 프로그램 → 카테고리 규칙 (categories.py). app_usage.category는 기록 시점에 채운다
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS category_rules (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            pattern TEXT NOT NULL,
+            category TEXT NOT NULL
+        )
+        """)
+        self._ensure_column(cur, "app_usage", "category", "TEXT")
+        # 보존 기간이 지나 원본 세션/앱 기록을 지우고 남긴 일별 합계 (retention.py)
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS daily_totals (
+            profile_id TEXT NOT NULL,
+            day TEXT NOT NULL,
+            total_seconds INTEGER NOT NULL,
+            PRIMARY KEY (profile_id, day)
+        )
+        """)
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS daily_app_totals (
+            profile_id TEXT NOT NULL,
+            day TEXT NOT NULL,
+            app_name TEXT NOT NULL,
+            category TEXT,
+            total_seconds INTEGER NOT NULL,
+            PRIMARY KEY (profile_id, day, app_name)
+        )
+        """)
+        # 추가만 하는 사용 이벤트 로그. 스냅샷(snapshot_events) 때 app_usage/하트비트로 합치고 비운다
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS events (
+            seq INTEGER PRIMARY KEY,
+            ts TEXT NOT NULL,
+            profile_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            session_id INTEGER,
+            app_name TEXT,
+            seconds INTEGER
+        )
+        """)
+        cur.execute("SELECT value FROM settings WHERE key='category_rules_seeded'")
+        if cur.fetchone() is None:
+            from categories import DEFAULT_RULES
+            cur.executemany(
+                "INSERT INTO category_rules (kind, pattern, category) VALUES (?,?,?)", DEFAULT_RULES
+            )
+            cur.execute("INSERT INTO settings (key, value) VALUES ('category_rules_seeded', '1')")
+            self._recategorize(cur)
+        # 이 DB(컴퓨터)의 고유 ID - 병합 시 출처 구분에 사용
+        import uuid
+        cur.execute(
+            "INSERT OR IGNORE INTO settings (key, value) VALUES ('device_id', ?)",
+            (uuid.uuid4().hex,),
+        )
+        # 관리자 PIN 도입 전 DB: 처음 설치 때 부모가 만든 기본 프로필 PIN을 관리자 PIN으로 사용
+        cur.execute(
+            "INSERT OR IGNORE INTO settings (profile_id, key, value) "
+            "SELECT '', 'admin_pin_sha256', value FROM settings WHERE profile_id=? AND key='pin_sha256'",
+            (DEFAULT_PROFILE,),
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def _ensure_column(cur, table: str, column: str, decl: str):
+        """이전 버전 DB에 없는 컬럼을 추가 (간단한 마이그레이션)."""
+        cur.execute(f"PRAGMA table_info({table})")
+        if column not in {r[1] for r in cur.fetchall()}:
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+    def _migrate_settings(self, cur):
+        """프로필 도입 전 settings(key PRIMARY KEY)를 (profile_id, key) 테이블로 옮긴다."""
+        cur.execute("PRAGMA table_info(settings)")
+        if "profile_id" in {r[1] for r in cur.fetchall()}:
+            return
+        cur.execute("ALTER TABLE settings RENAME TO settings_old")
+        cur.execute("""
+        CREATE TABLE settings (
+            profile_id TEXT NOT NULL DEFAULT '',
+            key TEXT NOT NULL,
+            value TEXT,
+            PRIMARY KEY (profile_id, key)
+        )
+        """)
+        marks = ",".join("?" * len(PROFILE_SETTINGS))
+        cur.execute(
+            f"INSERT INTO settings (profile_id, key, value) "
+            f"SELECT CASE WHEN key IN ({marks}) THEN ? ELSE '' END, key, value FROM settings_old",
+            PROFILE_SETTINGS + (DEFAULT_PROFILE,),
+        )
+        cur.execute("DROP TABLE settings_old")
+
+    @staticmethod
+    def _migrate_app_titles(cur):
+        """프로필 구분이 없던 app_titles를 profile_id가 키에 들어간 테이블로 옮긴다 (기존 행은 기본 프로필)."""
+        cur.execute("PRAGMA table_info(app_titles)")
+        columns = {r[1] for r in cur.fetchall()}
+        if not columns or "profile_id" in columns:
+            return
+        cur.execute("ALTER TABLE app_titles RENAME TO app_titles_old")
+        cur.execute(f"""
+        CREATE TABLE app_titles (
+            profile_id TEXT NOT NULL DEFAULT '{DEFAULT_PROFILE}',
+            day TEXT NOT NULL,
+            app_name TEXT NOT NULL,
+            title TEXT NOT NULL,
+            seconds INTEGER NOT NULL,
+            error INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (profile_id, day, app_name, title)
+        )
+        """)
+        cur.execute(
+            "INSERT INTO app_titles (profile_id, day, app_name, title, seconds, error) "
+            "SELECT ?, day, app_name, title, seconds, error FROM app_titles_old",
+            (DEFAULT_PROFILE,),
+        )
+        cur.execute("DROP TABLE app_titles_old")
+
+    def get_device_id(self) -> str:
+        return self.get_setting("device_id")
+
+    # ── 변경 피드 ──
+
+    def notify_changed(self, table: str, start: date = None, end: date = None):
+        """table의 start~end 날짜 범위가 바뀌었음을 기록. 날짜를 모르면 테이블 전체."""
+        if start is None:
+            self._table_gen[table] = self._table_gen.get(table, 0) + 1
+            return
+        d = start
+        while d <= (end or start):
+            key = (table, d)
+            self._day_gen[key] = self._day_gen.get(key, 0) + 1
+            d += timedelta(days=1)
+
+    # ── 프로필 ──
+
+    def get_profiles(self):
+        cur = self.conn.cursor()
+        cur.execute("SELECT id, name, os_user FROM profiles ORDER BY id != ?, name", (DEFAULT_PROFILE,))
+        return [dict(r) for r in cur.fetchall()]
+
+    def add_profile(self, name: str) -> str:
+        import uuid
+        profile_id = uuid.uuid4().hex[:8]
+        self.conn.execute("INSERT INTO profiles (id, name) VALUES (?, ?)", (profile_id, name))
         self.conn.commit()
+        return profile_id
+
+    def profile_for_os_user(self, os_user: str):
+        cur = self.conn.cursor()
+        cur.execute("SELECT id FROM profiles WHERE os_user=?", (os_user,))
+        row = cur.fetchone()
+        return row[0] if row else None
+
+    def set_profile_os_user(self, profile_id: str, os_user: str):
+        """OS 계정의 기본 프로필 지정 (계정당 하나)."""
+        self.conn.execute("UPDATE profiles SET os_user=NULL WHERE os_user=?", (os_user,))
+        self.conn.execute("UPDATE profiles SET os_user=? WHERE id=?", (os_user, profile_id))
+        self.conn.commit()
+
+    def set_profile(self, profile_id: str):
+        """현재 프로필 전환. 화면 구독자가 모두 다시 조회하도록 변경 피드를 올린다."""
+        if profile_id == self.profile_id:
+            return
+        self.profile_id = profile_id
+        self._load_archive()
+        self._external_gen += 1
+
+    def poll_external_changes(self) -> bool:
+        """다른 프로세스(CLI, 병합 도구 등)가 커밋했는지 PRAGMA data_version으로 확인."""
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        changed = self._data_version is not None and version != self._data_version
+        self._data_version = version
+        if changed:
+            self._external_gen += 1
+        return changed
+
+    def generation(self, d: date, *tables):
+        """구독자용 세대 값. 이전 값과 같으면 해당 날짜/테이블 데이터는 바뀌지 않았다."""
+        return (self._external_gen,) + tuple(
+            (self._table_gen.get(t, 0), self._day_gen.get((t, d), 0)) for t in tables
+        )
 
     def start_session(self, start_ts_iso: str) -> int:
         cur = self.conn.cursor()
-        cur.execute("INSERT INTO sessions (start_ts) VALUES (?)", (start_ts_iso,))
+        cur.execute(
+            "INSERT INTO sessions (start_ts, profile_id) VALUES (?, ?)", (start_ts_iso, self.profile_id)
+        )
         self.conn.commit()
+        self._notify_span("sessions", start_ts_iso, None)
         return cur.lastrowid
 
     def end_session(self, session_id: int, end_ts_iso: str):
@@ -60,6 +325,16 @@ class Database:
             (end_ts_iso, duration, session_id),
         )
         self.conn.commit()
+        self._notify_span("sessions", row["start_ts"] if row else None, end_ts_iso)
+
+    def _notify_span(self, table: str, start_iso, end_iso):
+        try:
+            start = datetime.fromisoformat(start_iso).date()
+            end = datetime.fromisoformat(end_iso).date() if end_iso else start
+        except Exception:
+            self.notify_changed(table)
+            return
+        self.notify_changed(table, start, end)
 
     def get_sessions_for_date(self, d: date):
         cur = self.conn.cursor()
@@ -69,103 +344,279 @@ class Database:
         cur.execute(
             """
         SELECT * FROM sessions
-        WHERE start_ts < ? AND COALESCE(end_ts, ?) > ?
+        WHERE profile_id = ? AND start_ts < ? AND COALESCE(end_ts, ?) > ?
         ORDER BY start_ts DESC
         """,
-            (day_end.isoformat(), now_iso, day_start.isoformat()),
+            (self.profile_id, day_end.isoformat(), now_iso, day_start.isoformat()),
         )
-        return [dict(r) for r in cur.fetchall()]
+        sessions = [dict(r) for r in cur.fetchall()]
+        if self.archive:
+            sessions += self.archive.sessions(day_start, day_end)
+            sessions.sort(key=lambda s: s["start_ts"], reverse=True)
+        return sessions
 
     def get_total_seconds_for_date(self, d: date) -> int:
+        """날짜별 총 사용 시간(초). 여러 컴퓨터에서 동시에 사용한 구간은 한 번만 센다."""
+        return self.get_daily_totals(d, d)[0]["total_seconds"]
+
+    def get_daily_totals(self, start: date, end: date):
+        """start~end(포함) 날짜별 총 사용 시간. 한 번의 조회로 범위 전체를 집계.
+
+        [{"date": "YYYY-MM-DD", "total_seconds": int}, ...] (사용 기록 없는 날은 0)
+        """
         cur = self.conn.cursor()
-        day_start = datetime.combine(d, datetime.min.time())
-        day_end = day_start + timedelta(days=1)
+        range_start = datetime.combine(start, datetime.min.time())
+        range_end = datetime.combine(end, datetime.min.time()) + timedelta(days=1)
         now = datetime.now()
         cur.execute(
             """
         SELECT start_ts, end_ts FROM sessions
-        WHERE start_ts < ? AND COALESCE(end_ts, ?) > ?
+        WHERE profile_id = ? AND start_ts < ? AND COALESCE(end_ts, ?) > ?
         """,
-            (day_end.isoformat(), now.isoformat(), day_start.isoformat()),
+            (self.profile_id, range_end.isoformat(), now.isoformat(), range_start.isoformat()),
         )
-        total = 0
+        intervals = []
         for row in cur.fetchall():
             try:
-                start = datetime.fromisoformat(row["start_ts"])
+                s = datetime.fromisoformat(row["start_ts"])
+                e = datetime.fromisoformat(row["end_ts"]) if row["end_ts"] else now
             except Exception:
                 continue
-            if row["end_ts"]:
-                try:
-                    end = datetime.fromisoformat(row["end_ts"])
-                except Exception:
-                    continue
-            else:
-                end = now
-            overlap_start = max(start, day_start)
-            overlap_end = min(end, day_end)
-            if overlap_end > overlap_start:
-                total += int((overlap_end - overlap_start).total_seconds())
-        return total
+            intervals.append((s, e))
+        if self.archive:
+            intervals += self.archive.intervals(range_start, range_end)
+        per_day = {}
+        for s, e in intervals:
+            s = max(s, range_start)
+            e = min(e, range_end)
+            # 자정을 넘는 구간은 날짜별로 나눈다
+            while s < e:
+                next_midnight = datetime.combine(s.date() + timedelta(days=1), datetime.min.time())
+                seg_end = min(e, next_midnight)
+                per_day.setdefault(s.date(), []).append((s, seg_end))
+                s = seg_end
+        compacted = {
+            r["day"]: r["total_seconds"]
+            for r in self._compacted(
+                "SELECT day, total_seconds FROM daily_totals WHERE profile_id = ? AND day BETWEEN ? AND ?",
+                (self.profile_id, start.isoformat(), end.isoformat()),
+            )
+        }
+        result = []
+        d = start
+        while d <= end:
+            total = _union_seconds(per_day.get(d, ())) + compacted.get(d.isoformat(), 0)
+            result.append({"date": d.isoformat(), "total_seconds": total})
+            d += timedelta(days=1)
+        return result
+
+    def _compacted(self, sql: str, params):
+        """일별 합계/이벤트 테이블 조회. 테이블이 없는 이전 버전 DB(읽기 전용으로 연 경우)는 빈 결과."""
+        try:
+            return self.conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError:
+            return []
 
     def get_open_session(self):
         cur = self.conn.cursor()
         cur.execute(
-            "SELECT * FROM sessions WHERE end_ts IS NULL ORDER BY start_ts DESC LIMIT 1"
+            "SELECT * FROM sessions WHERE profile_id=? AND end_ts IS NULL ORDER BY start_ts DESC LIMIT 1",
+            (self.profile_id,),
         )
         row = cur.fetchone()
         return dict(row) if row else None
 
+    def end_open_sessions(self, at: datetime, profiles=None) -> int:
+        """열린 세션을 at 시각(시작보다 이르면 시작 시각)에 종료. profiles가 None이면 모든 프로필."""
+        cur = self.conn.cursor()
+        sql = "SELECT id, start_ts FROM sessions WHERE end_ts IS NULL"
+        params = []
+        if profiles is not None:
+            profiles = list(profiles)
+            sql += f" AND profile_id IN ({','.join('?' * len(profiles))})"
+            params = profiles
+        cur.execute(sql, params)
+        rows = cur.fetchall()
+        for row in rows:
+            try:
+                end_at = max(datetime.fromisoformat(row["start_ts"]), at)
+            except Exception:
+                end_at = at
+            self.end_session(row["id"], end_at.isoformat())
+        return len(rows)
+
     def delete_session(self, session_id: int):
         cur = self.conn.cursor()
         cur.execute("DELETE FROM app_usage WHERE session_id=?", (session_id,))
         cur.execute("DELETE FROM sessions WHERE id=?", (session_id,))
         self.conn.commit()
+        self.notify_changed("sessions")
+        self.notify_changed("app_usage")
 
     # Settings helpers (simple key/value). PIN is stored as sha256(hex).
-    def set_setting(self, key: str, value: str):
+    # PROFILE_SETTINGS에 속한 키는 현재 프로필 것, 나머지는 컴퓨터 공통 값을 읽고 쓴다.
+    def _setting_scope(self, key: str, profile_id=None) -> str:
+        if key in PROFILE_SETTINGS:
+            return profile_id or self.profile_id
+        return ""
+
+    def set_setting(self, key: str, value: str, profile_id: str = None):
         cur = self.conn.cursor()
-        cur.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?,?)", (key, value))
+        cur.execute(
+            "INSERT OR REPLACE INTO settings (profile_id, key, value) VALUES (?,?,?)",
+            (self._setting_scope(key, profile_id), key, value),
+        )
         self.conn.commit()
+        self.notify_changed("settings")
 
-    def get_setting(self, key: str):
+    def get_setting(self, key: str, profile_id: str = None):
         cur = self.conn.cursor()
-        cur.execute("SELECT value FROM settings WHERE key=?", (key,))
+        cur.execute(
+            "SELECT value FROM settings WHERE profile_id=? AND key=?",
+            (self._setting_scope(key, profile_id), key),
+        )
         row = cur.fetchone()
         return row[0] if row else None
 
-    def set_pin(self, pin_plain: str):
+    def set_pin(self, pin_plain: str, profile_id: str = None):
         h = hashlib.sha256(pin_plain.encode("utf-8")).hexdigest()
-        self.set_setting("pin_sha256", h)
+        self.set_setting("pin_sha256", h, profile_id)
+
+    def set_admin_pin(self, pin_plain: str):
+        """컴퓨터 전체 설정(종료, 프로필 추가, 백업/복원, 원격 조회 등)용 관리자 PIN."""
+        h = hashlib.sha256(pin_plain.encode("utf-8")).hexdigest()
+        self.set_setting("admin_pin_sha256", h)
+        # 원격 조회는 관리자 설정이므로 관리자 PIN을 바꾸면 토큰도 새로 발급 (알려진 토큰 무효화)
+        self.rotate_api_token()
+
+    def get_api_token(self) -> str:
+        """원격 조회(http_api) 토큰. 설치마다 무작위로 만들어 컴퓨터 공통 설정에 저장."""
+        return self.get_setting("http_token") or self.rotate_api_token()
 
-    def verify_pin(self, pin_plain: str) -> bool:
-        stored = self.get_setting("pin_sha256")
+    def rotate_api_token(self) -> str:
+        token = secrets.token_urlsafe(24)
+        self.set_setting("http_token", token)
+        return token
+
+    def verify_pin(self, pin_plain: str, profile_id: str = None) -> bool:
+        stored = self.get_setting("pin_sha256", profile_id)
+        if not stored:
+            return False
+        return stored == hashlib.sha256(pin_plain.encode("utf-8")).hexdigest()
+
+    def verify_admin_pin(self, pin_plain: str) -> bool:
+        stored = self.get_setting("admin_pin_sha256")
         if not stored:
             return False
         return stored == hashlib.sha256(pin_plain.encode("utf-8")).hexdigest()
 
+    # ── 이벤트 로그 ──
+    # 5초마다의 앱 샘플과 하트비트는 행을 고쳐 쓰지 않고 events에 추가만 한다.
+    # snapshot_events가 쌓인 이벤트를 app_usage와 last_heartbeat로 합치고 지우므로
+    # 시작 시 복구는 마지막 스냅샷 이후의 이벤트만 다시 적용하면 된다.
+    # 조회 메서드는 아직 합쳐지지 않은 이벤트도 더해서 보여 준다.
+
+    def append_event(self, kind: str, session_id: int = None, app_name: str = None,
+                     seconds: int = None, at: datetime = None):
+        """kind: app(앱 샘플), trim(유휴 구간 차감), heartbeat, lock, unlock."""
+        self.conn.execute(
+            "INSERT INTO events (ts, profile_id, kind, session_id, app_name, seconds) VALUES (?,?,?,?,?,?)",
+            ((at or datetime.now()).isoformat(), self.profile_id, kind, session_id, app_name, seconds),
+        )
+        self.conn.commit()
+        self._fresh_events.add(self.profile_id)
+
+    def heartbeat(self, at: datetime = None):
+        """살아 있음을 기록. 직전 하트비트 이후 다른 이벤트를 기록했으면 그 시각으로 충분하므로 생략."""
+        if self.profile_id in self._fresh_events:
+            self._fresh_events.discard(self.profile_id)
+            return
+        self.append_event("heartbeat", at=at)
+        self._fresh_events.discard(self.profile_id)
+
+    def last_heartbeat(self, profile_id: str = None):
+        """프로필의 마지막 생존 시각 (ISO 문자열): 스냅샷된 하트비트와 대기 중인 이벤트 중 늦은 것."""
+        profile_id = profile_id or self.profile_id
+        stored = self.get_setting("last_heartbeat", profile_id)
+        rows = self._compacted("SELECT MAX(ts) FROM events WHERE profile_id=?", (profile_id,))
+        pending = rows[0][0] if rows else None
+        return max(filter(None, (stored, pending)), default=None)
+
+    def snapshot_events(self) -> int:
+        """대기 중인 이벤트를 app_usage(세션·앱별 누적)와 프로필별 last_heartbeat에 합치고
+        로그에서 지운다 (트랜잭션 하나). 합친 이벤트 수를 반환."""
+        cur = self.conn.cursor()
+        cur.execute("SELECT MAX(seq) FROM events")
+        last_seq = cur.fetchone()[0]
+        if last_seq is None:
+            return 0
+        cur.execute(
+            "SELECT ts, profile_id, kind, session_id, app_name, seconds FROM events WHERE seq <= ? ORDER BY seq",
+            (last_seq,),
+        )
+        apps = {}  # (세션, 앱) -> [첫 샘플 시각, 프로필, 초]
+        seen = {}  # 프로필 -> 마지막 이벤트 시각
+        count = 0
+        for ts, profile_id, kind, session_id, app_name, seconds in cur.fetchall():
+            count += 1
+            seen[profile_id] = max(seen.get(profile_id, ts), ts)
+            if kind in ("app", "trim") and session_id is not None and app_name:
+                entry = apps.setdefault((session_id, app_name), [ts, profile_id, 0])
+                entry[2] += (seconds or 0) if kind == "app" else -(seconds or 0)
+        try:
+            for (session_id, app_name), (started_at, profile_id, seconds) in apps.items():
+                cur.execute(
+                    "UPDATE app_usage SET duration_seconds = MAX(0, COALESCE(duration_seconds, 0) + ?) "
+                    "WHERE id = (SELECT MAX(id) FROM app_usage WHERE session_id=? AND app_name=?)",
+                    (seconds, session_id, app_name),
+                )
+                if cur.rowcount == 0 and seconds > 0:
+                    # 그사이 지운 세션의 이벤트는 버린다
+                    cur.execute(
+                        "INSERT INTO app_usage (session_id, app_name, started_at, duration_seconds, category, "
+                        "profile_id) SELECT ?,?,?,?,?,? WHERE EXISTS (SELECT 1 FROM sessions WHERE id=?)",
+                        (session_id, app_name, started_at, seconds, self.categorize(app_name), profile_id,
+                         session_id),
+                    )
+            cur.executemany(
+                """
+                INSERT INTO settings (profile_id, key, value) VALUES (?, 'last_heartbeat', ?)
+                ON CONFLICT(profile_id, key) DO UPDATE SET value = MAX(COALESCE(value, ''), excluded.value)
+                """,
+                list(seen.items()),
+            )
+            cur.execute("DELETE FROM events WHERE seq <= ?", (last_seq,))
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        self.notify_changed("app_usage")
+        self.notify_changed("settings")
+        return count
+
     # App usage tracking
     def record_app_usage(self, session_id: int, app_name: str, interval: int = 5):
-        """포그라운드 앱 기록. 같은 세션/앱이면 interval초만큼 누적, 아니면 새 레코드."""
+        """포그라운드 앱 기록. 이벤트 로그에 추가만 하고, 같은 세션/앱의 누적은 스냅샷 때 한다."""
+        self.append_event("app", session_id, app_name, interval)
+        self.notify_changed("app_usage", datetime.now().date())
+
+    def trim_app_usage(self, session_id: int, seconds: int):
+        """세션의 마지막 앱 기록에서 seconds만큼 차감 (유휴 구간에 누적된 샘플 제거)."""
+        if seconds <= 0:
+            return
         cur = self.conn.cursor()
         cur.execute(
-            "SELECT id, duration_seconds FROM app_usage "
-            "WHERE session_id=? AND app_name=? "
-            "ORDER BY id DESC LIMIT 1",
-            (session_id, app_name),
+            "SELECT app_name FROM events WHERE session_id=? AND kind='app' ORDER BY seq DESC LIMIT 1",
+            (session_id,),
         )
         row = cur.fetchone()
-        if row:
-            new_dur = (row["duration_seconds"] or 0) + interval
-            cur.execute(
-                "UPDATE app_usage SET duration_seconds=? WHERE id=?",
-                (new_dur, row["id"]),
-            )
-        else:
-            cur.execute(
-                "INSERT INTO app_usage (session_id, app_name, started_at, duration_seconds) VALUES (?,?,?,?)",
-                (session_id, app_name, datetime.now().isoformat(), interval),
-            )
-        self.conn.commit()
+        if row is None:
+            cur.execute("SELECT app_name FROM app_usage WHERE session_id=? ORDER BY id DESC LIMIT 1", (session_id,))
+            row = cur.fetchone()
+        if row is None:
+            return
+        self.append_event("trim", session_id, row[0], seconds)
+        self.notify_changed("app_usage", datetime.now().date())
 
     def get_app_usage_for_date(self, d: date):
         """날짜별 앱 사용 요약 (앱별 총 사용시간, 내림차순)."""
@@ -178,16 +629,230 @@ class Database:
             SELECT au.app_name, SUM(au.duration_seconds) as total_seconds
             FROM app_usage au
             JOIN sessions s ON au.session_id = s.id
-            WHERE s.start_ts < ? AND COALESCE(s.end_ts, ?) > ?
+            WHERE s.profile_id = ? AND s.start_ts < ? AND COALESCE(s.end_ts, ?) > ?
             GROUP BY au.app_name
             ORDER BY total_seconds DESC
             """,
-            (day_end.isoformat(), now_iso, day_start.isoformat()),
+            (self.profile_id, day_end.isoformat(), now_iso, day_start.isoformat()),
         )
+        return self._merge_archived_apps([dict(r) for r in cur.fetchall()], day_start, day_end, d, d)
+
+    def get_app_usage_for_range(self, start: date, end: date):
+        """start~end(포함) 기간의 앱별 총 사용시간 (내림차순)."""
+        cur = self.conn.cursor()
+        range_start = datetime.combine(start, datetime.min.time())
+        range_end = datetime.combine(end, datetime.min.time()) + timedelta(days=1)
+        now_iso = datetime.now().isoformat()
+        cur.execute(
+            """
+            SELECT au.app_name, SUM(au.duration_seconds) as total_seconds
+            FROM app_usage au
+            JOIN sessions s ON au.session_id = s.id
+            WHERE s.profile_id = ? AND s.start_ts < ? AND COALESCE(s.end_ts, ?) > ?
+            GROUP BY au.app_name
+            ORDER BY total_seconds DESC
+            """,
+            (self.profile_id, range_end.isoformat(), now_iso, range_start.isoformat()),
+        )
+        return self._merge_archived_apps([dict(r) for r in cur.fetchall()], range_start, range_end, start, end)
+
+    def _merge_archived_apps(self, usages, range_start: datetime, range_end: datetime,
+                             start: date, end: date):
+        """SQLite 앱 사용 집계에 아직 스냅샷되지 않은 이벤트, 일별 합계로 압축된 날,
+        아카이브된 기간의 집계를 더한다."""
+        extra = [
+            (r["app_name"], r["total_seconds"])
+            for r in self._compacted(
+                f"""
+                SELECT e.app_name, SUM({_EVENT_SECONDS}) AS total_seconds
+                FROM events e
+                JOIN sessions s ON e.session_id = s.id
+                WHERE e.kind IN ('app', 'trim') AND s.profile_id = ? AND s.start_ts < ?
+                      AND COALESCE(s.end_ts, ?) > ?
+                GROUP BY e.app_name
+                """,
+                (self.profile_id, range_end.isoformat(), datetime.now().isoformat(), range_start.isoformat()),
+            )
+        ]
+        extra += [
+            (r["app_name"], r["total_seconds"])
+            for r in self._compacted(
+                "SELECT app_name, SUM(total_seconds) AS total_seconds FROM daily_app_totals "
+                "WHERE profile_id = ? AND day BETWEEN ? AND ? GROUP BY app_name",
+                (self.profile_id, start.isoformat(), end.isoformat()),
+            )
+        ]
+        if self.archive:
+            extra += self.archive.app_totals(range_start, range_end).items()
+        if not extra:
+            return usages
+        totals = {u["app_name"]: u["total_seconds"] or 0 for u in usages}
+        for name, secs in extra:
+            totals[name] = totals.get(name, 0) + secs
+        return [
+            {"app_name": name, "total_seconds": secs}
+            for name, secs in sorted(totals.items(), key=lambda kv: kv[1], reverse=True)
+        ]
+
+    # ── 카테고리 ──
+
+    def _category_matcher(self):
+        if self._categories is None:
+            from categories import CategoryMatcher
+            try:
+                rules = [(r["kind"], r["pattern"], r["category"]) for r in self.get_category_rules()]
+            except sqlite3.OperationalError:
+                rules = []  # 규칙 테이블이 없는 이전 버전 DB (읽기 전용으로 연 경우)
+            self._categories = CategoryMatcher(rules)
+        return self._categories
+
+    def categorize(self, app_name: str):
+        """앱 이름의 카테고리 (규칙에 없으면 None). 앱별로 캐시되어 dict 조회 한 번."""
+        return self._category_matcher().categorize(app_name)
+
+    def get_category_rules(self):
+        cur = self.conn.cursor()
+        cur.execute("SELECT id, kind, pattern, category FROM category_rules ORDER BY id")
+        return [dict(r) for r in cur.fetchall()]
+
+    def set_category_rules(self, rules) -> int:
+        """규칙 전체 교체 후 기존 기록을 다시 분류. rules: [(kind, pattern, category)].
+        잘못된 규칙이면 ValueError. 반환값: 카테고리가 바뀐 app_usage 행 수."""
+        from categories import CategoryMatcher
+        rules = [tuple(r) for r in rules]
+        matcher = CategoryMatcher(rules)  # 저장 전에 검증
+        cur = self.conn.cursor()
+        try:
+            cur.execute("DELETE FROM category_rules")
+            cur.executemany(
+                "INSERT INTO category_rules (kind, pattern, category) VALUES (?,?,?)", rules
+            )
+            self._categories = matcher
+            changed = self._recategorize(cur)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            self._categories = None
+            raise
+        self.notify_changed("app_usage")
+        return changed
+
+    def recategorize(self) -> int:
+        """현재 규칙으로 app_usage.category를 다시 채운다 (병합 등으로 들어온 행 포함)."""
+        changed = self._recategorize(self.conn.cursor())
+        self.conn.commit()
+        if changed:
+            self.notify_changed("app_usage")
+        return changed
+
+    def _recategorize(self, cur) -> int:
+        # UPDATE 한 번으로 처리. 매처가 앱별로 캐시하므로 계산은 행 수가 아닌 앱 수만큼
+        cur.execute(
+            "UPDATE app_usage SET category = comtime_category(app_name) "
+            "WHERE category IS NOT comtime_category(app_name)"
+        )
+        changed = cur.rowcount
+        cur.execute(
+            "UPDATE daily_app_totals SET category = comtime_category(app_name) "
+            "WHERE category IS NOT comtime_category(app_name)"
+        )
+        return changed + cur.rowcount
+
+    def get_category_totals_for_date(self, d: date):
+        """날짜별 카테고리 사용 시간 [{category, total_seconds}] (내림차순)."""
+        return [
+            {"category": r["category"], "total_seconds": r["total_seconds"]}
+            for r in self.get_category_daily_totals(d, d)
+        ]
+
+    def get_category_daily_totals(self, start: date, end: date):
+        """start~end(포함) 날짜별·카테고리별 사용 시간 [{date, category, total_seconds}].
+        분류되지 않은 프로그램은 '기타'. 날짜 순, 같은 날짜는 사용 시간 내림차순."""
+        from categories import UNCATEGORIZED
+        range_start = datetime.combine(start, datetime.min.time())
+        range_end = datetime.combine(end, datetime.min.time()) + timedelta(days=1)
+        cur = self.conn.cursor()
+        cur.execute(
+            """
+            SELECT substr(s.start_ts, 1, 10) AS day,
+                   COALESCE(au.category, ?) AS category,
+                   SUM(au.duration_seconds) AS total_seconds
+            FROM app_usage au
+            JOIN sessions s ON au.session_id = s.id
+            WHERE s.profile_id = ? AND s.start_ts >= ? AND s.start_ts < ?
+            GROUP BY day, category
+            """,
+            (UNCATEGORIZED, self.profile_id, range_start.isoformat(), range_end.isoformat()),
+        )
+        totals = {(r["day"], r["category"]): r["total_seconds"] or 0 for r in cur.fetchall()}
+        # 아직 스냅샷되지 않은 앱 샘플
+        for r in self._compacted(
+            f"""
+            SELECT substr(s.start_ts, 1, 10) AS day, e.app_name, SUM({_EVENT_SECONDS}) AS total_seconds
+            FROM events e
+            JOIN sessions s ON e.session_id = s.id
+            WHERE e.kind IN ('app', 'trim') AND s.profile_id = ? AND s.start_ts >= ? AND s.start_ts < ?
+            GROUP BY day, e.app_name
+            """,
+            (self.profile_id, range_start.isoformat(), range_end.isoformat()),
+        ):
+            key = (r["day"], self.categorize(r["app_name"]) or UNCATEGORIZED)
+            totals[key] = totals.get(key, 0) + (r["total_seconds"] or 0)
+        for r in self._compacted(
+            """
+            SELECT day, COALESCE(category, ?) AS category, SUM(total_seconds) AS total_seconds
+            FROM daily_app_totals
+            WHERE profile_id = ? AND day BETWEEN ? AND ?
+            GROUP BY day, category
+            """,
+            (UNCATEGORIZED, self.profile_id, start.isoformat(), end.isoformat()),
+        ):
+            key = (r["day"], r["category"])
+            totals[key] = totals.get(key, 0) + (r["total_seconds"] or 0)
+        if self.archive:
+            d = start
+            while d <= end:
+                day_start = datetime.combine(d, datetime.min.time())
+                for name, secs in self.archive.app_totals(day_start, day_start + timedelta(days=1)).items():
+                    key = (d.isoformat(), self.categorize(name) or UNCATEGORIZED)
+                    totals[key] = totals.get(key, 0) + secs
+                d += timedelta(days=1)
+        rows = [
+            {"date": day, "category": cat, "total_seconds": secs}
+            for (day, cat), secs in totals.items()
+        ]
+        rows.sort(key=lambda r: (r["date"], -r["total_seconds"]))
+        return rows
+
+    def replace_app_titles(self, d: date, app_name: str, rows, profile_id: str = None):
+        """프로필(기본: 현재)/앱/날짜의 창 제목 top-K를 통째로 교체. rows: [(title, seconds, error)]."""
+        profile_id = profile_id or self.profile_id
+        cur = self.conn.cursor()
+        cur.execute(
+            "DELETE FROM app_titles WHERE profile_id=? AND day=? AND app_name=?",
+            (profile_id, d.isoformat(), app_name),
+        )
+        cur.executemany(
+            "INSERT INTO app_titles (profile_id, day, app_name, title, seconds, error) VALUES (?,?,?,?,?,?)",
+            [(profile_id, d.isoformat(), app_name, t, secs, err) for t, secs, err in rows],
+        )
+        self.conn.commit()
+        self.notify_changed("app_titles", d)
+
+    def get_app_titles_for_date(self, d: date, app_name: str = None, profile_id: str = None):
+        """프로필(기본: 현재)의 날짜별 창 제목 top-K (사용 시간 내림차순). error는 과대 추정 가능한 최대 초."""
+        cur = self.conn.cursor()
+        sql = "SELECT app_name, title, seconds, error FROM app_titles WHERE profile_id=? AND day=?"
+        params = [profile_id or self.profile_id, d.isoformat()]
+        if app_name is not None:
+            sql += " AND app_name=?"
+            params.append(app_name)
+        cur.execute(sql + " ORDER BY seconds DESC", params)
         return [dict(r) for r in cur.fetchall()]
 
     def delete_app_usage_by_name_and_date(self, app_name: str, d: date):
         """특정 날짜의 특정 앱 사용 기록 전체 삭제."""
+        self.snapshot_events()  # 대기 중인 샘플이 삭제 후 다시 더해지지 않도록
         cur = self.conn.cursor()
         day_start = datetime.combine(d, datetime.min.time())
         day_end = day_start + timedelta(days=1)
@@ -197,12 +862,51 @@ class Database:
             DELETE FROM app_usage WHERE id IN (
                 SELECT au.id FROM app_usage au
                 JOIN sessions s ON au.session_id = s.id
-                WHERE au.app_name=? AND s.start_ts < ? AND COALESCE(s.end_ts, ?) > ?
+                WHERE au.app_name=? AND s.profile_id = ? AND s.start_ts < ? AND COALESCE(s.end_ts, ?) > ?
             )
             """,
-            (app_name, day_end.isoformat(), now_iso, day_start.isoformat()),
+            (app_name, self.profile_id, day_end.isoformat(), now_iso, day_start.isoformat()),
+        )
+        cur.execute(
+            "DELETE FROM daily_app_totals WHERE profile_id=? AND day=? AND app_name=?",
+            (self.profile_id, d.isoformat(), app_name),
+        )
+        cur.execute(
+            "DELETE FROM app_titles WHERE profile_id=? AND day=? AND app_name=?",
+            (self.profile_id, d.isoformat(), app_name),
         )
         self.conn.commit()
+        # 세션이 여러 날에 걸칠 수 있으므로 날짜 한정 없이 알림
+        self.notify_changed("app_usage")
+        self.notify_changed("app_titles", d)
+
+
+# 이벤트의 app_usage 기여분: 앱 샘플은 더하고 유휴 차감은 뺀다
+_EVENT_SECONDS = "CASE e.kind WHEN 'app' THEN COALESCE(e.seconds, 0) ELSE -COALESCE(e.seconds, 0) END"
+
+
+def _readonly_uri(path: str) -> str:
+    """sqlite 읽기 전용 URI (file:/...?mode=ro). Windows 드라이브 경로도 처리."""
+    p = os.path.abspath(path).replace(os.sep, "/")
+    if not p.startswith("/"):
+        p = "/" + p
+    return "file:" + quote(p, safe="/:") + "?mode=ro"
+
+
+def _union_seconds(intervals) -> int:
+    """(start, end) 구간들의 합집합 길이(초). 겹치는 구간은 한 번만 센다."""
+    total = 0
+    cur_start = cur_end = None
+    for start, end in sorted(intervals):
+        if cur_end is None or start > cur_end:
+            if cur_end is not None:
+                total += int((cur_end - cur_start).total_seconds())
+            cur_start, cur_end = start, end
+        elif end > cur_end:
+            cur_end = end
+    if cur_end is not None:
+        total += int((cur_end - cur_start).total_seconds())
+    return total
 
 
 if __name__ == "__main__":
@@ -0,0 +1,256 @@
+"""여러 컴퓨터의 comtime.db를 한 번에 집계 (실습실 등).
+
+폴더 아래의 comtime.db 파일들을 찾아 각각 읽기 전용으로 열고, 프로세스 풀로 CPU 코어마다
+나눠 처리한다. 파일마다 SQL 두 번으로 기간 전체를 집계한다.
+- 날짜별 총 사용 시간: 재귀 CTE로 자정을 넘는 세션을 나누고, 윈도 함수로 겹치는 구간
+  (병합한 다른 컴퓨터 기록)을 한 번만 센다 (Database.get_daily_totals와 같은 결과)
+- 날짜별·프로그램별 사용 시간: 세션 시작 날짜 기준 GROUP BY
+기록 압축(retention.py)으로 남은 일별 합계와 아직 스냅샷되지 않은 이벤트 로그의 앱 샘플도
+함께 더한다. 월별 아카이브(<이름>_archive/)는
+DB 파일만 모아 오는 경우를 기준으로 하여 읽지 않는다.
+
+결과는 하나로 합쳐 CSV 또는 JSONL로 저장한다.
+    daily.<형식>   컴퓨터·프로필·날짜별 총 사용 시간
+    apps.<형식>    컴퓨터·프로필·날짜·프로그램별 사용 시간
+
+    python src/fleet.py /share/comtime --from 2026-03-02 --to 2026-06-30 --out fleet_out
+    python src/fleet.py /share/comtime --days 7 --format jsonl --out fleet_out
+"""
+import csv
+import json
+import os
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+
+from db import DEFAULT_PROFILE, _readonly_uri
+
+DAILY_FIELDS = ("machine", "device_id", "profile", "date", "total_seconds")
+APP_FIELDS = ("machine", "device_id", "profile", "date", "app_name", "category", "total_seconds")
+
+_SKIP_DIRS = ("_backups", "_archive")
+
+# :lo, :hi, :now 는 ISO 문자열. 세션 구간을 [lo, hi)로 자르고 자정을 넘는 구간만 날짜별로 나눈 뒤,
+# (프로필, 날짜)별로 시작 순 정렬해 앞선 구간들의 최대 종료 시각(reach) 이후 부분만 더한다
+# = 겹치는 구간의 합집합 길이 (Database._union_seconds와 같은 값, 초 미만은 반올림).
+_DAILY_SQL = """
+WITH RECURSIVE
+iv(profile_id, s, e) AS (
+    SELECT {profile}, MAX(start_ts, :lo), MIN(COALESCE(end_ts, :now), :hi)
+    FROM sessions
+    WHERE start_ts < :hi AND COALESCE(end_ts, :now) > :lo
+),
+seg(profile_id, s, e, rest) AS (
+    SELECT profile_id, s,
+           CASE WHEN substr(e, 1, 10) = substr(s, 1, 10) THEN e ELSE date(s, '+1 day') || 'T00:00:00' END, e
+    FROM iv WHERE s < e
+    UNION ALL
+    SELECT profile_id, e,
+           CASE WHEN substr(rest, 1, 10) = substr(e, 1, 10) THEN rest ELSE date(e, '+1 day') || 'T00:00:00' END,
+           rest
+    FROM seg WHERE e < rest
+),
+marked AS (
+    SELECT profile_id, substr(s, 1, 10) AS day, s, e,
+           MAX(e) OVER (PARTITION BY profile_id, substr(s, 1, 10) ORDER BY s
+                        ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING) AS reach
+    FROM seg
+)
+SELECT profile_id, day,
+       CAST(SUM(MAX(0, julianday(e) - julianday(MAX(s, COALESCE(reach, s))))) * 86400 + 0.5 AS INTEGER)
+FROM marked
+GROUP BY profile_id, day
+"""
+
+# sessions(작은 표)를 먼저 훑고 app_usage는 idx_app_usage_session으로 찾는다 (CROSS JOIN = 조인 순서 고정).
+# 몇 년치가 쌓인 파일에서 한 학기만 볼 때 app_usage 전체를 훑지 않도록.
+_APPS_SQL = """
+SELECT {profile}, substr(s.start_ts, 1, 10) AS day, au.app_name, {category}, SUM(au.duration_seconds)
+FROM sessions s
+CROSS JOIN app_usage au ON au.session_id = s.id
+WHERE s.start_ts >= :lo AND s.start_ts < :hi
+GROUP BY 1, 2, 3
+"""
+
+
+# 스냅샷 전 이벤트 로그의 앱 샘플 (Database.snapshot_events가 app_usage에 합치기 전 분량)
+_PENDING_SQL = """
+SELECT {profile}, substr(s.start_ts, 1, 10) AS day, e.app_name,
+       SUM(CASE e.kind WHEN 'app' THEN COALESCE(e.seconds, 0) ELSE -COALESCE(e.seconds, 0) END)
+FROM events e
+JOIN sessions s ON e.session_id = s.id
+WHERE e.kind IN ('app', 'trim') AND s.start_ts >= :lo AND s.start_ts < :hi
+GROUP BY 1, 2, 3
+"""
+
+
+def find_databases(directory: str):
+    """directory 아래의 *.db 파일 (백업/아카이브 폴더 제외), 경로순."""
+    found = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if not d.endswith(_SKIP_DIRS))
+        found += [os.path.join(root, f) for f in sorted(files) if f.endswith(".db")]
+    return found
+
+
+def _columns(conn, table: str) -> set:
+    return {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def summarize_file(path: str, start: date, end: date, now: str = None) -> dict:
+    """DB 파일 하나를 집계. 프로세스 풀 작업 단위라 표준 라이브러리와 sqlite3만 쓴다.
+
+    {"path", "device_id", "daily": [(profile, date, 초)], "apps": [(profile, date, 앱, 카테고리, 초)],
+     "error"}
+    """
+    from categories import UNCATEGORIZED
+    result = {"path": path, "device_id": None, "daily": [], "apps": [], "error": None}
+    params = {
+        "lo": datetime.combine(start, datetime.min.time()).isoformat(),
+        "hi": datetime.combine(end + timedelta(days=1), datetime.min.time()).isoformat(),
+        "now": now or datetime.now().isoformat(),
+    }
+    try:
+        conn = sqlite3.connect(_readonly_uri(path), uri=True)
+    except sqlite3.Error as e:
+        result["error"] = str(e)
+        return result
+    try:
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        if not {"sessions", "app_usage"} <= tables:
+            result["error"] = "ComTime DB가 아닙니다"
+            return result
+        if "settings" in tables:
+            row = conn.execute("SELECT value FROM settings WHERE key='device_id'").fetchone()
+            result["device_id"] = row[0] if row else None
+        names = {}
+        if "profiles" in tables:
+            names = dict(conn.execute("SELECT id, name FROM profiles"))
+        session_cols = _columns(conn, "sessions")
+        app_cols = _columns(conn, "app_usage")
+        profile = "profile_id" if "profile_id" in session_cols else f"'{DEFAULT_PROFILE}'"
+        if "category" in app_cols:
+            category = f"COALESCE(au.category, '{UNCATEGORIZED}')"
+        else:
+            # 카테고리 도입 전 DB: 기본 규칙으로 분류
+            from categories import CategoryMatcher, DEFAULT_RULES
+            matcher = CategoryMatcher(DEFAULT_RULES)
+            conn.create_function("comtime_category", 1, matcher.categorize, deterministic=True)
+            category = f"COALESCE(comtime_category(au.app_name), '{UNCATEGORIZED}')"
+
+        daily = {}
+        for pid, day, secs in conn.execute(_DAILY_SQL.format(profile=profile), params):
+            daily[(pid, day)] = secs or 0
+        apps = {}
+        s_profile = "s." + profile if profile == "profile_id" else profile
+        for pid, day, app, cat, secs in conn.execute(
+            _APPS_SQL.format(profile=s_profile, category=category), params
+        ):
+            apps[(pid, day, app)] = [cat, secs or 0]
+        if "events" in tables:
+            pending = conn.execute(_PENDING_SQL.format(profile=s_profile), params).fetchall()
+            if pending:
+                # 스냅샷 때처럼 그 DB의 규칙으로 분류
+                from categories import CategoryMatcher
+                matcher = CategoryMatcher(conn.execute("SELECT kind, pattern, category FROM category_rules"))
+                for pid, day, app, secs in pending:
+                    entry = apps.setdefault((pid, day, app), [matcher.categorize(app) or UNCATEGORIZED, 0])
+                    entry[1] += secs or 0
+        # 일별 합계로 압축된 날 (retention.py)
+        if "daily_totals" in tables:
+            for pid, day, secs in conn.execute(
+                "SELECT profile_id, day, total_seconds FROM daily_totals WHERE day BETWEEN ? AND ?",
+                (start.isoformat(), end.isoformat()),
+            ):
+                daily[(pid, day)] = daily.get((pid, day), 0) + secs
+            for pid, day, app, cat, secs in conn.execute(
+                "SELECT profile_id, day, app_name, category, total_seconds FROM daily_app_totals "
+                "WHERE day BETWEEN ? AND ?",
+                (start.isoformat(), end.isoformat()),
+            ):
+                entry = apps.setdefault((pid, day, app), [cat or UNCATEGORIZED, 0])
+                entry[1] += secs
+    except sqlite3.Error as e:
+        result["error"] = str(e)
+        return result
+    finally:
+        conn.close()
+    result["daily"] = sorted((names.get(pid, pid), day, secs) for (pid, day), secs in daily.items())
+    result["apps"] = sorted(
+        (names.get(pid, pid), day, app, cat, secs) for (pid, day, app), (cat, secs) in apps.items()
+    )
+    return result
+
+
+def _summarize_args(args):
+    return summarize_file(*args)
+
+
+def aggregate(paths, start: date, end: date, workers: int = None, root: str = None):
+    """파일들을 프로세스 풀로 집계해 (daily 행, apps 행, 오류 [(경로, 메시지)])를 반환.
+
+    machine은 root 기준 상대 경로(확장자 제외)로, 파일을 모은 폴더 구조를 그대로 쓴다.
+    """
+    now = datetime.now().isoformat()
+    jobs = [(p, start, end, now) for p in paths]
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_summarize_args, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    else:
+        results = [summarize_file(*job) for job in jobs]
+    daily, apps, errors = [], [], []
+    for r in results:
+        if r["error"]:
+            errors.append((r["path"], r["error"]))
+            continue
+        machine = os.path.splitext(os.path.relpath(r["path"], root) if root else r["path"])[0]
+        daily += [(machine, r["device_id"]) + row for row in r["daily"]]
+        apps += [(machine, r["device_id"]) + row for row in r["apps"]]
+    return daily, apps, errors
+
+
+def write_rows(path: str, fields, rows, fmt: str):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            w = csv.writer(f)
+            w.writerow(fields)
+            w.writerows(rows)
+        else:
+            for row in rows:
+                f.write(json.dumps(dict(zip(fields, row)), ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from cli import _add_period_args, _fmt_duration, _period
+
+    parser = argparse.ArgumentParser(description="여러 컴퓨터의 comtime.db 집계")
+    parser.add_argument("directory", help="comtime.db 파일들을 모아 둔 폴더")
+    _add_period_args(parser, 7)
+    parser.add_argument("--out", default="fleet_out", help="결과 폴더 (기본 fleet_out)")
+    parser.add_argument("--format", choices=("csv", "jsonl"), default="csv")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 코어 수)")
+    args = parser.parse_args()
+    try:
+        start, end = _period(args)
+    except ValueError as e:
+        parser.error(str(e))
+    paths = find_databases(args.directory)
+    if not paths:
+        print(f"DB 파일이 없습니다: {args.directory}", file=sys.stderr)
+        sys.exit(1)
+    t0 = time.perf_counter()
+    daily, apps, errors = aggregate(paths, start, end, args.workers, root=args.directory)
+    elapsed = time.perf_counter() - t0
+    os.makedirs(args.out, exist_ok=True)
+    write_rows(os.path.join(args.out, f"daily.{args.format}"), DAILY_FIELDS, daily, args.format)
+    write_rows(os.path.join(args.out, f"apps.{args.format}"), APP_FIELDS, apps, args.format)
+    for path, error in errors:
+        print(f"건너뜀: {path}: {error}", file=sys.stderr)
+    total = sum(r[-1] for r in daily)
+    print(f"{start} ~ {end}, 파일 {len(paths) - len(errors)}/{len(paths)}개, {elapsed:.2f}초")
+    print(f"총 사용 시간: {_fmt_duration(total)} → {args.out}/daily.{args.format}, apps.{args.format}")
+    sys.exit(1 if errors else 0)
@@ -0,0 +1,308 @@
+"""포그라운드(활성) 앱 감지 - macOS / Windows / Linux(X11).
+
+5초마다 호출되므로 같은 창을 반복 샘플링할 때 프로세스 조회를 건너뛰도록
+(pid, 프로세스 시작 시각) 기준 이름 캐시를 모든 백엔드가 공유한다.
+pid가 재사용되어도 시작 시각이 달라지므로 다른 프로세스로 구분된다.
+"""
+import os
+import subprocess
+import sys
+
+_CACHE_MAX = 512
+
+
+def _is_self_app(name: str) -> bool:
+    """자기 자신(ComTime, Python 계열)인지 확인"""
+    lower = name.lower()
+    return lower.startswith("python") or lower.startswith("comtime") or lower.startswith("timelimiter")
+
+
+class _ProcessNameCache:
+    """(pid, 시작 시각) -> 앱 이름. 자기 자신은 None으로 저장해 필터링 결과도 캐시."""
+
+    def __init__(self):
+        self._names = {}
+
+    def resolve(self, pid, start_time, lookup):
+        key = (pid, start_time)
+        if key in self._names:
+            return self._names[key]
+        name = lookup(pid)
+        if name and _is_self_app(name):
+            name = None
+        if len(self._names) >= _CACHE_MAX:
+            self._names.clear()
+        self._names[key] = name
+        return name
+
+
+_process_names = _ProcessNameCache()
+
+
+# ── macOS ──
+
+def _foreground_darwin():
+    # 표시 이름(displayed name) 사용 - Electron 등 내부 프로세스명 대신 실제 앱 이름 반환
+    result = subprocess.run(
+        ["osascript", "-e",
+         'tell application "System Events" to get displayed name of first application process whose frontmost is true'],
+        capture_output=True, text=True, timeout=3,
+    )
+    if result.returncode == 0:
+        name = result.stdout.strip()
+        if name and not _is_self_app(name):
+            return name
+    return None
+
+
+def _title_darwin():
+    result = subprocess.run(
+        ["osascript", "-e",
+         'tell application "System Events" to get name of front window of first application process whose frontmost is true'],
+        capture_output=True, text=True, timeout=3,
+    )
+    if result.returncode == 0:
+        return result.stdout.strip() or None
+    return None
+
+
+# ── Windows ──
+
+class _Win32Backend:
+    """ctypes 버퍼/함수를 한 번만 만들고 재사용."""
+
+    _PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+
+    def __init__(self):
+        import ctypes
+        self._ctypes = ctypes
+        self._user32 = ctypes.windll.user32
+        self._kernel32 = ctypes.windll.kernel32
+        self._pid = ctypes.c_ulong()
+        self._exe_buf = ctypes.create_unicode_buffer(260)
+        self._size = ctypes.c_ulong(260)
+        self._times = [ctypes.c_ulonglong() for _ in range(4)]
+        self._last = None  # (hwnd, pid, name)
+
+    def _title(self, hwnd):
+        length = self._user32.GetWindowTextLengthW(hwnd)
+        if length <= 0:
+            return ""
+        buf = self._ctypes.create_unicode_buffer(length + 1)
+        self._user32.GetWindowTextW(hwnd, buf, length + 1)
+        return buf.value
+
+    def title(self):
+        hwnd = self._user32.GetForegroundWindow()
+        return self._title(hwnd) if hwnd else None
+
+    def _exe_name(self, h_proc):
+        self._size.value = len(self._exe_buf)
+        if not self._kernel32.QueryFullProcessImageNameW(
+            h_proc, 0, self._exe_buf, self._ctypes.byref(self._size)
+        ):
+            return None
+        exe_path = self._exe_buf.value
+        return os.path.splitext(os.path.basename(exe_path))[0] if exe_path else None
+
+    def foreground(self):
+        byref = self._ctypes.byref
+        hwnd = self._user32.GetForegroundWindow()
+        if not hwnd:
+            return None
+        self._user32.GetWindowThreadProcessId(hwnd, byref(self._pid))
+        pid = self._pid.value
+        # 같은 창 = 같은 프로세스: 프로세스 조회 없이 이전 결과 사용
+        if self._last and self._last[0] == hwnd and self._last[1] == pid:
+            return self._last[2]
+        name = None
+        h_proc = self._kernel32.OpenProcess(self._PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if h_proc:
+            try:
+                created, exited, kernel, user = self._times
+                self._kernel32.GetProcessTimes(
+                    h_proc, byref(created), byref(exited), byref(kernel), byref(user)
+                )
+                name = _process_names.resolve(pid, created.value, lambda _pid: self._exe_name(h_proc))
+            finally:
+                self._kernel32.CloseHandle(h_proc)
+        if not name:
+            # fallback: 윈도우 제목 사용
+            title = self._title(hwnd)
+            name = title if title and not _is_self_app(title) else None
+        self._last = (hwnd, pid, name)
+        return name
+
+
+# ── Linux (X11) ──
+
+def _proc_start_time(pid):
+    """/proc/<pid>/stat 의 starttime (부팅 후 clock tick)."""
+    with open(f"/proc/{pid}/stat", "rb") as f:
+        stat = f.read()
+    # comm에 공백/괄호가 있을 수 있으므로 마지막 ')' 이후부터 필드 분리
+    fields = stat[stat.rindex(b")") + 2:].split()
+    return int(fields[19])
+
+
+def _proc_name(pid):
+    """/proc/<pid>/exe 의 실행 파일 이름, 읽을 수 없으면 comm."""
+    try:
+        exe = os.readlink(f"/proc/{pid}/exe")
+        name = os.path.basename(exe).replace(" (deleted)", "")
+        if name:
+            return name
+    except OSError:
+        pass
+    try:
+        with open(f"/proc/{pid}/comm", encoding="utf-8", errors="replace") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+class _X11Backend:
+    """libX11을 ctypes로 로드해 디스플레이 연결을 계속 유지하며 _NET_ACTIVE_WINDOW 조회."""
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+        self._ctypes = ctypes
+        path = ctypes.util.find_library("X11")
+        if not path:
+            raise OSError("libX11 not found")
+        x = ctypes.cdll.LoadLibrary(path)
+        x.XOpenDisplay.restype = ctypes.c_void_p
+        x.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        x.XDefaultRootWindow.restype = ctypes.c_ulong
+        x.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        x.XInternAtom.restype = ctypes.c_ulong
+        x.XInternAtom.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int]
+        x.XGetWindowProperty.restype = ctypes.c_int
+        x.XGetWindowProperty.argtypes = [
+            ctypes.c_void_p, ctypes.c_ulong, ctypes.c_ulong, ctypes.c_long, ctypes.c_long,
+            ctypes.c_int, ctypes.c_ulong, ctypes.POINTER(ctypes.c_ulong),
+            ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_ulong),
+            ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_void_p),
+        ]
+        x.XFree.argtypes = [ctypes.c_void_p]
+        # 창이 사라진 뒤 조회하면 BadWindow 오류 → 기본 핸들러는 프로세스를 종료하므로 무시
+        handler_type = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p)
+        self._error_handler = handler_type(lambda _d, _e: 0)
+        x.XSetErrorHandler(self._error_handler)
+        display = x.XOpenDisplay(None)
+        if not display:
+            raise OSError("cannot open X display")
+        self._x = x
+        self._display = display
+        self._root = x.XDefaultRootWindow(display)
+        self._active_atom = x.XInternAtom(display, b"_NET_ACTIVE_WINDOW", False)
+        self._pid_atom = x.XInternAtom(display, b"_NET_WM_PID", False)
+        self._name_atom = x.XInternAtom(display, b"_NET_WM_NAME", False)
+        self._utf8_atom = x.XInternAtom(display, b"UTF8_STRING", False)
+        self._cardinal = 6   # XA_CARDINAL
+        self._window = 33    # XA_WINDOW
+        self._type = ctypes.c_ulong()
+        self._format = ctypes.c_int()
+        self._nitems = ctypes.c_ulong()
+        self._after = ctypes.c_ulong()
+        self._data = ctypes.c_void_p()
+        self._last = None  # (window, pid, start_time, name)
+
+    def _get_long(self, window, atom, req_type):
+        ct = self._ctypes
+        status = self._x.XGetWindowProperty(
+            self._display, window, atom, 0, 1, False, req_type,
+            ct.byref(self._type), ct.byref(self._format), ct.byref(self._nitems),
+            ct.byref(self._after), ct.byref(self._data),
+        )
+        if status != 0 or not self._data.value:
+            return None
+        try:
+            if self._nitems.value < 1 or self._format.value != 32:
+                return None
+            return ct.cast(self._data, ct.POINTER(ct.c_ulong))[0]
+        finally:
+            self._x.XFree(self._data)
+            self._data.value = None
+
+    def _get_utf8(self, window, atom):
+        ct = self._ctypes
+        status = self._x.XGetWindowProperty(
+            self._display, window, atom, 0, 1024, False, self._utf8_atom,
+            ct.byref(self._type), ct.byref(self._format), ct.byref(self._nitems),
+            ct.byref(self._after), ct.byref(self._data),
+        )
+        if status != 0 or not self._data.value:
+            return None
+        try:
+            if self._format.value != 8:
+                return None
+            return ct.string_at(self._data, self._nitems.value).decode("utf-8", errors="replace")
+        finally:
+            self._x.XFree(self._data)
+            self._data.value = None
+
+    def title(self):
+        window = self._get_long(self._root, self._active_atom, self._window)
+        return self._get_utf8(window, self._name_atom) if window else None
+
+    def foreground(self):
+        window = self._get_long(self._root, self._active_atom, self._window)
+        if not window:
+            return None
+        pid = self._get_long(window, self._pid_atom, self._cardinal)
+        if not pid:
+            return None
+        try:
+            start_time = _proc_start_time(pid)
+        except (OSError, ValueError, IndexError):
+            return None
+        if self._last and self._last[:3] == (window, pid, start_time):
+            return self._last[3]
+        name = _process_names.resolve(pid, start_time, _proc_name)
+        self._last = (window, pid, start_time, name)
+        return name
+
+
+_backend = None
+_backend_failed = False
+
+
+def _get_backend():
+    global _backend, _backend_failed
+    if _backend is None and not _backend_failed:
+        try:
+            if sys.platform == "win32":
+                _backend = _Win32Backend()
+            elif sys.platform.startswith("linux"):
+                _backend = _X11Backend()
+        except Exception:
+            _backend_failed = True
+    return _backend
+
+
+def get_foreground_app():
+    """현재 포그라운드(활성) 앱 이름을 반환. 실패 시 None."""
+    try:
+        if sys.platform == "darwin":
+            return _foreground_darwin()
+        backend = _get_backend()
+        if backend:
+            return backend.foreground()
+    except Exception:
+        pass
+    return None
+
+
+def get_foreground_title():
+    """현재 포그라운드 창 제목 (브라우저 탭/문서 이름). 실패 시 None."""
+    try:
+        if sys.platform == "darwin":
+            return _title_darwin()
+        backend = _get_backend()
+        if backend:
+            return backend.title()
+    except Exception:
+        pass
+    return None
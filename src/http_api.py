@@ -0,0 +1,310 @@
+"""홈 네트워크용 읽기 전용 HTTP/JSON 사용 통계 서버.
+
+부모가 휴대폰에서 오늘 사용 시간을 확인할 수 있도록 ComTime 안에서 asyncio 서버를
+별도 스레드로 띄운다. 기본값은 꺼짐이며, 설치마다 무작위로 만든 토큰(PIN을 바꾸면 새로 발급)을
+Authorization: Bearer 헤더로만 받는다. 인증에 연달아 실패한 주소는 잠시 차단한다.
+
+- GET /api/today                         오늘 요약 (총 사용 시간, 세션, 프로그램별 사용)
+- GET /api/day/YYYY-MM-DD                해당 날짜 요약
+- GET /api/range?start=YYYY-MM-DD&end=YYYY-MM-DD   날짜별 총 사용 시간
+
+SQLite 조회는 GUI 스레드가 아닌 서버 전용 읽기 전용 연결에서 실행되고, 같은 날짜에 대한
+동시 요청은 하나의 스냅샷을 공유한다. 지나간(종료된) 날짜 응답에는 ETag와
+Cache-Control을 붙여 If-None-Match 요청에 304로 응답한다. 스냅샷 키와 ETag에는 DB 세대 값
+(PRAGMA data_version)이 들어가므로 삭제, 병합, 압축, 보관, 복원 뒤에는 다시 조회한다.
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from urllib.parse import urlsplit, parse_qs
+
+from db import DEFAULT_PROFILE, Database
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+_TODAY_TTL = 2.0  # 오늘 데이터 스냅샷 유지 시간(초)
+_MAX_RANGE_DAYS = 366
+_MAX_SNAPSHOTS = 256
+_MAX_FAILURES = 5       # 이만큼 연달아 인증에 실패하면
+_LOCKOUT_SECONDS = 60   # 이 시간 동안 차단 (다시 실패할 때마다 두 배, 최대 _MAX_LOCKOUT)
+_MAX_LOCKOUT = 3600
+_MAX_CLIENTS = 256
+
+_STATUS_TEXT = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+}
+
+
+class _Lockout:
+    """주소별 연속 인증 실패 횟수. _MAX_FAILURES번 실패하면 점점 길게 차단한다."""
+
+    def __init__(self):
+        self._failures = {}  # 주소 -> (연속 실패 수, 차단 해제 시각)
+
+    def retry_after(self, addr) -> int:
+        """차단 중이면 남은 초, 아니면 0."""
+        _, until = self._failures.get(addr, (0, 0))
+        return max(0, int(until - time.monotonic() + 0.999))
+
+    def failed(self, addr):
+        count, _ = self._failures.get(addr, (0, 0))
+        count += 1
+        until = 0
+        if count >= _MAX_FAILURES:
+            until = time.monotonic() + min(_MAX_LOCKOUT, _LOCKOUT_SECONDS * 2 ** (count - _MAX_FAILURES))
+        if len(self._failures) >= _MAX_CLIENTS and addr not in self._failures:
+            now = time.monotonic()
+            self._failures = {a: v for a, v in self._failures.items() if v[1] > now}
+        self._failures[addr] = (count, until)
+
+    def succeeded(self, addr):
+        self._failures.pop(addr, None)
+
+
+class _Snapshots:
+    """키별 조회 결과 캐시. 동시 요청은 진행 중인 조회 하나를 함께 기다린다."""
+
+    def __init__(self, executor):
+        self._executor = executor
+        self._cache = {}     # key -> (expires_at, payload, etag)
+        self._inflight = {}  # key -> asyncio.Future
+
+    async def get(self, key, loader, ttl):
+        hit = self._cache.get(key)
+        if hit and (hit[0] is None or hit[0] > time.monotonic()):
+            return hit[1], hit[2]
+        fut = self._inflight.get(key)
+        if fut is None:
+            loop = asyncio.get_running_loop()
+            fut = loop.run_in_executor(self._executor, loader)
+            self._inflight[key] = fut
+            try:
+                payload = await fut
+            finally:
+                self._inflight.pop(key, None)
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            # key 마지막 요소가 DB 세대 값
+            etag = f'"{key[-1]}-' + hashlib.sha1(body).hexdigest()[:16] + '"'
+            expires = None if ttl is None else time.monotonic() + ttl
+            if len(self._cache) >= _MAX_SNAPSHOTS:
+                self._cache.clear()
+            self._cache[key] = (expires, (payload, body), etag)
+            return (payload, body), etag
+        await asyncio.shield(fut)
+        hit = self._cache[key]
+        return hit[1], hit[2]
+
+
+class StatsServer:
+    """백그라운드 스레드에서 실행되는 읽기 전용 통계 서버."""
+
+    def __init__(self, db_path: str, token: str, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 profile_id: str = DEFAULT_PROFILE):
+        self.db_path = db_path
+        self.profile_id = profile_id
+        self.token = token
+        self.host = host
+        self.port = port
+        self._db = None
+        # SQLite 연결은 이 단일 워커 스레드에서만 사용
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="comtime-http-db")
+        self._snapshots = _Snapshots(self._executor)
+        self._lockout = _Lockout()
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+
+    # ── 수명 주기 ──
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="comtime-http", daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+        if self._error:
+            raise self._error
+
+    def stop(self):
+        if self._loop and self._server:
+            self._loop.call_soon_threadsafe(self._server.close)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread:
+            self._thread.join(2)
+        self._executor.shutdown(wait=False)
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle, self.host, self.port)
+            )
+            if self.port == 0:
+                self.port = self._server.sockets[0].getsockname()[1]
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    # ── 데이터 조회 (DB 스레드) ──
+
+    def _database(self):
+        if self._db is None:
+            self._db = Database(self.db_path, readonly=True, profile_id=self.profile_id)
+        return self._db
+
+    def _load_day(self, d: date) -> dict:
+        db = self._database()
+        return {
+            "date": d.isoformat(),
+            "total_seconds": db.get_total_seconds_for_date(d),
+            "sessions": db.get_sessions_for_date(d),
+            "apps": db.get_app_usage_for_date(d),
+        }
+
+    def _load_range(self, start: date, end: date) -> dict:
+        days = self._database().get_daily_totals(start, end)
+        return {"start": start.isoformat(), "end": end.isoformat(), "days": days}
+
+    def _generation(self) -> int:
+        """다른 연결(ComTime, CLI, 병합 도구)이 커밋할 때마다 바뀌는 세대 값 (PRAGMA data_version)."""
+        db = self._database()
+        if db.poll_external_changes():
+            db._load_archive()  # 보관 파일이 새로 생겼을 수 있다
+        return db.generation(None)[0]
+
+    def _state(self, d: date):
+        """(세대 값, 닫힌 날짜인지). 지난 날짜이고 그 날짜에 걸친 진행 중 세션이 없으면 닫힌 날짜."""
+        gen = self._generation()
+        if d >= date.today():
+            return gen, False
+        open_s = self._database().get_open_session()
+        if not open_s:
+            return gen, True
+        try:
+            return gen, datetime.fromisoformat(open_s["start_ts"]).date() > d
+        except Exception:
+            return gen, False
+
+    # ── HTTP 처리 ──
+
+    def _authorized(self, headers: dict) -> bool:
+        """Authorization: Bearer 헤더만 받는다 (주소창의 토큰은 기록과 공유 링크에 남는다)."""
+        auth = headers.get("authorization", "")
+        if not auth.lower().startswith("bearer "):
+            return False
+        supplied = auth[7:].strip()
+        return bool(self.token) and hmac.compare_digest(supplied.encode("utf-8"), self.token.encode("utf-8"))
+
+    async def _route(self, path: str, query: dict):
+        """(key, loader, closed) 반환. 잘못된 요청은 ValueError, 없는 경로는 LookupError."""
+        if path == "/api/today":
+            d = date.today()
+            gen, _ = await self._in_db(self._state, d)
+            return ("day", d, gen), (lambda: self._load_day(d)), False
+        if path.startswith("/api/day/"):
+            d = date.fromisoformat(path[len("/api/day/"):])
+            gen, closed = await self._in_db(self._state, d)
+            return ("day", d, gen), (lambda: self._load_day(d)), closed
+        if path == "/api/range":
+            start = date.fromisoformat(query["start"][0])
+            end = date.fromisoformat(query.get("end", [date.today().isoformat()])[0])
+            if end < start or (end - start).days >= _MAX_RANGE_DAYS:
+                raise ValueError("invalid range")
+            gen, closed = await self._in_db(self._state, end)
+            return ("range", start, end, gen), (lambda: self._load_range(start, end)), closed
+        raise LookupError(path)
+
+    async def _in_db(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), 10)
+            headers = {}
+            while True:
+                line = await asyncio.wait_for(reader.readline(), 10)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                k, _, v = line.decode("latin-1").partition(":")
+                headers[k.strip().lower()] = v.strip()
+            parts = request_line.decode("latin-1").split()
+            if len(parts) < 2:
+                await self._respond(writer, 400, {"error": "bad request"})
+                return
+            method, target = parts[0], parts[1]
+            if method != "GET":
+                await self._respond(writer, 405, {"error": "method not allowed"})
+                return
+            peer = writer.get_extra_info("peername")
+            addr = peer[0] if peer else None
+            wait = self._lockout.retry_after(addr)
+            if wait:
+                await self._respond(writer, 429, {"error": "too many attempts"}, {"Retry-After": str(wait)})
+                return
+            if not self._authorized(headers):
+                self._lockout.failed(addr)
+                await self._respond(writer, 401, {"error": "unauthorized"}, {"WWW-Authenticate": "Bearer"})
+                return
+            self._lockout.succeeded(addr)
+            url = urlsplit(target)
+            query = parse_qs(url.query)
+            try:
+                key, loader, closed = await self._route(url.path, query)
+            except LookupError:
+                await self._respond(writer, 404, {"error": "not found"})
+                return
+            except (ValueError, KeyError):
+                await self._respond(writer, 400, {"error": "bad request"})
+                return
+            (_, body), etag = await self._snapshots.get(key, loader, None if closed else _TODAY_TTL)
+            if closed:
+                extra = {"ETag": etag, "Cache-Control": "private, max-age=86400"}
+                if headers.get("if-none-match") == etag:
+                    await self._respond(writer, 304, None, extra)
+                    return
+            else:
+                extra = {"Cache-Control": "private, no-cache"}
+            await self._respond(writer, 200, body, extra)
+        except Exception:
+            try:
+                await self._respond(writer, 500, {"error": "internal error"})
+            except Exception:
+                pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status: int, body, extra_headers=None):
+        if isinstance(body, dict):
+            body = json.dumps(body).encode("utf-8")
+        body = body or b""
+        lines = [
+            f"HTTP/1.1 {status} {_STATUS_TEXT.get(status, '')}",
+            "Connection: close",
+            f"Content-Length: {len(body)}",
+        ]
+        if status != 304:
+            lines.append("Content-Type: application/json; charset=utf-8")
+        for k, v in (extra_headers or {}).items():
+            lines.append(f"{k}: {v}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
@@ -0,0 +1,116 @@
+"""입력 유휴 시간 감지 - 플랫폼별 백엔드.
+
+모든 소스는 idle_seconds()로 마지막 키보드/마우스 입력 이후 경과 초를 반환하고,
+알 수 없으면 None을 반환한다 (이 경우 유휴 감지를 하지 않음).
+"""
+import sys
+
+
+class FakeIdleSource:
+    """테스트/시뮬레이션용. idle 값을 직접 지정."""
+
+    def __init__(self, idle=0.0):
+        self.idle = idle
+
+    def idle_seconds(self):
+        return self.idle
+
+
+class _Win32IdleSource:
+    def __init__(self):
+        import ctypes
+
+        class LASTINPUTINFO(ctypes.Structure):
+            _fields_ = [("cbSize", ctypes.c_uint), ("dwTime", ctypes.c_uint)]
+
+        self._ctypes = ctypes
+        self._user32 = ctypes.windll.user32
+        self._kernel32 = ctypes.windll.kernel32
+        self._kernel32.GetTickCount.restype = ctypes.c_uint
+        self._info = LASTINPUTINFO()
+        self._info.cbSize = ctypes.sizeof(LASTINPUTINFO)
+
+    def idle_seconds(self):
+        if not self._user32.GetLastInputInfo(self._ctypes.byref(self._info)):
+            return None
+        # GetTickCount는 약 49.7일마다 0으로 돌아가므로 32비트 범위에서 차이 계산
+        elapsed_ms = (self._kernel32.GetTickCount() - self._info.dwTime) & 0xFFFFFFFF
+        return elapsed_ms / 1000.0
+
+
+class _MacIdleSource:
+    _HID_SYSTEM_STATE = 1
+    _ANY_INPUT_EVENT = 0xFFFFFFFF
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+        path = ctypes.util.find_library("ApplicationServices")
+        if not path:
+            raise OSError("ApplicationServices not found")
+        cg = ctypes.cdll.LoadLibrary(path)
+        self._fn = cg.CGEventSourceSecondsSinceLastEventType
+        self._fn.restype = ctypes.c_double
+        self._fn.argtypes = [ctypes.c_int32, ctypes.c_uint32]
+
+    def idle_seconds(self):
+        return float(self._fn(self._HID_SYSTEM_STATE, self._ANY_INPUT_EVENT))
+
+
+class _X11IdleSource:
+    """MIT-SCREEN-SAVER 확장(libXss)의 idle 값 사용. 디스플레이 연결은 유지."""
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+
+        class XScreenSaverInfo(ctypes.Structure):
+            _fields_ = [
+                ("window", ctypes.c_ulong),
+                ("state", ctypes.c_int),
+                ("kind", ctypes.c_int),
+                ("til_or_since", ctypes.c_ulong),
+                ("idle", ctypes.c_ulong),
+                ("eventMask", ctypes.c_ulong),
+            ]
+
+        x11_path = ctypes.util.find_library("X11")
+        xss_path = ctypes.util.find_library("Xss")
+        if not x11_path or not xss_path:
+            raise OSError("libX11/libXss not found")
+        x = ctypes.cdll.LoadLibrary(x11_path)
+        xss = ctypes.cdll.LoadLibrary(xss_path)
+        x.XOpenDisplay.restype = ctypes.c_void_p
+        x.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        x.XDefaultRootWindow.restype = ctypes.c_ulong
+        x.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        xss.XScreenSaverAllocInfo.restype = ctypes.POINTER(XScreenSaverInfo)
+        xss.XScreenSaverQueryInfo.argtypes = [
+            ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(XScreenSaverInfo),
+        ]
+        display = x.XOpenDisplay(None)
+        if not display:
+            raise OSError("cannot open X display")
+        self._xss = xss
+        self._display = display
+        self._root = x.XDefaultRootWindow(display)
+        self._info = xss.XScreenSaverAllocInfo()
+
+    def idle_seconds(self):
+        if not self._xss.XScreenSaverQueryInfo(self._display, self._root, self._info):
+            return None
+        return self._info.contents.idle / 1000.0
+
+
+def create_idle_source():
+    """현재 플랫폼의 유휴 시간 소스. 지원하지 않거나 실패하면 None."""
+    try:
+        if sys.platform == "win32":
+            return _Win32IdleSource()
+        if sys.platform == "darwin":
+            return _MacIdleSource()
+        if sys.platform.startswith("linux"):
+            return _X11IdleSource()
+    except Exception:
+        pass
+    return None
@@ -0,0 +1,158 @@
+"""실행 중인 ComTime과 통신하는 로컬 제어 채널 (클라이언트, PyQt6 불필요).
+
+서버는 실행 중인 ComTime이 QLocalServer로 연다 (Unix: 도메인 소켓, Windows: 네임드 파이프).
+요청/응답은 한 줄짜리 텍스트 명령과 한 줄짜리 JSON이다.
+
+중복 실행 여부는 소켓 응답이 아니라 OS 파일 잠금(acquire_instance_lock)으로 판단한다.
+기존 창이 바쁘거나 두 개가 동시에 시작돼도 잠금은 한 프로세스만 잡는다. 잠금을 못 잡은 쪽은
+"user"만 보내고 종료하며, 소켓 정리(removeServer)는 잠금을 잡은 쪽만 한다.
+잠금 파일과 소켓은 OS 계정이 아니라 DB(comtime.db)마다 하나라서, 빠른 사용자 전환으로
+여러 계정이 로그인해도 한 컴퓨터(한 DB)에는 추적기가 하나만 실행된다.
+
+- raise        메인 창을 앞으로 가져오기
+- user <계정>  다른 OS 계정에서 실행을 시도함 (그 계정의 프로필로 전환하고 창 띄우기)
+- status       실행 여부, 잠금 여부, 오늘 사용 시간, 현재 프로그램, 창/트레이 모드, RSS
+
+사용 예: python src/ipc.py status
+"""
+import hashlib
+import json
+import os
+import socket
+import sys
+import threading
+
+COMMANDS = ("raise", "status")
+
+_instance_lock = None  # 잠금을 잡은 파일. 프로세스가 끝날 때까지 열어 둬야 잠금이 유지됨
+
+
+_UNIX_PATH_MAX = 100  # 도메인 소켓 경로 길이 제한(104~108바이트)보다 조금 짧게
+
+
+def default_db_path() -> str:
+    """main.py와 같은 규칙의 DB 경로: exe로 패키징된 경우 exe 위치, 스크립트는 src 폴더."""
+    if getattr(sys, "frozen", False):
+        base = os.path.dirname(sys.executable)
+    else:
+        base = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base, "comtime.db")
+
+
+def _db_key(db_path: str) -> str:
+    path = os.path.normcase(os.path.abspath(db_path or default_db_path()))
+    return hashlib.sha1(path.encode("utf-8")).hexdigest()[:12]
+
+
+def server_name(db_path: str = None) -> str:
+    """QLocalServer.listen()에 넘길 이름. OS 계정과 무관하게 DB마다 하나 (컴퓨터 전체에서 공유).
+    Windows: 네임드 파이프 이름, 그 외: DB 옆의 도메인 소켓 (경로가 너무 길면 /tmp)."""
+    if sys.platform == "win32":
+        return "comtime-" + _db_key(db_path)
+    path = os.path.splitext(os.path.abspath(db_path or default_db_path()))[0] + ".sock"
+    if len(path.encode("utf-8")) > _UNIX_PATH_MAX:
+        path = os.path.join("/tmp", f"comtime-{_db_key(db_path)}.sock")
+    return path
+
+
+def lock_path(db_path: str = None) -> str:
+    """단일 실행 잠금 파일 경로: DB 옆 (모든 OS 계정이 같은 파일을 잠근다)."""
+    return os.path.abspath(db_path or default_db_path()) + ".lock"
+
+
+def acquire_instance_lock(db_path: str = None) -> bool:
+    """DB의 단일 실행 잠금(fcntl.flock / msvcrt.locking)을 잡는다. 다른 ComTime이 잡고 있으면 False.
+    프로세스가 끝나면(비정상 종료 포함) OS가 풀어 준다. 이미 잡았으면 다시 True."""
+    global _instance_lock
+    if _instance_lock is not None:
+        return True
+    path = lock_path(db_path)
+    try:
+        f = open(path, "a+")
+    except OSError:
+        try:
+            f = open(path, "r")  # 다른 OS 계정이 만든 잠금 파일: 읽기로 열어도 잠글 수 있다
+        except OSError:
+            return False
+    try:
+        if sys.platform == "win32":
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return False
+    _instance_lock = f
+    return True
+
+
+def _pipe_request(payload: bytes, timeout: float, name: str):
+    """Windows 네임드 파이프 요청. 파이프 읽기에는 시간 제한이 없어서 작업 스레드에서 기다린다."""
+    result = []
+
+    def talk():
+        try:
+            # QLocalServer(Windows)는 \\.\pipe\<name> 네임드 파이프를 사용
+            with open(r"\\.\pipe" + "\\" + name, "r+b", buffering=0) as pipe:
+                pipe.write(payload)
+                result.append(pipe.readline())
+        except (OSError, ValueError):
+            pass
+
+    worker = threading.Thread(target=talk, name="comtime-ipc", daemon=True)
+    worker.start()
+    worker.join(timeout)
+    return result[0] if result else None
+
+
+def send_command(command: str, timeout: float = 0.5, db_path: str = None):
+    """명령을 보내고 응답(dict)을 반환. 실행 중인 ComTime이 없거나 timeout 안에 답이 없으면 None."""
+    payload = (command + "\n").encode("utf-8")
+    name = server_name(db_path)
+    try:
+        if sys.platform == "win32":
+            line = _pipe_request(payload, timeout, name)
+            if line is None:
+                return None
+        else:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(timeout)
+                sock.connect(name)
+                sock.sendall(payload)
+                line = sock.makefile("rb").readline()
+    except (OSError, ValueError):
+        return None
+    try:
+        return json.loads(line.decode("utf-8"))
+    except ValueError:
+        return None
+
+
+def handle_command(command: str, window) -> dict:
+    """서버 측 명령 처리. window는 MainWindow (raise_window, os_user_changed, status 제공)."""
+    command = command.strip()
+    if command == "raise":
+        window.raise_window()
+        return {"ok": True}
+    if command.startswith("user "):
+        window.os_user_changed(command[len("user "):].strip())
+        window.raise_window()
+        return {"ok": True}
+    if command == "status":
+        return dict(window.status(), ok=True)
+    return {"ok": False, "error": f"unknown command: {command}"}
+
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "status"
+    if cmd not in COMMANDS:
+        print(f"usage: {os.path.basename(sys.argv[0])} [{'|'.join(COMMANDS)}]", file=sys.stderr)
+        sys.exit(2)
+    result = send_command(cmd)
+    if result is None:
+        print(json.dumps({"running": False}))
+        sys.exit(1)
+    print(json.dumps(result, ensure_ascii=False))
@@ -1,6 +1,43 @@
 import sys
 import os
-import subprocess
+
+# DB 경로: exe로 패키징된 경우 exe 위치 기준, 스크립트 실행 시 스크립트 위치 기준
+if getattr(sys, "frozen", False):
+    _BASE_DIR = os.path.dirname(sys.executable)
+else:
+    _BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+_DB_PATH = os.path.join(_BASE_DIR, "comtime.db")
+
+# 아이콘 경로: frozen exe는 _MEIPASS(번들 임시 폴더), 스크립트는 프로젝트 루트
+if getattr(sys, "frozen", False):
+    _ICON_PATH = os.path.join(sys._MEIPASS, "comtime_icon.png")
+else:
+    _ICON_PATH = os.path.join(os.path.dirname(_BASE_DIR), "comtime_icon.png")
+
+import startup
+
+if __name__ == "__main__":
+    startup.init_timing(sys.argv)
+    # 이미 실행 중이면(단일 실행 잠금을 못 잡으면) PyQt6를 불러오기 전에 기존 창을 앞으로 가져오고 종료
+    import ipc
+    # 잠금과 제어 채널은 DB마다 하나: 다른 OS 계정에서 실행해도 실행 중인 추적기에 계정만 알린다
+    if not ipc.acquire_instance_lock(_DB_PATH):
+        if ipc.send_command("user " + startup.current_os_user(), timeout=2.0, db_path=_DB_PATH) is None:
+            # 기존 창이 응답하지 않음 (바쁘거나 시작 중): 알리기만 하고 종료
+            from PyQt6.QtWidgets import QApplication, QMessageBox
+            _app = QApplication(sys.argv)
+            QMessageBox.information(None, "ComTime", "ComTime이 이미 실행 중입니다.")
+        sys.exit(0)
+    startup.mark("중복 실행 확인")
+    # 부팅 직후 자동 시작 시 추적이 늦지 않도록 PyQt6보다 먼저 세션을 기록
+    from db import Database
+    _boot_db = Database(_DB_PATH)
+    _boot_session = startup.boot_session(_boot_db, startup.active_os_user())
+    startup.mark("세션 기록")
+
+import json
+import threading
+import time
 from datetime import datetime, date, timedelta
 from PyQt6.QtWidgets import (
     QApplication,
@@ -19,106 +56,245 @@ from PyQt6.QtWidgets import (
     QMenu,
     QDialog,
     QDialogButtonBox,
+    QFileDialog,
+    QInputDialog,
+    QStyle,
+    QSystemTrayIcon,
+    QComboBox,
 )
-from PyQt6.QtCore import QTimer, Qt, QDate
+from PyQt6.QtCore import QTimer, Qt, QDate, pyqtSignal
 from PyQt6.QtGui import QIcon, QIntValidator
+from PyQt6.QtNetwork import QLocalServer
 
-# DB 경로: exe로 패키징된 경우 exe 위치 기준, 스크립트 실행 시 스크립트 위치 기준
-if getattr(sys, "frozen", False):
-    _BASE_DIR = os.path.dirname(sys.executable)
-else:
-    _BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-_DB_PATH = os.path.join(_BASE_DIR, "comtime.db")
-
-# 아이콘 경로: frozen exe는 _MEIPASS(번들 임시 폴더), 스크립트는 프로젝트 루트
-if getattr(sys, "frozen", False):
-    _ICON_PATH = os.path.join(sys._MEIPASS, "comtime_icon.png")
-else:
-    _ICON_PATH = os.path.join(os.path.dirname(_BASE_DIR), "comtime_icon.png")
-
+# 병합(merge), 보관(archive), 압축(retention), 원격 조회(http_api)는 쓸 때 불러온다 (시작 시간 단축)
 from db import Database
-
-def _is_self_app(name: str) -> bool:
-    """자기 자신(ComTime, Python 계열)인지 확인"""
-    lower = name.lower()
-    return lower.startswith("python") or lower.startswith("comtime") or lower.startswith("timelimiter")
-
-
-def get_foreground_app():
-    """현재 포그라운드(활성) 앱 이름을 반환. 실패 시 None."""
-    try:
-        if sys.platform == "darwin":
-            # 표시 이름(displayed name) 사용 - Electron 등 내부 프로세스명 대신 실제 앱 이름 반환
-            result = subprocess.run(
-                ["osascript", "-e",
-                 'tell application "System Events" to get displayed name of first application process whose frontmost is true'],
-                capture_output=True, text=True, timeout=3,
-            )
-            if result.returncode == 0:
-                name = result.stdout.strip()
-                if name and not _is_self_app(name):
-                    return name
-        elif sys.platform == "win32":
-            import ctypes
-            hwnd = ctypes.windll.user32.GetForegroundWindow()
-            if hwnd:
-                length = ctypes.windll.user32.GetWindowTextLengthW(hwnd)
-                if length > 0:
-                    buf = ctypes.create_unicode_buffer(length + 1)
-                    ctypes.windll.user32.GetWindowTextW(hwnd, buf, length + 1)
-                    title = buf.value
-                    # 프로세스 이름 가져오기
-                    pid = ctypes.c_ulong()
-                    ctypes.windll.user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
-                    h_proc = ctypes.windll.kernel32.OpenProcess(0x0410, False, pid.value)
-                    if h_proc:
-                        exe_buf = ctypes.create_unicode_buffer(260)
-                        size = ctypes.c_ulong(260)
-                        ctypes.windll.kernel32.QueryFullProcessImageNameW(
-                            h_proc, 0, exe_buf, ctypes.byref(size)
-                        )
-                        ctypes.windll.kernel32.CloseHandle(h_proc)
-                        exe_path = exe_buf.value
-                        if exe_path:
-                            name = os.path.splitext(os.path.basename(exe_path))[0]
-                            if name and not _is_self_app(name):
-                                return name
-                    # fallback: 윈도우 제목 사용
-                    if title and not _is_self_app(title):
-                        return title
-    except Exception:
-        pass
-    return None
+from foreground import get_foreground_app, get_foreground_title
+from idle import create_idle_source
+from titles import TitleTracker
+from categories import KINDS, UNCATEGORIZED
+import backup
+import ipc
+import memstat
 
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    # 백업 작업 스레드 → GUI 스레드 (백업 경로, 오류 메시지)
+    _backup_finished = pyqtSignal(object, object)
+
+    def __init__(self, db=None, session=None):
+        """db/session: 실행 시 PyQt6보다 먼저 startup.boot_session으로 기록해 둔 DB와 (세션 ID, 시작 시각).
+        없으면 여기서 같은 과정을 거친다 (시뮬레이션, 벤치마크)."""
         super().__init__()
         self.setWindowTitle("ComTime - 컴퓨터 사용 시간 관리")
         if os.path.exists(_ICON_PATH):
             self.setWindowIcon(QIcon(_ICON_PATH))
-        self.db = Database(_DB_PATH)
-        self.running = False
-        self.current_session_id = None
-        self.session_start = None
+        # OS 계정에 연결된 프로필이 있으면 그 프로필로 시작 (계정마다 아이가 다른 컴퓨터).
+        # 추적기는 컴퓨터에 하나뿐이므로 프로세스의 계정이 아니라 화면을 쓰는 계정을 따른다
+        self._os_user = startup.active_os_user()
+        if db is None:
+            db = Database(_DB_PATH)
+            session = startup.boot_session(db, self._os_user)
+        self.db = db
+        self._update_profile_title()
+        # 잠금 해제 후 새 세션을 시작할 때 누가 쓰는지 묻기 (프로필이 둘 이상일 때)
+        self._choose_profile_on_start = False
+        # 변경 피드 세대 값: 마지막으로 화면에 반영한 (날짜, 세대). 같으면 다시 조회하지 않음
+        self._total_key = None
+        self._today_key = None  # _today_total: (날짜, 세대)와 그때 조회한 (합계, 시각)
+        self._today_base = (0, None)
+        self._logs_key = None
+        self._apps_key = None
+        # 세션은 이미 기록됨 (복구했거나 새로 시작). 비정상 종료/자정 분할도 boot_session에서 처리
+        self.current_session_id, self.session_start = session
+        self.running = True
         self.current_date = date.today()
         self.selected_date = date.today()
+        # 창이 처음 그려진 뒤 할 일(_finish_startup)이 남았는지
+        self._startup_pending = True
 
-        # resume open session if exists
-        open_s = self.db.get_open_session()
-        if open_s:
-            try:
-                self.current_session_id = open_s.get("id")
-                self.session_start = datetime.fromisoformat(open_s.get("start_ts"))
-                self.running = True
-            except Exception:
-                self.running = False
-        # 비정상 종료(Windows 강제 종료, 절전 등) 감지: 하트비트 기반
-        if self.running:
-            self._check_shutdown_and_close_session()
-        if self.running and self.current_session_id and self.session_start:
-            self._normalize_open_session_boundaries()
+        # 메인 화면 위젯 (트레이 모드에서는 해제했다가 다시 열 때 새로 만듦)
+        self.time_label = self.date_edit = self.prev_btn = self.next_btn = self.overview_btn = None
+        self.stop_btn = self.log_table = self.app_table = self.category_label = None
+        self._overview = None  # 주간/월간 요약 창 (처음 열 때 생성)
+        self._build_ui()
+
+        # 메뉴바
+        menu_bar = self.menuBar()
+        profile_menu = menu_bar.addMenu("프로필")
+        switch_profile_action = profile_menu.addAction("프로필 전환")
+        switch_profile_action.triggered.connect(self._switch_profile_with_pin)
+        add_profile_action = profile_menu.addAction("프로필 추가")
+        add_profile_action.triggered.connect(self._add_profile)
+        bind_profile_action = profile_menu.addAction("이 계정의 기본 프로필로 지정")
+        bind_profile_action.triggered.connect(self._bind_profile_to_os_user)
+        settings_menu = menu_bar.addMenu("설정")
+        change_pin_action = settings_menu.addAction("PIN 변경")
+        change_pin_action.triggered.connect(self._change_pin)
+        change_admin_pin_action = settings_menu.addAction("관리자 PIN 변경")
+        change_admin_pin_action.triggered.connect(self._change_admin_pin)
+        self._autostart_action = settings_menu.addAction("")
+        self._autostart_action.triggered.connect(self._toggle_autostart)
+        self._update_autostart_label()
+        import_action = settings_menu.addAction("다른 컴퓨터 기록 가져오기")
+        import_action.triggered.connect(self._import_other_db)
+        self._http_action = settings_menu.addAction("")
+        self._http_action.triggered.connect(self._toggle_http_server)
+        idle_action = settings_menu.addAction("유휴 감지 시간 설정")
+        idle_action.triggered.connect(self._set_idle_threshold)
+        archive_action = settings_menu.addAction("오래된 기록 보관 설정")
+        archive_action.triggered.connect(self._set_archive_horizon)
+        retention_action = settings_menu.addAction("기록 압축 설정")
+        retention_action.triggered.connect(self._set_retention_days)
+        category_action = settings_menu.addAction("카테고리 규칙 편집")
+        category_action.triggered.connect(self._edit_category_rules)
+        backup_action = settings_menu.addAction("백업 설정")
+        backup_action.triggered.connect(self._set_backup_policy)
+        restore_action = settings_menu.addAction("백업에서 복원")
+        restore_action.triggered.connect(self._restore_backup)
+        self._titles_action = settings_menu.addAction("")
+        self._titles_action.triggered.connect(self._toggle_title_tracking)
+
+        # 시스템 트레이: 창을 닫으면 메인 화면 위젯을 해제하고 트레이에서 추적만 계속 (_finish_startup에서 생성)
+        self._tray = None
+        self._quitting = False
 
+        self.timer = QTimer()
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self.update_timer)
+
+        # 포그라운드 앱 추적 타이머 (5초 간격)
+        self._last_app = None
+        self._app_timer = QTimer()
+        self._app_timer.setInterval(5000)
+        self._app_timer.timeout.connect(self._track_foreground_app)
+
+        # 입력 유휴 감지: 임계 시간 이상 입력이 없으면 세션/앱 기록 중단, 입력 시 새 세션으로 재개
+        # (플랫폼 ctypes 바인딩이라 _finish_startup에서 생성)
+        self._idle_source = None
+        self._idle_since = None
+
+        # 창 제목 top-K 추적 (선택). 스케치는 메모리에 두고 5분마다 저장
+        self._titles = None
+        self._load_profile_settings()
+        self._title_flush_timer = QTimer()
+        self._title_flush_timer.setInterval(300000)
+        self._title_flush_timer.timeout.connect(self._flush_titles)
+        self._title_flush_timer.start()
+
+        # 하트비트 타이머 (30초 간격) - 비정상 종료(강제 종료, 절전) 감지용
+        self._heartbeat_timer = QTimer()
+        self._heartbeat_timer.setInterval(30000)
+        self._heartbeat_timer.timeout.connect(self._update_heartbeat)
+
+        # 화면을 쓰는 OS 계정 확인 (10초 간격): 빠른 사용자 전환 시 그 계정의 프로필로 전환
+        self._os_user_timer = QTimer()
+        self._os_user_timer.setInterval(10000)
+        self._os_user_timer.timeout.connect(self._check_os_user)
+        self._os_user_timer.start()
+
+        # 이벤트 로그 스냅샷 (5분 간격): 쌓인 앱 샘플/하트비트를 app_usage와 설정에 합친다.
+        # 비정상 종료 후에는 마지막 스냅샷 이후의 이벤트만 다시 적용하면 된다
+        self._snapshot_timer = QTimer()
+        self._snapshot_timer.setInterval(300000)
+        self._snapshot_timer.timeout.connect(self.db.snapshot_events)
+        self._snapshot_timer.start()
+
+        # 잠금 유예 타이머: 1분 이내 잠금 해제 시 세션을 끊지 않고 계속 사용으로 처리
+        self._lock_start_time = None
+        self._lock_timeout_timer = QTimer()
+        self._lock_timeout_timer.setSingleShot(True)
+        self._lock_timeout_timer.setInterval(60000)  # 1분
+        self._lock_timeout_timer.timeout.connect(self._do_end_session)
+
+        # 잠금 화면: 화면마다 미리 만들어 숨겨 둠 (잠금 시 표시만 하므로 지연 없음). _finish_startup에서 생성
+        self.kiosk = None
+
+        # 로컬 제어 채널 (중복 실행 시 창 띄우기, 상태 조회)
+        self._control_server = QLocalServer(self)
+        self._control_server.newConnection.connect(self._on_control_connection)
+        # 단일 실행 잠금을 잡은 프로세스만 비정상 종료로 남은 소켓을 정리하고 연다
+        # (잠금 없이 정리하면 실행 중인 다른 ComTime의 소켓을 빼앗는다)
+        if ipc.acquire_instance_lock(_DB_PATH):
+            QLocalServer.removeServer(ipc.server_name(_DB_PATH))
+            # 다른 OS 계정에서 실행한 ComTime도 접속할 수 있게
+            self._control_server.setSocketOptions(QLocalServer.SocketOption.WorldAccessOption)
+            self._control_server.listen(ipc.server_name(_DB_PATH))
+
+        # 원격 조회 서버 (기본 꺼짐, 켜져 있으면 _finish_startup에서 시작)
+        self._http_server = None
+        self._update_http_label()
+        self._update_titles_label()
+
+        # 추적 타이머 시작 (세션은 boot_session에서 이미 기록)
+        self._set_stop_enabled(True)
+        self.timer.start()
+        self._app_timer.start()
+        self._heartbeat_timer.start()
+
+        # 보관 기간이 지난 달은 창이 뜬 뒤 아카이브로 이동 (시작 지연 방지)
+        QTimer.singleShot(10000, self._archive_old_history)
+
+        # 정기 백업: 10분마다 예정 시각이 지났는지 확인하고, 백업 자체는 작업 스레드에서 실행
+        self._backup_thread = None
+        self._backup_progress = None
+        self._backup_finished.connect(self._on_backup_finished)
+        self._backup_timer = QTimer()
+        self._backup_timer.setInterval(600000)
+        self._backup_timer.timeout.connect(self._maybe_backup)
+        self._backup_timer.start()
+        QTimer.singleShot(60000, self._maybe_backup)
+
+        # 보존 기간이 지난 기록 압축: 유휴/잠금 중에만 5초마다 한 묶음씩 (오늘 분량을 끝내면 내일까지 쉼)
+        self._retention_done = None
+        self._retention_timer = QTimer()
+        self._retention_timer.setInterval(5000)
+        self._retention_timer.timeout.connect(self._retention_tick)
+        self._retention_timer.start()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self._startup_pending:
+            startup.mark("첫 화면 표시")
+            QTimer.singleShot(0, self._finish_startup)
+
+    def _finish_startup(self):
+        """창이 처음 그려진 뒤 할 일: 이력 조회, 잠금 화면, 트레이, 유휴 감지, 원격 조회 서버, 최초 PIN 설정.
+        잠금/트레이처럼 이것들이 필요한 동작이 먼저 오면 그때 바로 실행한다 (한 번만)."""
+        if not self._startup_pending:
+            return
+        self._startup_pending = False
+        self.refresh_ui()
+        self.kiosk = KioskSurfaces(on_unlock=self.on_start)
+        self._create_tray()
+        if self._idle_source is None:
+            self._idle_source = create_idle_source()
+        if self.db.get_setting("http_enabled") == "1":
+            self._start_http_server()
+        startup.mark("지연 작업")
+        startup.report()
+        # 관리자 PIN이 없으면 최초 실행 시 설정 (부모가 설정)
+        if self.db.get_setting("admin_pin_sha256") is None:
+            self._prompt_set_admin_pin()
+
+    def _create_tray(self):
+        if not QSystemTrayIcon.isSystemTrayAvailable():
+            return
+        icon = self.windowIcon()
+        if icon.isNull():
+            icon = self.style().standardIcon(QStyle.StandardPixmap.SP_ComputerIcon)
+        self._tray = QSystemTrayIcon(icon, self)
+        tray_menu = QMenu(self)
+        tray_menu.addAction("열기").triggered.connect(self.raise_window)
+        tray_menu.addAction("사용 중지").triggered.connect(self.on_stop)
+        tray_menu.addSeparator()
+        tray_menu.addAction("종료").triggered.connect(self._quit_from_tray)
+        self._tray.setContextMenu(tray_menu)
+        self._tray.activated.connect(self._on_tray_activated)
+        self._tray.setToolTip("ComTime")
+        self._tray.show()
+
+    def _build_ui(self):
+        """메인 화면 위젯 생성. 트레이에서 창을 다시 열 때도 호출."""
         central = QWidget()
         layout = QVBoxLayout()
 
@@ -131,8 +307,8 @@ class MainWindow(QMainWindow):
         self.prev_btn = QPushButton("◀")
         self.prev_btn.setFixedWidth(40)
         self.date_edit = QDateEdit()
-        self.date_edit.setDate(QDate.currentDate())
         self.date_edit.setMaximumDate(QDate.currentDate())
+        self.date_edit.setDate(QDate(self.selected_date.year, self.selected_date.month, self.selected_date.day))
         self.date_edit.setCalendarPopup(True)
         self.date_edit.setDisplayFormat("yyyy-MM-dd")
         self.next_btn = QPushButton("▶")
@@ -140,10 +316,12 @@ class MainWindow(QMainWindow):
         date_nav.addWidget(self.prev_btn)
         date_nav.addWidget(self.date_edit)
         date_nav.addWidget(self.next_btn)
+        self.overview_btn = QPushButton("주간/월간")
+        date_nav.addWidget(self.overview_btn)
         layout.addLayout(date_nav)
 
         self.stop_btn = QPushButton("사용 중지")
-        self.stop_btn.setEnabled(False)
+        self.stop_btn.setEnabled(self.running)
         self.stop_btn.setFixedHeight(48)
         self.stop_btn.setStyleSheet("""
             QPushButton {
@@ -177,70 +355,50 @@ class MainWindow(QMainWindow):
         app_label.setStyleSheet("font-weight: bold; margin-top: 8px;")
         layout.addWidget(app_label)
 
-        self.app_table = QTableWidget(0, 2)
-        self.app_table.setHorizontalHeaderLabels(["프로그램", "사용 시간"])
+        self.app_table = QTableWidget(0, 3)
+        self.app_table.setHorizontalHeaderLabels(["프로그램", "카테고리", "사용 시간"])
         self.app_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.app_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
         self.app_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
         self.app_table.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         layout.addWidget(self.app_table)
 
+        # 카테고리별 합계 (게임, 동영상, 숙제 ...)
+        self.category_label = QLabel("")
+        self.category_label.setWordWrap(True)
+        layout.addWidget(self.category_label)
+
         central.setLayout(layout)
         self.setCentralWidget(central)
 
-        # 메뉴바
-        menu_bar = self.menuBar()
-        settings_menu = menu_bar.addMenu("설정")
-        change_pin_action = settings_menu.addAction("PIN 변경")
-        change_pin_action.triggered.connect(self._change_pin)
-        self._autostart_action = settings_menu.addAction("")
-        self._autostart_action.triggered.connect(self._toggle_autostart)
-        self._update_autostart_label()
+        self.next_btn.setEnabled(self.selected_date < date.today())
 
         self.stop_btn.clicked.connect(self.on_stop)
         self.prev_btn.clicked.connect(self.on_prev_date)
         self.next_btn.clicked.connect(self.on_next_date)
+        self.overview_btn.clicked.connect(self._show_overview)
         self.date_edit.dateChanged.connect(self.on_date_changed)
         self.log_table.customContextMenuRequested.connect(self.on_log_table_context_menu)
         self.app_table.customContextMenuRequested.connect(self.on_app_table_context_menu)
-
-        self.timer = QTimer()
-        self.timer.setInterval(1000)
-        self.timer.timeout.connect(self.update_timer)
-
-        # 포그라운드 앱 추적 타이머 (5초 간격)
-        self._last_app = None
-        self._app_timer = QTimer()
-        self._app_timer.setInterval(5000)
-        self._app_timer.timeout.connect(self._track_foreground_app)
-
-        # 하트비트 타이머 (30초 간격) - 비정상 종료(강제 종료, 절전) 감지용
-        self._heartbeat_timer = QTimer()
-        self._heartbeat_timer.setInterval(30000)
-        self._heartbeat_timer.timeout.connect(self._update_heartbeat)
-
-        # 잠금 유예 타이머: 1분 이내 잠금 해제 시 세션을 끊지 않고 계속 사용으로 처리
-        self._lock_start_time = None
-        self._lock_timeout_timer = QTimer()
-        self._lock_timeout_timer.setSingleShot(True)
-        self._lock_timeout_timer.setInterval(60000)  # 1분
-        self._lock_timeout_timer.timeout.connect(self._do_end_session)
-
-        # PIN이 없으면 최초 실행 시 설정 (부모가 설정)
-        if self.db.get_setting("pin_sha256") is None:
-            self._prompt_set_pin()
-
-        # 세션 시작 (복구된 세션이 없으면 새로 시작)
-        if not self.running:
-            self.on_start()
-        else:
-            self.stop_btn.setEnabled(True)
-            self.timer.start()
-            self._app_timer.start()
-            self._heartbeat_timer.start()
-            self._update_heartbeat()
-
-        self.refresh_ui()
+        self.app_table.cellDoubleClicked.connect(self.on_app_table_double_clicked)
+        # 새 위젯은 비어 있으므로 다음 갱신 때 반드시 다시 조회
+        self._total_key = self._logs_key = self._apps_key = None
+
+    def _teardown_ui(self):
+        """메인 화면 위젯 해제 (트레이 모드). 추적 타이머와 DB는 그대로 유지."""
+        central = self.takeCentralWidget()
+        if central is not None:
+            central.deleteLater()
+        self.time_label = self.date_edit = self.prev_btn = self.next_btn = self.overview_btn = None
+        self.stop_btn = self.log_table = self.app_table = self.category_label = None
+        if self._overview is not None:
+            self._overview.close()
+            self._overview.deleteLater()
+            self._overview = None
+
+    def _set_stop_enabled(self, enabled: bool):
+        if self.stop_btn is not None:
+            self.stop_btn.setEnabled(enabled)
 
     def on_start(self):
         if self.running:
@@ -251,8 +409,9 @@ class MainWindow(QMainWindow):
             if elapsed < 60:
                 self._lock_timeout_timer.stop()
                 self._lock_start_time = None
+                self.db.append_event("unlock", self.current_session_id)
                 self.running = True
-                self.stop_btn.setEnabled(True)
+                self._set_stop_enabled(True)
                 self.timer.start()
                 self._app_timer.start()
                 self._heartbeat_timer.start()
@@ -261,8 +420,16 @@ class MainWindow(QMainWindow):
                 return
             else:
                 # 타이머가 아직 안 울렸지만 1분 초과 → 지금 세션 종료
-                self._lock_timeout_timer.stop()
                 self._do_end_session()
+        # 새 세션으로 가는 모든 경로 (유휴로 세션이 이미 닫힌 채 잠근 경우 포함): 남은 잠금 유예가
+        # 새 세션을 잠금 시각(새 세션 시작 전)에 끝내지 않도록 정리
+        self._lock_timeout_timer.stop()
+        self._lock_start_time = None
+
+        # 잠금 후 새 세션: 여러 아이가 함께 쓰는 컴퓨터면 누가 쓰는지 선택
+        if self._choose_profile_on_start:
+            self._choose_profile_on_start = False
+            self._ask_active_profile()
 
         now = datetime.now()
         self.session_start = now
@@ -270,7 +437,7 @@ class MainWindow(QMainWindow):
         self.current_session_id = session_id
         self.running = True
         self._last_app = None
-        self.stop_btn.setEnabled(True)
+        self._set_stop_enabled(True)
         self.timer.start()
         self._app_timer.start()
         self._heartbeat_timer.start()
@@ -282,15 +449,9 @@ class MainWindow(QMainWindow):
         if not self.running or not self.current_session_id or not self.session_start:
             return
         now = datetime.now()
-        next_midnight = datetime.combine(
-            self.session_start.date() + timedelta(days=1),
-            datetime.min.time(),
+        self.current_session_id, self.session_start = startup.split_at_midnight(
+            self.db, self.current_session_id, self.session_start, now
         )
-        while next_midnight <= now:
-            self.db.end_session(self.current_session_id, next_midnight.isoformat())
-            self.current_session_id = self.db.start_session(next_midnight.isoformat())
-            self.session_start = next_midnight
-            next_midnight += timedelta(days=1)
         self.current_date = now.date()
 
     def on_stop(self):
@@ -299,17 +460,22 @@ class MainWindow(QMainWindow):
         self._app_timer.stop()
         self._heartbeat_timer.stop()
         self._last_app = None
+        self._idle_since = None
+        self._flush_titles()
         self.running = False
-        self.stop_btn.setEnabled(False)
+        self._set_stop_enabled(False)
         self.timer.stop()
         # 세션을 바로 종료하지 않고 1분 유예: 이 시각을 잠금 시작 시각으로 기록
         self._lock_start_time = datetime.now()
+        # 잠금 중 강제 종료되면 다음 실행에서 이 시각에 세션을 끝내도록
+        self.db.append_event("lock", self.current_session_id, at=self._lock_start_time)
         self._lock_timeout_timer.start()
         self.refresh_ui()
 
-        # 잠금 화면 표시
-        self.kiosk = KioskWindow(on_unlock=self.on_start)
-        self.kiosk.show()
+        self._choose_profile_on_start = True
+        # 잠금 화면 표시 (미리 만들어 둔 화면별 잠금 창을 띄우기만 함)
+        self._finish_startup()
+        self.kiosk.lock()
 
     def _do_end_session(self):
         """잠금 유예 1분 만료 시 세션을 실제로 종료."""
@@ -325,16 +491,30 @@ class MainWindow(QMainWindow):
         if self.running and self.current_session_id and self.session_start:
             self._normalize_open_session_boundaries()
         self.current_date = today
+        self.db.poll_external_changes()
+        if self.time_label is None or not self.isVisible():
+            # 트레이 모드(위젯 해제)나 숨긴 창: 화면 갱신 없이 툴팁만 (다시 열 때 raise_window가 refresh_ui)
+            self._update_tray_tooltip()
+            return
         self.date_edit.setMaximumDate(QDate.currentDate())
-        total = self.db.get_total_seconds_for_date(self.selected_date)
-        hrs = total // 3600
-        mins = (total % 3600) // 60
-        secs = total % 60
-        if self.selected_date == today:
-            prefix = "오늘 사용"
-        else:
-            prefix = f"{self.selected_date.strftime('%m/%d')} 사용"
-        self.time_label.setText(f"{prefix}: {hrs:02d}:{mins:02d}:{secs:02d}")
+        total_key = (today, self.selected_date, self.db.generation(self.selected_date, "sessions"))
+        # 오늘은 진행 중인 세션 때문에 DB 변경 없이도 늘어나므로 _today_total이 경과 시간을 더한다
+        if total_key != self._total_key or (self.selected_date == today and self.current_session_id):
+            self._total_key = total_key
+            if self.selected_date == today:
+                total = self._today_total()
+            else:
+                total = self.db.get_total_seconds_for_date(self.selected_date)
+            hrs = total // 3600
+            mins = (total % 3600) // 60
+            secs = total % 60
+            if self.selected_date == today:
+                prefix = "오늘 사용"
+            else:
+                prefix = f"{self.selected_date.strftime('%m/%d')} 사용"
+            self.time_label.setText(f"{prefix}: {hrs:02d}:{mins:02d}:{secs:02d}")
+            if self.selected_date == today:
+                self._set_tray_tooltip(total)
         self.refresh_logs()
         self.refresh_app_usage()
 
@@ -355,46 +535,655 @@ class MainWindow(QMainWindow):
         return f"{s // 3600:02d}:{(s % 3600) // 60:02d}:{s % 60:02d}"
 
     def _track_foreground_app(self):
-        if not self.running or not self.current_session_id:
+        if not self.running:
+            return
+        if self._check_idle() or not self.current_session_id:
             return
         app_name = get_foreground_app()
         if not app_name:
             return
         self.db.record_app_usage(self.current_session_id, app_name, 5)
         self._last_app = app_name
+        if self._titles:
+            title = get_foreground_title()
+            if title:
+                self._titles.record(app_name, title, 5)
 
-    def _update_heartbeat(self):
-        """현재 시각을 DB에 저장. 비정상 종료(강제 종료, 절전) 감지에 사용."""
-        self.db.set_setting("last_heartbeat", datetime.now().isoformat())
-
-    def _check_shutdown_and_close_session(self):
-        """비정상 종료 여부를 하트비트로 감지.
-        마지막 하트비트와 현재 시각의 차이가 2분을 초과하면
-        컴퓨터가 꺼져 있었던 것으로 판단하고 세션을 하트비트 시각에 종료."""
-        _THRESHOLD = 120  # 2분
-        last_hb_str = self.db.get_setting("last_heartbeat")
-        end_at = None
-
-        if last_hb_str:
-            try:
-                last_hb = datetime.fromisoformat(last_hb_str)
-                gap = (datetime.now() - last_hb).total_seconds()
-                if gap > _THRESHOLD:
-                    # 하트비트가 세션 시작보다 이전이면 세션 시작 시각으로 대체
-                    end_at = last_hb if last_hb > self.session_start else self.session_start
-            except Exception:
-                end_at = self.session_start
+    def _flush_titles(self):
+        if self._titles:
+            self._titles.flush()
+
+    # ── 로컬 제어 채널 ──
+
+    def _on_control_connection(self):
+        while self._control_server.hasPendingConnections():
+            sock = self._control_server.nextPendingConnection()
+            sock.readyRead.connect(lambda s=sock: self._on_control_ready(s))
+            sock.disconnected.connect(sock.deleteLater)
+
+    def _on_control_ready(self, sock):
+        if not sock.canReadLine():
+            return
+        command = bytes(sock.readLine()).decode("utf-8", errors="replace")
+        try:
+            result = ipc.handle_command(command, self)
+        except Exception as e:
+            result = {"ok": False, "error": str(e)}
+        sock.write((json.dumps(result, ensure_ascii=False) + "\n").encode("utf-8"))
+        sock.flush()
+        sock.disconnectFromServer()
+
+    def raise_window(self):
+        # 잠금 중에는 키오스크가 최상위를 유지하므로 메인 창을 올리지 않음
+        if self.kiosk is not None and self.kiosk.locked:
+            return
+        if self.time_label is None:
+            self._build_ui()
+            self.refresh_ui()
+        elif not self.isVisible():
+            self.refresh_ui()  # 숨겨 둔 동안 건너뛴 화면 갱신
+        self.showNormal()
+        self.raise_()
+        self.activateWindow()
+
+    def status(self) -> dict:
+        return {
+            "running": True,
+            "locked": not self.running,
+            "idle": self._idle_since is not None,
+            "today_seconds": self.db.get_total_seconds_for_date(date.today()),
+            "current_app": self._last_app,
+            "profile": self.db.profile_id,
+            "mode": "tray" if self.time_label is None else "window",
+            "rss_bytes": memstat.rss_bytes(),
+            "backup_last": self.db.get_setting("backup_last"),
+            "backup_progress": self._backup_progress,
+            "lock_latency_ms": self.kiosk.last_lock_ms if self.kiosk else None,
+        }
+
+    # ── 시스템 트레이 ──
+
+    def _enter_tray(self):
+        """창을 숨기고 메인 화면 위젯을 해제. 세션/앱 추적 타이머는 그대로 동작."""
+        self.hide()
+        self._teardown_ui()
+        self._update_tray_tooltip()
+
+    def _on_tray_activated(self, reason):
+        if reason in (
+            QSystemTrayIcon.ActivationReason.Trigger,
+            QSystemTrayIcon.ActivationReason.DoubleClick,
+        ):
+            self.raise_window()
+
+    def _update_tray_tooltip(self):
+        if self._tray is not None:
+            self._set_tray_tooltip(self._today_total())
+
+    def _today_total(self) -> int:
+        """오늘 사용 시간. 변경 피드 세대가 그대로면 다시 조회하지 않고, 마지막 조회 뒤
+        진행 중인 세션이 늘어난 만큼만 더한다 (트레이 툴팁이 매초 DB를 조회하지 않도록)."""
+        today = date.today()
+        now = datetime.now()
+        key = (today, self.db.generation(today, "sessions"))
+        if key != self._today_key:
+            self._today_key = key
+            self._today_base = (self.db.get_total_seconds_for_date(today), now)
+        total, at = self._today_base
+        if self.current_session_id:
+            total += int((now - at).total_seconds())
+        return total
+
+    def _set_tray_tooltip(self, total):
+        if self._tray is None:
+            return
+        state = "사용 중" if self.running else "사용 중지"
+        self._tray.setToolTip(f"ComTime - 오늘 사용: {self._format_duration(total)} ({state})")
+
+    def _quit_from_tray(self):
+        if not self._verify_exit_pin():
+            return
+        self._quitting = True
+        self.close()
+
+    def _check_idle(self) -> bool:
+        """유휴 상태면 True. 유휴 진입 시 유휴 시작 시각에 세션을 끊고,
+        입력이 다시 감지되면 그 시각부터 새 세션을 시작해 유휴 구간을 사용 시간에서 제외."""
+        if self._idle_source is None or not self._idle_threshold:
+            return False
+        idle = self._idle_source.idle_seconds()
+        if idle is None:
+            return False
+        now = datetime.now()
+        if self._idle_since is None:
+            if idle < self._idle_threshold:
+                return False
+            self._idle_since = now - timedelta(seconds=idle)
+            if self.current_session_id and self.session_start:
+                end_at = max(self._idle_since, self.session_start)
+                # 유휴 구간 동안 누적된 앱 샘플(5초 단위) 제거
+                idle_secs = int((now - end_at).total_seconds())
+                self.db.trim_app_usage(self.current_session_id, idle_secs - idle_secs % 5)
+                self.db.end_session(self.current_session_id, end_at.isoformat())
+            self.current_session_id = None
+            self.session_start = None
+            self._last_app = None
+            # 유휴 중에는 DB 쓰기 없음 (하트비트 포함)
+            self._heartbeat_timer.stop()
+            return True
+        if idle >= self._idle_threshold:
+            return True
+        resume_at = max(now - timedelta(seconds=idle), self._idle_since)
+        self._idle_since = None
+        self.session_start = resume_at
+        self.current_session_id = self.db.start_session(resume_at.isoformat())
+        self._heartbeat_timer.start()
+        self._update_heartbeat()
+        return False
+
+    def _set_idle_threshold(self):
+        pin, ok = self._ask_pin("유휴 감지 설정", "설정을 변경하려면 PIN을 입력하세요:")
+        if not ok:
+            return
+        if not self.db.verify_pin(pin):
+            QMessageBox.warning(self, "오류", "PIN이 올바르지 않습니다.")
+            return
+        minutes, ok = QInputDialog.getInt(
+            self, "유휴 감지 설정", "입력이 없으면 사용 시간에서 제외할 시간(분, 0=끄기):",
+            self._idle_threshold // 60, 0, 240,
+        )
+        if not ok:
+            return
+        self._idle_threshold = minutes * 60
+        self.db.set_setting("idle_threshold_seconds", str(self._idle_threshold))
+
+    def _archive_old_history(self):
+        try:
+            months = int(self.db.get_setting("archive_horizon_months") or 0)
+        except ValueError:
+            months = 0
+        if months <= 0:
+            return
+        from archive import archive_old_months
+        try:
+            archive_old_months(self.db, months)
+        except Exception:
+            pass
+
+    def _retention_days(self) -> int:
+        try:
+            return int(self.db.get_setting("retention_days") or 0)
+        except ValueError:
+            return 0
+
+    def _retention_tick(self):
+        """사용자가 자리를 비웠거나 잠금 중일 때 압축/공간 회수를 한 묶음 실행 (묶음마다 짧은 트랜잭션)."""
+        if self.running and self._idle_since is None:
+            return
+        today = date.today()
+        days = self._retention_days()
+        if days <= 0 or self._retention_done == today or self._backup_running():
+            return
+        from retention import compact_step, vacuum_step
+        try:
+            if not compact_step(self.db, days, today) and not vacuum_step(self.db):
+                self._retention_done = today
+        except Exception:
+            self._retention_done = today  # 실패해도 매 틱 다시 시도하지 않고 다음 날 재시도
+
+    def _set_retention_days(self):
+        pin, ok = self._ask_pin("기록 압축 설정", "설정을 변경하려면 관리자 PIN을 입력하세요:")
+        if not ok:
+            return
+        if not self.db.verify_admin_pin(pin):
+            QMessageBox.warning(self, "오류", "PIN이 올바르지 않습니다.")
+            return
+        days, ok = QInputDialog.getInt(
+            self, "기록 압축 설정",
+            "최근 며칠의 세션 기록을 남길까요? (0=끄기)\n"
+            "지난 기록은 날짜별·프로그램별 합계만 남기고, 자리를 비웠을 때 조금씩 정리합니다.",
+            self._retention_days(), 0, 3650,
+        )
+        if not ok:
+            return
+        self.db.set_setting("retention_days", str(days))
+        self._retention_done = None
+        from retention import convert_to_incremental, needs_conversion
+        if days > 0 and needs_conversion(self.db):
+            # 이전 버전에서 만든 DB는 한 번 파일 전체를 다시 써야 지운 공간을 조금씩 돌려줄 수 있다.
+            # 오래 걸릴 수 있어 자동으로 하지 않고 여기서 묻는다
+            answer = QMessageBox.question(
+                self, "기록 압축 설정",
+                "이 DB는 압축으로 지운 공간을 파일에서 돌려주려면 한 번 전환해야 합니다.\n"
+                "지금 전환할까요? 기록이 많으면 잠시 응답하지 않을 수 있습니다.",
+            )
+            if answer == QMessageBox.StandardButton.Yes:
+                QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+                error = None
+                try:
+                    convert_to_incremental(self.db)
+                except Exception as e:
+                    error = str(e)
+                QApplication.restoreOverrideCursor()
+                if error:
+                    QMessageBox.warning(self, "오류", f"전환 실패: {error}")
+
+    # ── 프로필 ──
+
+    def _load_profile_settings(self):
+        """현재 프로필의 설정(유휴 감지 시간, 창 제목 기록)을 읽는다."""
+        try:
+            self._idle_threshold = int(self.db.get_setting("idle_threshold_seconds") or 300)
+        except ValueError:
+            self._idle_threshold = 300
+        self._flush_titles()
+        self._titles = TitleTracker(self.db) if self.db.get_setting("title_tracking") == "1" else None
+
+    def _close_stale_profile_sessions(self, profile_id):
+        startup.close_stale_profile_sessions(self.db, profile_id)
+
+    def _check_os_user(self):
+        self.os_user_changed(startup.active_os_user())
+
+    def os_user_changed(self, os_user):
+        """화면을 쓰는 OS 계정이 바뀜 (빠른 사용자 전환, 다른 계정에서 실행 시도).
+        그 계정에 연결된 프로필이 있으면 그 프로필로 전환. "" (전환 중)는 무시."""
+        if not os_user or os_user == self._os_user:
+            return
+        self._os_user = os_user
+        profile_id = self.db.profile_for_os_user(os_user)
+        if profile_id and profile_id != self.db.profile_id:
+            self._switch_profile(profile_id)
+
+    def _profile_name(self, profile_id=None):
+        profile_id = profile_id or self.db.profile_id
+        for p in self.db.get_profiles():
+            if p["id"] == profile_id:
+                return p["name"]
+        return profile_id
+
+    def _update_profile_title(self):
+        title = "ComTime - 컴퓨터 사용 시간 관리"
+        if len(self.db.get_profiles()) > 1:
+            title += f" [{self._profile_name()}]"
+        self.setWindowTitle(title)
+
+    def _activate_profile(self, profile_id):
+        """열린 세션이 없는 상태에서 프로필 전환 (DB 연결, 타이머, 창은 그대로 재사용)."""
+        self.db.set_profile(profile_id)
+        self._load_profile_settings()
+        self._idle_since = None
+        self._last_app = None
+        self._update_profile_title()
+        self._update_titles_label()
+        if self._http_server:
+            # 원격 조회는 현재 프로필 기준
+            self._stop_http_server()
+            self._start_http_server()
+
+    def _switch_profile(self, profile_id):
+        """사용 중 프로필 전환: 현재 세션을 끝내고 새 프로필로 새 세션 시작."""
+        if profile_id == self.db.profile_id:
+            return
+        now = datetime.now()
+        self._flush_titles()
+        if self.current_session_id:
+            # 잠금 유예 중이면 잠금 시작 시각에 종료
+            end_at = self._lock_start_time or now
+            self.db.end_session(self.current_session_id, end_at.isoformat())
+        self._lock_timeout_timer.stop()
+        self._lock_start_time = None
+        self.current_session_id = None
+        self.session_start = None
+        self._activate_profile(profile_id)
+        if self.running:
+            self.session_start = now
+            self.current_session_id = self.db.start_session(now.isoformat())
+            self._update_heartbeat()
+        self.refresh_ui()
+
+    def _pick_profile(self, title, label):
+        """프로필 선택 다이얼로그. 선택한 프로필 ID 또는 None."""
+        profiles = self.db.get_profiles()
+        names = [p["name"] for p in profiles]
+        current = next((i for i, p in enumerate(profiles) if p["id"] == self.db.profile_id), 0)
+        name, ok = QInputDialog.getItem(self, title, label, names, current, False)
+        if not ok:
+            return None
+        return profiles[names.index(name)]["id"]
+
+    def _ask_active_profile(self):
+        if len(self.db.get_profiles()) < 2:
+            return
+        profile_id = self._pick_profile("사용자 선택", "누가 사용하나요?")
+        if profile_id and profile_id != self.db.profile_id:
+            self._activate_profile(profile_id)
+
+    def _switch_profile_with_pin(self):
+        if len(self.db.get_profiles()) < 2:
+            QMessageBox.information(self, "프로필 전환", "프로필이 하나뿐입니다. 먼저 프로필을 추가하세요.")
+            return
+        profile_id = self._pick_profile("프로필 전환", "전환할 프로필:")
+        if not profile_id or profile_id == self.db.profile_id:
+            return
+        if self.db.get_setting("pin_sha256", profile_id) is None:
+            # 다른 컴퓨터에서 가져온 프로필 등 PIN이 없으면 현재 프로필 또는 관리자 PIN을 확인한 뒤 설정
+            pin, ok = self._ask_pin(
+                "프로필 전환",
+                f"'{self._profile_name(profile_id)}' 프로필에 PIN이 없습니다.\n"
+                "PIN을 설정하려면 현재 프로필 또는 관리자 PIN을 입력하세요:",
+            )
+            if not ok:
+                return
+            if not (self.db.verify_pin(pin) or self.db.verify_admin_pin(pin)):
+                QMessageBox.warning(self, "오류", "PIN이 올바르지 않습니다.")
+                return
+            if not self._prompt_set_pin(profile_id):
+                return
         else:
-            # 하트비트 기록 없음 → 이전 버전에서 업그레이드된 경우 등, 비정상으로 간주
-            end_at = self.session_start
+            pin, ok = self._ask_pin("프로필 전환", f"'{self._profile_name(profile_id)}' 프로필의 PIN을 입력하세요:")
+            if not ok:
+                return
+            if not self.db.verify_pin(pin, profile_id):
+                QMessageBox.warning(self, "오류", "PIN이 올바르지 않습니다.")
+                return
+        self._switch_profile(profile_id)
+
+    def _add_profile(self):
+        pin, ok = self._ask_pin("프로필 추가", "프로필을 추가하려면 관리자 PIN을 입력하세요:")
+        if not ok:
+            return
+        if not self.db.verify_admin_pin(pin):
+            QMessageBox.warning(self, "오류", "PIN이 올바르지 않습니다.")
+            return
+        name, ok = QInputDialog.getText(self, "프로필 추가", "이름:")
+        name = name.strip()
+        if not ok or not name:
+            return
+        if any(p["name"] == name for p in self.db.get_profiles()):
+            QMessageBox.warning(self, "오류", "같은 이름의 프로필이 있습니다.")
+            return
+        QMessageBox.information(self, "프로필 추가", f"'{name}' 프로필의 PIN을 설정하세요.")
+        new_pin = self._ask_new_pin()
+        if new_pin is None:
+            return  # PIN 없는 프로필은 만들지 않는다
+        profile_id = self.db.add_profile(name)
+        self.db.set_pin(new_pin, profile_id)
+        QMessageBox.information(self, "완료", f"'{name}' 프로필을 추가했습니다.")
+        self._update_profile_title()
+
+    def _bind_profile_to_os_user(self):
+        pin, ok = self._ask_pin("기본 프로필 지정", "설정을 변경하려면 관리자 PIN을 입력하세요:")
+        if not ok:
+            return
+        if not self.db.verify_admin_pin(pin):
+            QMessageBox.warning(self, "오류", "PIN이 올바르지 않습니다.")
+            return
+        self.db.set_profile_os_user(self.db.profile_id, self._os_user)
+        QMessageBox.information(
+            self, "완료",
+            f"OS 계정 '{self._os_user}'로 시작하면 '{self._profile_name()}' 프로필을 사용합니다.",
+        )
+
+    # ── 카테고리 규칙 ──
+
+    def _edit_category_rules(self):
+        pin, ok = self._ask_pin("카테고리 규칙", "설정을 변경하려면 관리자 PIN을 입력하세요:")
+        if not ok:
+            return
+        if not self.db.verify_admin_pin(pin):
+            QMessageBox.warning(self, "오류", "PIN이 올바르지 않습니다.")
+            return
+        dlg = QDialog(self)
+        dlg.setWindowTitle("카테고리 규칙")
+        lay = QVBoxLayout(dlg)
+        lay.addWidget(QLabel(
+            "종류: exact(이름 전체), prefix(앞부분), regex(정규식). 대소문자 구분 없음.\n"
+            "우선순위: exact > prefix(긴 것 먼저) > regex"
+        ))
+        table = QTableWidget(0, 3)
+        table.setHorizontalHeaderLabels(["종류", "패턴", "카테고리"])
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+
+        def add_row(kind="exact", pattern="", category=""):
+            r = table.rowCount()
+            table.insertRow(r)
+            combo = QComboBox()
+            combo.addItems(KINDS)
+            combo.setCurrentText(kind)
+            table.setCellWidget(r, 0, combo)
+            table.setItem(r, 1, QTableWidgetItem(pattern))
+            table.setItem(r, 2, QTableWidgetItem(category))
+
+        for rule in self.db.get_category_rules():
+            add_row(rule["kind"], rule["pattern"], rule["category"])
+        lay.addWidget(table)
+        row_buttons = QHBoxLayout()
+        add_btn = QPushButton("추가")
+        add_btn.clicked.connect(lambda: add_row())
+        remove_btn = QPushButton("선택 삭제")
+        remove_btn.clicked.connect(lambda: table.removeRow(table.currentRow()))
+        row_buttons.addWidget(add_btn)
+        row_buttons.addWidget(remove_btn)
+        lay.addLayout(row_buttons)
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        buttons.accepted.connect(dlg.accept)
+        buttons.rejected.connect(dlg.reject)
+        lay.addWidget(buttons)
+        dlg.resize(520, 420)
+        if dlg.exec() != QDialog.DialogCode.Accepted:
+            return
+
+        rules = []
+        for r in range(table.rowCount()):
+            pattern = (table.item(r, 1).text() if table.item(r, 1) else "").strip()
+            category = (table.item(r, 2).text() if table.item(r, 2) else "").strip()
+            if pattern and category:
+                rules.append((table.cellWidget(r, 0).currentText(), pattern, category))
+        try:
+            changed = self.db.set_category_rules(rules)
+        except ValueError as e:
+            QMessageBox.warning(self, "오류", str(e))
+            return
+        QMessageBox.information(self, "완료", f"규칙 {len(rules)}개 저장, 기록 {changed}건을 다시 분류했습니다.")
+        self.refresh_ui()
+
+    # ── 백업 ──
+
+    def _backup_policy(self):
+        """(백업 간격(시간, 0=끄기), 보관 개수)."""
+        try:
+            interval = int(self.db.get_setting("backup_interval_hours") or 24)
+        except ValueError:
+            interval = 24
+        try:
+            keep = int(self.db.get_setting("backup_keep") or backup.DEFAULT_KEEP)
+        except ValueError:
+            keep = backup.DEFAULT_KEEP
+        return interval, keep
+
+    def _backup_running(self) -> bool:
+        return self._backup_thread is not None and self._backup_thread.is_alive()
+
+    def _maybe_backup(self):
+        interval, keep = self._backup_policy()
+        if interval <= 0 or self._backup_running():
+            return
+        last = self.db.get_setting("backup_last")
+        if last:
+            try:
+                if datetime.now() - datetime.fromisoformat(last) < timedelta(hours=interval):
+                    return
+            except ValueError:
+                pass
+        self._backup_progress = (0, 0)
+        self._backup_thread = threading.Thread(
+            target=self._run_backup, args=(self.db.path, keep), daemon=True
+        )
+        self._backup_thread.start()
+
+    def _run_backup(self, db_path, keep):
+        """작업 스레드. self.db 연결이나 위젯은 건드리지 않고 결과는 시그널로 보낸다."""
+        def progress(_status, remaining, total):
+            self._backup_progress = (total - remaining, total)
+        try:
+            path = backup.create_backup(db_path, progress=progress)
+            backup.apply_retention(backup.backup_dir(db_path), keep=keep)
+        except Exception as e:
+            self._backup_finished.emit(None, str(e))
+            return
+        self._backup_finished.emit(path, None)
 
-        if end_at is not None:
+    def _on_backup_finished(self, path, error):
+        self._backup_progress = None
+        if error:
+            # 실패하면 backup_last를 그대로 두어 다음 확인 때 다시 시도
+            self.db.set_setting("backup_last_error", error)
+            return
+        self.db.set_setting("backup_last", datetime.now().isoformat())
+        self.db.set_setting("backup_last_error", "")
+
+    def _set_backup_policy(self):
+        pin, ok = self._ask_pin("백업 설정", "설정을 변경하려면 관리자 PIN을 입력하세요:")
+        if not ok:
+            return
+        if not self.db.verify_admin_pin(pin):
+            QMessageBox.warning(self, "오류", "PIN이 올바르지 않습니다.")
+            return
+        interval, keep = self._backup_policy()
+        interval, ok = QInputDialog.getInt(
+            self, "백업 설정", "백업 간격(시간, 0=끄기):", interval, 0, 24 * 7,
+        )
+        if not ok:
+            return
+        keep, ok = QInputDialog.getInt(
+            self, "백업 설정", "보관할 최근 백업 수 (주별 백업은 따로 4주 보관):", keep, 1, 100,
+        )
+        if not ok:
+            return
+        self.db.set_setting("backup_interval_hours", str(interval))
+        self.db.set_setting("backup_keep", str(keep))
+        self._maybe_backup()
+
+    def _restore_backup(self):
+        pin, ok = self._ask_pin("백업에서 복원", "복원하려면 관리자 PIN을 입력하세요:")
+        if not ok:
+            return
+        if not self.db.verify_admin_pin(pin):
+            QMessageBox.warning(self, "오류", "PIN이 올바르지 않습니다.")
+            return
+        if self._backup_running():
+            QMessageBox.warning(self, "오류", "백업이 진행 중입니다. 잠시 후 다시 시도하세요.")
+            return
+        backups = backup.list_backups(backup.backup_dir(self.db.path))
+        if not backups:
+            QMessageBox.information(self, "백업에서 복원", "백업이 없습니다.")
+            return
+        labels = [ts.strftime("%Y-%m-%d %H:%M:%S") for ts, _ in backups]
+        label, ok = QInputDialog.getItem(
+            self, "백업에서 복원", "복원할 백업을 선택하세요.\n현재 기록은 복원 전에 따로 백업됩니다.",
+            labels, 0, False,
+        )
+        if not ok:
+            return
+        backup_ts, path = backups[labels.index(label)]
+        error = backup.verify_backup(path)
+        if error:
+            QMessageBox.warning(self, "오류", f"백업 파일이 손상되었습니다: {error}")
+            return
+
+        # 진행 중인 세션을 지금 끊고, 현재 상태를 백업한 뒤 덮어쓴다
+        now = datetime.now()
+        self._flush_titles()
+        if self.current_session_id:
+            # 잠금 유예 중이면 잠금 시작 시각에 종료
+            end_at = self._lock_start_time or now
             self.db.end_session(self.current_session_id, end_at.isoformat())
-            self.current_session_id = None
+        from archive import archive_dir_for
+        if self.db.archive is not None:
+            self.db.archive.close()  # 아카이브 폴더를 바꾸기 전에 열어 둔 월 파일을 닫는다
+        try:
+            backup.create_backup(self.db.path)
+            backup.restore_backup(path, self.db.conn, archive_dir_for(self.db.path))
+        except Exception as e:
+            QMessageBox.warning(self, "오류", f"복원 실패: {e}")
+            return
+        finally:
+            self.db._load_archive()
+
+        # 백업에 남아 있던 이벤트를 반영하고, 백업 시점에 열려 있던 세션은 그 시점에 끝난 것으로 처리
+        self.db.snapshot_events()
+        self.db.end_open_sessions(backup_ts)
+        # 보관 전에 만든 백업이면 이미 아카이브에 있는 달의 행이 되살아나므로 바로 정리 (두 번 세지 않도록)
+        from archive import drop_archived_rows
+        drop_archived_rows(self.db)
+        for table in ("sessions", "app_usage", "settings", "app_titles"):
+            self.db.notify_changed(table)
+        if self._titles is not None:
+            self._titles = TitleTracker(self.db)
+        self._lock_start_time = None
+        self._lock_timeout_timer.stop()
+        if self.running:
+            self.session_start = now
+            self.current_session_id = self.db.start_session(now.isoformat())
+            self._update_heartbeat()
+        else:
             self.session_start = None
-            self.running = False
+            self.current_session_id = None
+        QMessageBox.information(self, "완료", f"{label} 백업으로 복원했습니다.")
+        self.refresh_ui()
+
+    def _update_titles_label(self):
+        if self._titles is not None:
+            self._titles_action.setText("창 제목 기록 끄기")
+        else:
+            self._titles_action.setText("창 제목 기록 켜기")
+
+    def _toggle_title_tracking(self):
+        pin, ok = self._ask_pin("창 제목 기록 설정", "설정을 변경하려면 PIN을 입력하세요:")
+        if not ok:
+            return
+        if not self.db.verify_pin(pin):
+            QMessageBox.warning(self, "오류", "PIN이 올바르지 않습니다.")
+            return
+        if self._titles is not None:
+            self._titles.flush()
+            self._titles = None
+            self.db.set_setting("title_tracking", "0")
+        else:
+            self._titles = TitleTracker(self.db)
+            self.db.set_setting("title_tracking", "1")
+        self._update_titles_label()
+
+    def _set_archive_horizon(self):
+        pin, ok = self._ask_pin("기록 보관 설정", "설정을 변경하려면 관리자 PIN을 입력하세요:")
+        if not ok:
+            return
+        if not self.db.verify_admin_pin(pin):
+            QMessageBox.warning(self, "오류", "PIN이 올바르지 않습니다.")
+            return
+        current = int(self.db.get_setting("archive_horizon_months") or 0)
+        months, ok = QInputDialog.getInt(
+            self, "기록 보관 설정", "최근 몇 개월을 DB에 두고 나머지를 보관할까요? (0=끄기):",
+            current, 0, 120,
+        )
+        if not ok:
+            return
+        self.db.set_setting("archive_horizon_months", str(months))
+        self._archive_old_history()
+        self.refresh_ui()
+
+    def _update_heartbeat(self):
+        """현재 시각을 이벤트 로그에 기록. 비정상 종료(강제 종료, 절전) 감지에 사용."""
+        self.db.heartbeat()
 
     def refresh_app_usage(self):
+        if self.app_table is None:
+            return
+        key = (self.selected_date, self.db.generation(self.selected_date, "sessions", "app_usage"))
+        if key == self._apps_key:
+            return
+        self._apps_key = key
         current_row = self.app_table.currentRow()
         scroll_pos = self.app_table.verticalScrollBar().value()
         usages = self.db.get_app_usage_for_date(self.selected_date)
@@ -402,14 +1191,26 @@ class MainWindow(QMainWindow):
         for u in usages:
             row = self.app_table.rowCount()
             self.app_table.insertRow(row)
-            self.app_table.setItem(row, 0, QTableWidgetItem(u.get("app_name", "")))
+            name = u.get("app_name", "")
+            self.app_table.setItem(row, 0, QTableWidgetItem(name))
+            self.app_table.setItem(row, 1, QTableWidgetItem(self.db.categorize(name) or UNCATEGORIZED))
             secs = u.get("total_seconds") or 0
-            self.app_table.setItem(row, 1, QTableWidgetItem(self._format_duration(secs)))
+            self.app_table.setItem(row, 2, QTableWidgetItem(self._format_duration(secs)))
         if current_row >= 0 and current_row < self.app_table.rowCount():
             self.app_table.selectRow(current_row)
         self.app_table.verticalScrollBar().setValue(scroll_pos)
+        categories = self.db.get_category_totals_for_date(self.selected_date)
+        self.category_label.setText("  ·  ".join(
+            f"{c['category']} {self._format_duration(c['total_seconds'])}" for c in categories
+        ))
 
     def refresh_logs(self):
+        if self.log_table is None:
+            return
+        key = (self.selected_date, self.db.generation(self.selected_date, "sessions"))
+        if key == self._logs_key:
+            return
+        self._logs_key = key
         current_row = self.log_table.currentRow()
         scroll_pos = self.log_table.verticalScrollBar().value()
         sessions = self.db.get_sessions_for_date(self.selected_date)
@@ -435,6 +1236,11 @@ class MainWindow(QMainWindow):
             return
         session_id = self.log_table.item(row, 0).data(Qt.ItemDataRole.UserRole)
         menu = QMenu(self)
+        if session_id is None:
+            # 월별 아카이브로 옮긴 세션은 SQLite 행이 없어 삭제할 수 없다
+            menu.addAction("보관된 세션은 삭제할 수 없음").setEnabled(False)
+            menu.exec(self.log_table.viewport().mapToGlobal(pos))
+            return
         delete_action = menu.addAction("이 세션 삭제")
         action = menu.exec(self.log_table.viewport().mapToGlobal(pos))
         if action != delete_action:
@@ -457,6 +1263,10 @@ class MainWindow(QMainWindow):
             return
         app_name = self.app_table.item(row, 0).text()
         menu = QMenu(self)
+        if self.db.is_archived(self.selected_date):
+            menu.addAction("보관된 달의 기록은 삭제할 수 없음").setEnabled(False)
+            menu.exec(self.app_table.viewport().mapToGlobal(pos))
+            return
         delete_action = menu.addAction("이 프로그램 기록 삭제")
         action = menu.exec(self.app_table.viewport().mapToGlobal(pos))
         if action != delete_action:
@@ -470,6 +1280,40 @@ class MainWindow(QMainWindow):
         self.db.delete_app_usage_by_name_and_date(app_name, self.selected_date)
         self.refresh_app_usage()
 
+    def on_app_table_double_clicked(self, row, _column):
+        """프로그램 상세: 많이 본 창 제목(사이트/문서) top-K."""
+        item = self.app_table.item(row, 0)
+        if item is None:
+            return
+        app_name = item.text()
+        self._flush_titles()
+        titles = self.db.get_app_titles_for_date(self.selected_date, app_name)
+        dlg = QDialog(self)
+        dlg.setWindowTitle(f"{app_name} - 창 제목별 사용")
+        lay = QVBoxLayout(dlg)
+        if not titles:
+            msg = "창 제목 기록이 없습니다."
+            if self._titles is None:
+                msg += "\n(설정 > 창 제목 기록 켜기)"
+            lay.addWidget(QLabel(msg))
+        else:
+            table = QTableWidget(0, 3)
+            table.setHorizontalHeaderLabels(["창 제목", "사용 시간", "오차(최대)"])
+            table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+            table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+            for t in titles:
+                r = table.rowCount()
+                table.insertRow(r)
+                table.setItem(r, 0, QTableWidgetItem(t["title"]))
+                table.setItem(r, 1, QTableWidgetItem(self._format_duration(t["seconds"])))
+                table.setItem(r, 2, QTableWidgetItem(self._format_duration(t["error"]) if t["error"] else "-"))
+            lay.addWidget(table)
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        buttons.rejected.connect(dlg.reject)
+        lay.addWidget(buttons)
+        dlg.resize(520, 360)
+        dlg.exec()
+
     def on_prev_date(self):
         new_date = self.selected_date - timedelta(days=1)
         self.date_edit.setDate(QDate(new_date.year, new_date.month, new_date.day))
@@ -479,6 +1323,23 @@ class MainWindow(QMainWindow):
         if new_date <= date.today():
             self.date_edit.setDate(QDate(new_date.year, new_date.month, new_date.day))
 
+    def _show_overview(self):
+        from overview import OverviewDialog
+        if self._overview is None:
+            self._overview = OverviewDialog(self.db, self.selected_date, self)
+            self._overview.date_selected.connect(self._select_date)
+        else:
+            self._overview.show_date(self.selected_date)
+        self._overview.show()
+        self._overview.raise_()
+        self._overview.activateWindow()
+
+    def _select_date(self, d: date):
+        """요약 화면에서 누른 날짜를 메인 화면에서 보기."""
+        if self.date_edit is None or d > date.today():
+            return
+        self.date_edit.setDate(QDate(d.year, d.month, d.day))
+
     def on_date_changed(self, qdate: QDate):
         self.selected_date = date(qdate.year(), qdate.month(), qdate.day())
         self.next_btn.setEnabled(self.selected_date < date.today())
@@ -489,13 +1350,23 @@ class MainWindow(QMainWindow):
         self.refresh_logs()
         self.refresh_app_usage()
 
+    def _verify_exit_pin(self) -> bool:
+        # 관리자 PIN이 설정되어 있으면 관리자 PIN 입력 없이 종료 불가 (자녀 프로필 PIN으로는 종료할 수 없음)
+        if self.db.get_setting("admin_pin_sha256") is None:
+            return True
+        pin, ok = self._ask_pin("종료 인증", "앱을 종료하려면 관리자 PIN을 입력하세요:")
+        return ok and self.db.verify_admin_pin(pin)
+
     def closeEvent(self, event):
-        # PIN이 설정되어 있으면 PIN 입력 없이 종료 불가
-        pin_exists = self.db.get_setting("pin_sha256") is not None
-        if pin_exists:
-            pin, ok = self._ask_pin("종료 인증", "앱을 종료하려면 PIN을 입력하세요:")
-            if not ok or not self.db.verify_pin(pin):
+        self._finish_startup()
+        if not self._quitting:
+            if not self._verify_exit_pin():
+                event.ignore()
+                return
+            # 트레이가 있으면 창만 닫고 추적은 계속 (종료는 트레이 메뉴에서)
+            if self._tray is not None:
                 event.ignore()
+                self._enter_tray()
                 return
         self._lock_timeout_timer.stop()
         if self.current_session_id:
@@ -505,7 +1376,18 @@ class MainWindow(QMainWindow):
             # 잠금 중 종료 시 잠금 시작 시각을 세션 종료 시각으로 사용
             end_at = self._lock_start_time or now
             self.db.end_session(self.current_session_id, end_at.isoformat())
+        self._flush_titles()
+        self._snapshot_timer.stop()
+        self._os_user_timer.stop()
+        self.db.snapshot_events()
+        self._stop_http_server()
+        self._control_server.close()
+        self.kiosk.dispose()
+        if self._tray is not None:
+            self._tray.hide()
         event.accept()
+        # 트레이 모드에서는 마지막 창이 닫혀도 앱이 끝나지 않으므로 직접 종료
+        QApplication.quit()
 
     def _ask_pin(self, title, label):
         """숫자 4자리 전용 PIN 입력 다이얼로그. (pin, ok) 반환."""
@@ -529,18 +1411,36 @@ class MainWindow(QMainWindow):
             return pin_edit.text(), True
         return "", False
 
-    def _prompt_set_pin(self) -> bool:
-        p1, ok1 = self._ask_pin("PIN 생성", "숫자 4자리 PIN 입력:")
+    def _ask_new_pin(self, title="PIN 생성"):
+        """새 PIN을 두 번 입력받는다. 확인까지 마치면 PIN, 취소하거나 다르면 None."""
+        p1, ok1 = self._ask_pin(title, "숫자 4자리 PIN 입력:")
         if not ok1 or len(p1) != 4:
-            return False
+            return None
         p2, ok2 = self._ask_pin("PIN 확인", "PIN 다시 입력:")
         if not ok2 or p1 != p2:
             QMessageBox.warning(self, "오류", "PIN이 일치하지 않거나 입력이 취소되었습니다.")
+            return None
+        return p1
+
+    def _prompt_set_pin(self, profile_id=None) -> bool:
+        pin = self._ask_new_pin()
+        if pin is None:
             return False
-        self.db.set_pin(p1)
+        self.db.set_pin(pin, profile_id)
         QMessageBox.information(self, "완료", "PIN이 설정되었습니다.")
         return True
 
+    def _prompt_set_admin_pin(self) -> bool:
+        """최초 실행: 관리자 PIN 설정. 현재 프로필에 PIN이 없으면 같은 PIN을 쓴다."""
+        pin = self._ask_new_pin("관리자 PIN 생성")
+        if pin is None:
+            return False
+        self.db.set_admin_pin(pin)
+        if self.db.get_setting("pin_sha256") is None:
+            self.db.set_pin(pin)
+        QMessageBox.information(self, "완료", "관리자 PIN이 설정되었습니다.")
+        return True
+
     def _change_pin(self):
         cur_pin, ok = self._ask_pin("PIN 변경", "현재 PIN을 입력하세요:")
         if not ok or not self.db.verify_pin(cur_pin):
@@ -557,6 +1457,108 @@ class MainWindow(QMainWindow):
         self.db.set_pin(new1)
         QMessageBox.information(self, "완료", "PIN이 변경되었습니다.")
 
+    def _change_admin_pin(self):
+        cur_pin, ok = self._ask_pin("관리자 PIN 변경", "현재 관리자 PIN을 입력하세요:")
+        if not ok or not self.db.verify_admin_pin(cur_pin):
+            if ok:
+                QMessageBox.warning(self, "오류", "현재 관리자 PIN이 올바르지 않습니다.")
+            return
+        new_pin = self._ask_new_pin("관리자 PIN 변경")
+        if new_pin is None:
+            return
+        self.db.set_admin_pin(new_pin)
+        # 관리자 PIN을 바꾸면 원격 조회 토큰도 새로 발급되므로 서버 재시작
+        if self._http_server:
+            self._stop_http_server()
+            self._start_http_server()
+        QMessageBox.information(self, "완료", "관리자 PIN이 변경되었습니다.")
+
+    # ── 원격 조회 (HTTP) ──
+
+    def _start_http_server(self):
+        import http_api
+        token = self.db.get_api_token()
+        host = self.db.get_setting("http_host") or http_api.DEFAULT_HOST
+        try:
+            port = int(self.db.get_setting("http_port") or http_api.DEFAULT_PORT)
+            server = http_api.StatsServer(_DB_PATH, token, host, port, self.db.profile_id)
+            server.start()
+        except Exception:
+            return False
+        self._http_server = server
+        return True
+
+    def _stop_http_server(self):
+        if self._http_server:
+            self._http_server.stop()
+            self._http_server = None
+
+    def _update_http_label(self):
+        if self.db.get_setting("http_enabled") == "1":
+            self._http_action.setText("원격 조회 끄기")
+        else:
+            self._http_action.setText("원격 조회 켜기")
+
+    def _toggle_http_server(self):
+        pin, ok = self._ask_pin("원격 조회 설정", "설정을 변경하려면 관리자 PIN을 입력하세요:")
+        if not ok:
+            return
+        if not self.db.verify_admin_pin(pin):
+            QMessageBox.warning(self, "오류", "PIN이 올바르지 않습니다.")
+            return
+        if self.db.get_setting("http_enabled") == "1":
+            self._stop_http_server()
+            self.db.set_setting("http_enabled", "0")
+            self._update_http_label()
+            QMessageBox.information(self, "완료", "원격 조회가 꺼졌습니다.")
+            return
+        import http_api
+        host, ok = QInputDialog.getText(
+            self, "원격 조회 설정", "접속을 허용할 주소 (이 컴퓨터만: 127.0.0.1, 홈 네트워크 전체: 0.0.0.0):",
+            text=self.db.get_setting("http_host") or http_api.DEFAULT_HOST,
+        )
+        if not ok or not host.strip():
+            return
+        self.db.set_setting("http_host", host.strip())
+        if not self._start_http_server():
+            QMessageBox.warning(self, "오류", "원격 조회 서버를 시작하지 못했습니다.")
+            return
+        self.db.set_setting("http_enabled", "1")
+        self._update_http_label()
+        srv = self._http_server
+        QMessageBox.information(
+            self, "완료",
+            f"원격 조회가 켜졌습니다.\n\n주소: http://<이 컴퓨터 IP>:{srv.port}/api/today\n"
+            f"요청 헤더: Authorization: Bearer {srv.token}\n\n"
+            "토큰은 관리자 PIN을 바꾸면 새로 발급됩니다.",
+        )
+
+    def _import_other_db(self):
+        pin, ok = self._ask_pin("기록 가져오기", "가져오려면 관리자 PIN을 입력하세요:")
+        if not ok:
+            return
+        if not self.db.verify_admin_pin(pin):
+            QMessageBox.warning(self, "오류", "PIN이 올바르지 않습니다.")
+            return
+        path, _ = QFileDialog.getOpenFileName(
+            self, "가져올 comtime.db 선택", "", "ComTime DB (*.db);;모든 파일 (*)"
+        )
+        if not path:
+            return
+        from merge import merge_database
+        try:
+            result = merge_database(self.db, path)
+        except Exception as e:
+            QMessageBox.warning(self, "오류", f"기록 가져오기 실패: {e}")
+            return
+        QMessageBox.information(
+            self, "완료",
+            f"세션 {result['sessions']}개, 프로그램 기록 {result['app_usage']}개를 새로 가져왔습니다.\n"
+            f"이전에 가져온 기록 중 바뀐 세션 {result['sessions_updated']}개, "
+            f"프로그램 기록 {result['app_usage_updated']}개를 갱신했습니다.",
+        )
+        self.refresh_ui()
+
     # ── 자동 시작 ──
 
     def _get_app_exec_args(self):
@@ -574,10 +1576,10 @@ class MainWindow(QMainWindow):
             self._autostart_action.setText("자동 시작 등록")
 
     def _toggle_autostart(self):
-        pin, ok = self._ask_pin("자동 시작 설정", "설정을 변경하려면 PIN을 입력하세요:")
+        pin, ok = self._ask_pin("자동 시작 설정", "설정을 변경하려면 관리자 PIN을 입력하세요:")
         if not ok:
             return
-        if not self.db.verify_pin(pin):
+        if not self.db.verify_admin_pin(pin):
             QMessageBox.warning(self, "오류", "PIN이 올바르지 않습니다.")
             return
 
@@ -636,10 +1638,13 @@ class MainWindow(QMainWindow):
 
 
 class KioskWindow(QMainWindow):
-    def __init__(self, on_unlock=None):
+    """한 화면을 덮는 잠금 화면. KioskSurfaces가 미리 만들어 숨겨 두고, 잠금 시 표시만 한다."""
+
+    def __init__(self, screen, on_unlock=None, on_painted=None):
         super().__init__()
         self._on_unlock = on_unlock
-        self._unlocked = False
+        self._on_painted = on_painted
+        self._disposed = False
         self.setWindowFlags(
             Qt.WindowType.WindowStaysOnTopHint
             | Qt.WindowType.FramelessWindowHint
@@ -647,15 +1652,18 @@ class KioskWindow(QMainWindow):
         )
         self.setWindowTitle("Locked")
         self._init_ui()
+        # 네이티브 창과 스타일을 미리 만들어 두어 잠금 시에는 표시만 하면 되도록
+        self.ensurePolished()
+        self.winId()
+        self.move_to(screen)
+
+    def move_to(self, screen):
+        self.windowHandle().setScreen(screen)
+        self.setGeometry(screen.geometry())
+
+    def show_locked(self):
         self.showFullScreen()
-        # Windows: 작업 표시줄 숨기기
-        if sys.platform == "win32":
-            self._set_taskbar_visible(False)
-        # 주기적으로 최상위 유지
-        self._stay_on_top_timer = QTimer()
-        self._stay_on_top_timer.setInterval(500)
-        self._stay_on_top_timer.timeout.connect(self._ensure_on_top)
-        self._stay_on_top_timer.start()
+        self.raise_()
 
     def _ensure_on_top(self):
         self.raise_()
@@ -703,52 +1711,123 @@ class KioskWindow(QMainWindow):
         self.setCentralWidget(w)
 
     def _unlock(self):
-        self._unlocked = True
-        self._stay_on_top_timer.stop()
-        if sys.platform == "win32":
-            self._set_taskbar_visible(True)
-        self.close()
         if self._on_unlock:
             self._on_unlock()
 
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self._on_painted:
+            self._on_painted()
+
     def keyPressEvent(self, event):
         event.accept()
 
+    def dispose(self):
+        """화면이 분리되었거나 앱 종료 시 실제로 닫기."""
+        self._disposed = True
+        self.close()
+        self.deleteLater()
+
     def closeEvent(self, event):
-        if self._unlocked:
+        if self._disposed:
             event.accept()
         else:
             event.ignore()
 
 
-def _acquire_single_instance():
-    """단일 인스턴스 보장. 이미 실행 중이면 sys.exit()."""
-    import tempfile
-    lock_path = os.path.join(tempfile.gettempdir(), "comtime.lock")
-    # 파일을 열어두고 잠금 — 프로세스 종료 시 OS가 자동 해제
-    lock_file = open(lock_path, "w")
-    try:
+class KioskSurfaces:
+    """화면(QScreen)마다 잠금 화면을 하나씩 미리 만들어 두고 잠금/해제 시 표시/숨김만 한다.
+
+    모니터 연결/분리를 따라가며, 잠금 중에 연결된 화면도 바로 덮는다.
+    last_lock_ms: 마지막 잠금 요청부터 잠금 화면이 처음 그려질 때까지 걸린 시간.
+    """
+
+    def __init__(self, on_unlock=None):
+        self._on_unlock = on_unlock
+        self._surfaces = {}
+        self.locked = False
+        self.last_lock_ms = None
+        self._lock_t0 = None
+        app = QApplication.instance()
+        for screen in app.screens():
+            self._add_screen(screen)
+        app.screenAdded.connect(self._add_screen)
+        app.screenRemoved.connect(self._remove_screen)
+        # 주기적으로 최상위 유지 (잠금 중에만 동작)
+        self._stay_on_top_timer = QTimer()
+        self._stay_on_top_timer.setInterval(500)
+        self._stay_on_top_timer.timeout.connect(self._ensure_on_top)
+
+    def _add_screen(self, screen):
+        if screen in self._surfaces:
+            return
+        surface = KioskWindow(screen, on_unlock=self.unlock, on_painted=self._on_painted)
+        screen.geometryChanged.connect(lambda _geo, s=surface, sc=screen: s.move_to(sc))
+        self._surfaces[screen] = surface
+        if self.locked:
+            surface.show_locked()
+
+    def _remove_screen(self, screen):
+        surface = self._surfaces.pop(screen, None)
+        if surface is not None:
+            surface.dispose()
+
+    def lock(self):
+        if self.locked:
+            return
+        self.locked = True
+        self._lock_t0 = time.perf_counter()
+        for surface in self._surfaces.values():
+            surface.show_locked()
+        # Windows: 작업 표시줄 숨기기
         if sys.platform == "win32":
-            import msvcrt
-            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
-        else:
-            import fcntl
-            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
-    except (OSError, IOError):
-        # 이미 실행 중 — 알림 후 종료
-        _app = QApplication(sys.argv)
-        QMessageBox.information(None, "ComTime", "ComTime이 이미 실행 중입니다.")
-        sys.exit(0)
-    return lock_file  # 참조를 유지해야 잠금이 풀리지 않음
+            KioskWindow._set_taskbar_visible(False)
+        self._stay_on_top_timer.start()
+
+    def unlock(self):
+        if not self.locked:
+            return
+        self.locked = False
+        self._stay_on_top_timer.stop()
+        for surface in self._surfaces.values():
+            surface.hide()
+        if sys.platform == "win32":
+            KioskWindow._set_taskbar_visible(True)
+        if self._on_unlock:
+            self._on_unlock()
+
+    def _on_painted(self):
+        if self._lock_t0 is not None:
+            self.last_lock_ms = (time.perf_counter() - self._lock_t0) * 1000
+            self._lock_t0 = None
+
+    def _ensure_on_top(self):
+        for surface in self._surfaces.values():
+            surface._ensure_on_top()
+
+    def dispose(self):
+        self._stay_on_top_timer.stop()
+        app = QApplication.instance()
+        app.screenAdded.disconnect(self._add_screen)
+        app.screenRemoved.disconnect(self._remove_screen)
+        if self.locked and sys.platform == "win32":
+            KioskWindow._set_taskbar_visible(True)
+        for surface in self._surfaces.values():
+            surface.dispose()
+        self._surfaces.clear()
 
 
 if __name__ == "__main__":
-    _lock = _acquire_single_instance()
+    startup.mark("모듈 로드")
     app = QApplication(sys.argv)
     app.setStyle("Fusion")  # Mac/Windows 동일한 스타일 렌더링
+    # 창을 트레이로 숨기거나 잠금 화면이 닫혀도 종료되지 않도록 (종료는 closeEvent에서)
+    app.setQuitOnLastWindowClosed(False)
     if os.path.exists(_ICON_PATH):
         app.setWindowIcon(QIcon(_ICON_PATH))
-    win = MainWindow()
+    startup.mark("QApplication")
+    win = MainWindow(db=_boot_db, session=_boot_session)
     win.resize(600, 550)
     win.show()
+    startup.mark("창 생성")
     sys.exit(app.exec())
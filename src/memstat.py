@@ -0,0 +1,68 @@
+"""현재 프로세스의 상주 메모리(RSS) 측정 - 플랫폼별.
+
+rss_bytes()는 바이트 단위 현재 RSS를 반환하고, 알 수 없으면 None을 반환한다.
+트레이 모드/창 모드 메모리 비교(bench_memory.py, ipc status)에 사용.
+"""
+import os
+import sys
+
+
+def _rss_linux():
+    # statm 두 번째 값: 상주 페이지 수
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def _rss_win32():
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    kernel32 = ctypes.windll.kernel32
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    psapi = ctypes.windll.psapi
+    psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.c_void_p, wintypes.DWORD]
+    if not psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+        return None
+    return counters.WorkingSetSize
+
+
+def _rss_darwin():
+    import subprocess
+    try:
+        out = subprocess.run(
+            ["ps", "-o", "rss=", "-p", str(os.getpid())],
+            capture_output=True, text=True, timeout=2,
+        ).stdout.strip()
+    except subprocess.SubprocessError:
+        return None
+    return int(out) * 1024 if out else None
+
+
+def rss_bytes():
+    try:
+        if sys.platform.startswith("linux"):
+            return _rss_linux()
+        if sys.platform == "win32":
+            return _rss_win32()
+        if sys.platform == "darwin":
+            return _rss_darwin()
+    except (OSError, ValueError, AttributeError):
+        pass
+    return None
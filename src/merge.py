@@ -0,0 +1,156 @@
+"""다른 컴퓨터의 comtime.db를 현재 DB로 병합.
+
+외부 DB를 ATTACH 한 뒤 세션/앱 사용 기록을 한 번의 INSERT ... SELECT 로 가져온다.
+가져온 행에는 "<device_id>:<원본 id>" 형태의 origin_id가 붙어서 같은 파일을
+여러 번 가져와도 중복되지 않는다 (이미 있는 행은 종료 시각/사용 시간만 갱신).
+동시에 사용한 구간의 중복 집계는 Database.get_total_seconds_for_date 에서 처리한다.
+외부 프로필은 이름이 같은 로컬 프로필로 합치고, 없으면 프로필을 새로 만든다.
+외부 DB에서 이미 일별 합계로 압축된 날(daily_totals)은 원본이 없으므로 가져오지 않는다.
+외부 DB는 읽기 전용으로 ATTACH 하고 전혀 고치지 않는다. 스냅샷 전 이벤트 로그(events)가
+남아 있으면 그 DB의 snapshot_events와 같은 규칙으로 가져오는 앱 사용 시간에만 더한다.
+앱 기록 행이 아직 없는 (세션, 앱)의 이벤트는 그 컴퓨터에서 스냅샷한 뒤 다음 병합 때 들어온다.
+"""
+import hashlib
+import os
+
+from db import DEFAULT_PROFILE, _readonly_uri
+
+_ALIAS = "merge_src"
+
+
+def _table_columns(cur, table: str) -> set:
+    cur.execute(f"PRAGMA {_ALIAS}.table_info({table})")
+    return {r[1] for r in cur.fetchall()}
+
+
+def _foreign_device_id(cur, path: str) -> str:
+    """외부 DB의 device_id. 구버전 DB(device_id 없음)는 파일 경로로 대체 ID 생성."""
+    try:
+        cur.execute(f"SELECT value FROM {_ALIAS}.settings WHERE key='device_id'")
+        row = cur.fetchone()
+        if row and row[0]:
+            return row[0]
+    except Exception:
+        pass
+    return "path-" + hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+
+
+# 외부 DB의 대기 중 이벤트를 (세션, 앱)별로 합친 값 (Database.snapshot_events와 같은 규칙)
+_PENDING_SQL = f"""
+SELECT session_id, app_name,
+       SUM(CASE kind WHEN 'app' THEN COALESCE(seconds, 0) ELSE -COALESCE(seconds, 0) END) AS seconds,
+       (SELECT MAX(x.id) FROM {_ALIAS}.app_usage x
+        WHERE x.session_id = e.session_id AND x.app_name = e.app_name) AS usage_id
+FROM {_ALIAS}.events e
+WHERE kind IN ('app', 'trim') AND session_id IS NOT NULL AND app_name IS NOT NULL
+GROUP BY session_id, app_name
+"""
+
+
+def _count_imported(cur, table: str) -> int:
+    cur.execute(f"SELECT COUNT(*) FROM {table} WHERE origin_id IS NOT NULL")
+    return cur.fetchone()[0]
+
+
+def merge_database(db, path: str) -> dict:
+    """path의 comtime.db를 db로 병합. 새로 가져온 세션/앱 기록 수와
+    이전에 가져온 뒤 바뀌어 갱신한 수(*_updated)를 dict로 반환.
+
+    진행 중(end_ts 없음)인 외부 세션은 건너뛰고, 다음 병합 때 종료된 상태로 가져온다.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    conn = db.conn
+    cur = conn.cursor()
+    conn.commit()  # ATTACH는 트랜잭션 밖에서만 가능
+    cur.execute(f"ATTACH DATABASE ? AS {_ALIAS}", (_readonly_uri(path),))
+    try:
+        local_dev = db.get_device_id()
+        foreign_dev = _foreign_device_id(cur, path)
+        if foreign_dev == local_dev:
+            raise ValueError("같은 컴퓨터의 DB는 병합할 수 없습니다.")
+
+        # 외부 DB가 다른 컴퓨터에서 가져온 행이면 원래 출처 ID를 그대로 유지
+        s_origin = ":dev || ':' || fs.id"
+        if "origin_id" in _table_columns(cur, "sessions"):
+            s_origin = f"COALESCE(fs.origin_id, {s_origin})"
+        a_origin = ":dev || ':' || fa.id"
+        if "origin_id" in _table_columns(cur, "app_usage"):
+            a_origin = f"COALESCE(fa.origin_id, {a_origin})"
+        # 이미 아카이브로 옮기거나 일별 합계로 압축한 기간은 다시 가져오지 않는다 (archive.py, retention.py)
+        cutoff = max(db.get_setting("archive_cutoff") or "", db.get_setting("retention_cutoff") or "")
+        params = {
+            "dev": foreign_dev, "own": local_dev + ":%", "cutoff": cutoff,
+            "default_profile": DEFAULT_PROFILE,
+        }
+        profile = ":default_profile"
+        if "profile_id" in _table_columns(cur, "sessions"):
+            # 외부 프로필 → 이름이 같은 로컬 프로필, 없으면 외부 ID 그대로 (아래에서 프로필 추가)
+            profile = f"""COALESCE(
+                (SELECT lp.id FROM profiles lp JOIN {_ALIAS}.profiles fp ON fp.name = lp.name
+                 WHERE fp.id = fs.profile_id ORDER BY lp.id LIMIT 1),
+                fs.profile_id)"""
+            cur.execute(
+                f"""
+                INSERT OR IGNORE INTO profiles (id, name)
+                SELECT fp.id, fp.name FROM {_ALIAS}.profiles fp
+                WHERE fp.name NOT IN (SELECT name FROM profiles)
+                """
+            )
+
+        # 스냅샷 전 이벤트는 (세션, 앱)의 마지막 앱 기록 행에 더한다 (이벤트 로그가 없는 이전 버전 DB는 0)
+        pending = "(SELECT NULL AS usage_id, 0 AS seconds)"
+        if _table_columns(cur, "events"):
+            pending = f"({_PENDING_SQL})"
+        duration = "MAX(0, COALESCE(fa.duration_seconds, 0) + COALESCE(fe.seconds, 0))"
+
+        before_sessions = _count_imported(cur, "sessions")
+        before_apps = _count_imported(cur, "app_usage")
+        # 바뀐 행만 갱신해서 rowcount가 (새 행 + 실제로 갱신한 행)이 되게 한다
+        cur.execute(
+            f"""
+            INSERT INTO sessions (start_ts, end_ts, duration_seconds, origin_id, profile_id)
+            SELECT fs.start_ts, fs.end_ts, fs.duration_seconds, {s_origin}, {profile}
+            FROM {_ALIAS}.sessions fs
+            WHERE fs.end_ts IS NOT NULL AND fs.start_ts >= :cutoff AND {s_origin} NOT LIKE :own
+            ON CONFLICT(origin_id) DO UPDATE SET
+                end_ts=excluded.end_ts,
+                duration_seconds=excluded.duration_seconds
+            WHERE end_ts IS NOT excluded.end_ts OR duration_seconds IS NOT excluded.duration_seconds
+            """,
+            params,
+        )
+        sessions_changed = cur.rowcount
+        cur.execute(
+            f"""
+            INSERT INTO app_usage (session_id, app_name, started_at, duration_seconds, origin_id, category,
+                                   profile_id)
+            SELECT ls.id, fa.app_name, fa.started_at, {duration}, {a_origin},
+                   comtime_category(fa.app_name), ls.profile_id
+            FROM {_ALIAS}.app_usage fa
+            JOIN {_ALIAS}.sessions fs ON fs.id = fa.session_id
+            JOIN sessions ls ON ls.origin_id = {s_origin}
+            LEFT JOIN {pending} fe ON fe.usage_id = fa.id
+            WHERE fs.end_ts IS NOT NULL
+            ON CONFLICT(origin_id) DO UPDATE SET
+                duration_seconds=excluded.duration_seconds
+            WHERE duration_seconds IS NOT excluded.duration_seconds
+            """,
+            params,
+        )
+        apps_changed = cur.rowcount
+        sessions = _count_imported(cur, "sessions") - before_sessions
+        apps = _count_imported(cur, "app_usage") - before_apps
+        conn.commit()
+        db.notify_changed("sessions")
+        db.notify_changed("app_usage")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.execute(f"DETACH DATABASE {_ALIAS}")
+    return {
+        "device_id": foreign_dev,
+        "sessions": sessions, "sessions_updated": sessions_changed - sessions,
+        "app_usage": apps, "app_usage_updated": apps_changed - apps,
+    }
@@ -0,0 +1,325 @@
+"""주간/월간 요약 화면: 날짜별 사용 시간 막대그래프, 달력 히트맵, 많이 사용한 프로그램.
+
+기간마다 조회는 두 번뿐이다. Database.get_daily_totals(날짜별 합계)와
+get_app_usage_for_range(프로그램별 합계)가 각각 범위 전체를 한 번에 집계한다.
+막대와 날짜 칸마다 위젯을 만들지 않고 QPainter로 직접 그리며, 한 번 조회한 기간은
+변경 피드 세대 값이 같으면 다시 조회하지 않으므로 기간을 오가도 바로 표시된다.
+"""
+from datetime import date, timedelta
+
+from PyQt6.QtCore import QRectF, Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QColor, QPainter
+from PyQt6.QtWidgets import QComboBox, QDialog, QHBoxLayout, QLabel, QPushButton, QVBoxLayout, QWidget
+
+from categories import UNCATEGORIZED
+
+WEEK, MONTH = "주간", "월간"
+WEEKDAYS = "월화수목금토일"
+TOP_APPS = 8
+
+_BAR = QColor("#2980b9")
+_BAR_TODAY = QColor("#e67e22")
+_GRID = QColor("#dddddd")
+_TEXT = QColor("#555555")
+_EMPTY = QColor("#ebedf0")
+# 히트맵 단계: 기간 중 가장 많이 쓴 날 대비 1/4, 2/4, 3/4, 그 이상
+_LEVELS = [QColor("#c6e2f5"), QColor("#7fb8e0"), QColor("#3a8cc7"), QColor("#1e5f99")]
+
+
+def period_range(kind: str, d: date):
+    """d가 속한 주(월~일) 또는 달의 (시작, 끝)."""
+    if kind == WEEK:
+        start = d - timedelta(days=d.weekday())
+        return start, start + timedelta(days=6)
+    start = d.replace(day=1)
+    return start, (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+
+def shift_period(kind: str, start: date, step: int):
+    """step만큼 앞/뒤 기간의 (시작, 끝)."""
+    if kind == WEEK:
+        return period_range(kind, start + timedelta(days=7 * step))
+    month = start.year * 12 + start.month - 1 + step
+    return period_range(kind, date(month // 12, month % 12 + 1, 1))
+
+
+def _fmt(seconds) -> str:
+    s = int(seconds)
+    return f"{s // 3600:02d}:{(s % 3600) // 60:02d}:{s % 60:02d}"
+
+
+class BarChart(QWidget):
+    """날짜별 사용 시간 막대그래프. 막대를 누르면 그 날짜로 date_clicked."""
+
+    date_clicked = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._days = []  # [(date, 초)]
+        self.setMinimumHeight(160)
+
+    def set_days(self, days):
+        self._days = days
+        self.update()
+
+    def _plot(self) -> QRectF:
+        return QRectF(self.rect()).adjusted(44, 8, -8, -20)
+
+    def paintEvent(self, event):
+        if not self._days:
+            return
+        p = QPainter(self)
+        plot = self._plot()
+        peak = max([secs for _, secs in self._days] + [3600])
+        hours = -(-peak // 3600)
+        step = max(1, hours // 4)
+        for h in range(0, hours + 1, step):
+            y = plot.bottom() - plot.height() * h / hours
+            p.setPen(_GRID)
+            p.drawLine(int(plot.left()), int(y), int(plot.right()), int(y))
+            p.setPen(_TEXT)
+            p.drawText(QRectF(0, y - 8, plot.left() - 4, 16),
+                       Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, f"{h}시간")
+        slot = plot.width() / len(self._days)
+        today = date.today()
+        for i, (d, secs) in enumerate(self._days):
+            x = plot.left() + i * slot
+            height = plot.height() * secs / (hours * 3600)
+            p.fillRect(QRectF(x + slot * 0.15, plot.bottom() - height, slot * 0.7, height),
+                       _BAR_TODAY if d == today else _BAR)
+            if len(self._days) <= 7:
+                label = f"{WEEKDAYS[d.weekday()]} {d.day}"
+            elif d.day == 1 or d.day % 5 == 0:
+                label = str(d.day)
+            else:
+                continue
+            p.setPen(_TEXT)
+            p.drawText(QRectF(x - slot, plot.bottom() + 2, slot * 3, 16), Qt.AlignmentFlag.AlignHCenter, label)
+        p.end()
+
+    def mousePressEvent(self, event):
+        plot = self._plot()
+        if self._days and plot.left() <= event.position().x() < plot.right():
+            i = int((event.position().x() - plot.left()) / (plot.width() / len(self._days)))
+            self.date_clicked.emit(self._days[min(i, len(self._days) - 1)][0])
+
+
+class CalendarHeatmap(QWidget):
+    """기간을 월~일 달력 칸으로 그리고 사용 시간에 따라 색을 칠한다. 칸을 누르면 date_clicked."""
+
+    date_clicked = pyqtSignal(object)
+    _HEADER = 18
+    _MAX_CELL = 40
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._days = []
+        self.setMinimumHeight(90)
+
+    def set_days(self, days):
+        self._days = days
+        self.setMinimumHeight(self._HEADER + 24 * self._rows())
+        self.update()
+
+    def _rows(self) -> int:
+        return (self._first_offset() + len(self._days) + 6) // 7
+
+    def _first_offset(self) -> int:
+        return self._days[0][0].weekday() if self._days else 0
+
+    def _grid(self):
+        """(칸 크기, 왼쪽 여백). 칸은 정사각형으로 가운데 정렬."""
+        size = min(self.width() / 7, (self.height() - self._HEADER) / max(self._rows(), 1), self._MAX_CELL)
+        return size, (self.width() - size * 7) / 2
+
+    def _cells(self):
+        """(칸 영역, 날짜, 초)를 차례로."""
+        offset = self._first_offset()
+        size, left = self._grid()
+        for i, (d, secs) in enumerate(self._days):
+            row, col = divmod(offset + i, 7)
+            yield QRectF(left + col * size, self._HEADER + row * size, size, size).adjusted(1, 1, -1, -1), d, secs
+
+    def paintEvent(self, event):
+        if not self._days:
+            return
+        p = QPainter(self)
+        size, left = self._grid()
+        p.setPen(_TEXT)
+        for col, name in enumerate(WEEKDAYS):
+            p.drawText(QRectF(left + col * size, 0, size, self._HEADER), Qt.AlignmentFlag.AlignCenter, name)
+        peak = max(secs for _, secs in self._days) or 1
+        today = date.today()
+        for rect, d, secs in self._cells():
+            level = min(3, int(4 * secs / peak - 1e-9)) if secs else -1
+            if d > today:
+                p.setPen(_GRID)
+                p.drawRect(rect)
+            else:
+                p.fillRect(rect, _LEVELS[level] if level >= 0 else _EMPTY)
+            p.setPen(Qt.GlobalColor.white if level >= 2 else _TEXT)
+            p.drawText(rect, Qt.AlignmentFlag.AlignCenter, str(d.day))
+        p.end()
+
+    def mousePressEvent(self, event):
+        for rect, d, _ in self._cells():
+            if rect.contains(event.position()):
+                self.date_clicked.emit(d)
+                return
+
+
+class TopApps(QWidget):
+    """기간 중 많이 사용한 프로그램: 이름, 카테고리, 상대 막대, 사용 시간."""
+
+    _ROW = 22
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._apps = []  # [(이름, 카테고리, 초)]
+        self.setMinimumHeight(self._ROW * TOP_APPS)
+
+    def set_apps(self, apps):
+        self._apps = apps
+        self.update()
+
+    def paintEvent(self, event):
+        p = QPainter(self)
+        p.setPen(_TEXT)
+        if not self._apps:
+            p.drawText(QRectF(self.rect()), Qt.AlignmentFlag.AlignCenter, "기록 없음")
+            p.end()
+            return
+        metrics = p.fontMetrics()
+        name_w = self.width() * 0.35
+        time_w = metrics.horizontalAdvance("00:00:00") + 8
+        bar_w = self.width() - name_w - time_w
+        peak = max(secs for _, _, secs in self._apps) or 1
+        for i, (name, category, secs) in enumerate(self._apps):
+            y = i * self._ROW
+            label = metrics.elidedText(f"{name} ({category})", Qt.TextElideMode.ElideRight, int(name_w) - 6)
+            p.setPen(_TEXT)
+            p.drawText(QRectF(0, y, name_w, self._ROW), Qt.AlignmentFlag.AlignVCenter, label)
+            p.fillRect(QRectF(name_w, y + 5, max(1.0, bar_w * secs / peak), self._ROW - 10), _BAR)
+            p.drawText(QRectF(self.width() - time_w, y, time_w, self._ROW),
+                       Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, _fmt(secs))
+        p.end()
+
+
+class OverviewDialog(QDialog):
+    """주간/월간 요약. 날짜를 누르면 date_selected로 알려 메인 화면에서 그날을 보여 준다."""
+
+    date_selected = pyqtSignal(object)
+
+    def __init__(self, db, anchor: date, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("주간/월간 요약")
+        self.resize(560, 620)
+        self.db = db
+        self._kind = WEEK
+        self._start, self._end = period_range(WEEK, anchor)
+        # (시작, 끝) -> (세대 값, 날짜별 합계, 프로그램별 합계)
+        self._cache = {}
+
+        layout = QVBoxLayout()
+        nav = QHBoxLayout()
+        self.kind_combo = QComboBox()
+        self.kind_combo.addItems([WEEK, MONTH])
+        self.prev_btn = QPushButton("◀")
+        self.prev_btn.setFixedWidth(40)
+        self.period_label = QLabel()
+        self.period_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.next_btn = QPushButton("▶")
+        self.next_btn.setFixedWidth(40)
+        nav.addWidget(self.kind_combo)
+        nav.addWidget(self.prev_btn)
+        nav.addWidget(self.period_label, 1)
+        nav.addWidget(self.next_btn)
+        layout.addLayout(nav)
+
+        self.total_label = QLabel()
+        self.total_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.total_label)
+        self.chart = BarChart()
+        layout.addWidget(self.chart, 2)
+        self.heatmap = CalendarHeatmap()
+        layout.addWidget(self.heatmap, 1)
+        apps_label = QLabel("많이 사용한 프로그램")
+        apps_label.setStyleSheet("font-weight: bold; margin-top: 8px;")
+        layout.addWidget(apps_label)
+        self.top_apps = TopApps()
+        layout.addWidget(self.top_apps)
+        self.setLayout(layout)
+
+        self.kind_combo.currentTextChanged.connect(self._on_kind_changed)
+        self.prev_btn.clicked.connect(lambda: self._shift(-1))
+        self.next_btn.clicked.connect(lambda: self._shift(1))
+        self.chart.date_clicked.connect(self.date_selected)
+        self.heatmap.date_clicked.connect(self.date_selected)
+
+        # 오늘이 든 기간은 진행 중인 세션 때문에 계속 늘어나므로 보이는 동안 5초마다 갱신
+        self._timer = QTimer(self)
+        self._timer.setInterval(5000)
+        self._timer.timeout.connect(self.refresh)
+        self.refresh()
+
+    def show_date(self, d: date):
+        """d가 속한 기간으로 이동 (주간/월간 선택은 유지)."""
+        self._start, self._end = period_range(self._kind, d)
+        self.refresh()
+
+    def _on_kind_changed(self, kind):
+        self._kind = kind
+        self.show_date(min(self._end, date.today()))
+
+    def _shift(self, step):
+        start, end = shift_period(self._kind, self._start, step)
+        if start <= date.today():
+            self._start, self._end = start, end
+            self.refresh()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._timer.start()
+        self.refresh()
+
+    def hideEvent(self, event):
+        self._timer.stop()
+        super().hideEvent(event)
+
+    def _load(self, start: date, end: date):
+        """기간의 [(날짜, 초)]와 [(프로그램, 카테고리, 초)]. 같은 세대 값이면 캐시에서."""
+        today = date.today()
+        last = min(end, today)
+        key = (self.db.profile_id,) + tuple(
+            self.db.generation(start + timedelta(days=i), "sessions", "app_usage")
+            for i in range((last - start).days + 1)
+        )
+        cached = self._cache.get((start, end))
+        if cached and cached[0] == key and last < today:
+            return cached[1], cached[2]
+        totals = {r["date"]: r["total_seconds"] for r in self.db.get_daily_totals(start, last)}
+        days = [
+            (start + timedelta(days=i), totals.get((start + timedelta(days=i)).isoformat(), 0))
+            for i in range((end - start).days + 1)
+        ]
+        apps = [
+            (u["app_name"], self.db.categorize(u["app_name"]) or UNCATEGORIZED, u["total_seconds"] or 0)
+            for u in self.db.get_app_usage_for_range(start, last)[:TOP_APPS]
+        ]
+        self._cache[(start, end)] = (key, days, apps)
+        return days, apps
+
+    def refresh(self):
+        today = date.today()
+        if self._kind == WEEK:
+            self.period_label.setText(f"{self._start.isoformat()} ~ {self._end.strftime('%m-%d')}")
+        else:
+            self.period_label.setText(f"{self._start.year}년 {self._start.month}월")
+        self.next_btn.setEnabled(self._end < today)
+        days, apps = self._load(self._start, self._end)
+        total = sum(secs for _, secs in days)
+        elapsed = (min(self._end, today) - self._start).days + 1
+        self.total_label.setText(f"합계 {_fmt(total)} · 하루 평균 {_fmt(total // elapsed)}")
+        self.chart.set_days(days)
+        self.heatmap.set_days(days)
+        self.top_apps.set_apps(apps)
@@ -0,0 +1,213 @@
+"""보존 기간이 지난 기록을 일별 합계로 압축하고 빈 공간을 돌려준다.
+
+보존 기간(일)이 지난 날의 종료된 세션과 app_usage 원본 행을
+daily_totals(프로필·날짜별 총 사용 시간)와 daily_app_totals(프로필·날짜·앱별 사용 시간)로
+합친 뒤 원본 행을 지운다. 조회 결과(날짜별 합계, 프로그램/카테고리별 합계)는 그대로이고
+그날의 세션 목록(시작/종료 시각)만 사라진다.
+
+한 번에 며칠치(compact_step)씩 짧은 트랜잭션으로 처리하므로 ComTime은 유휴/잠금 중에
+조금씩 호출한다. 날짜별 합계는 겹치는 세션을 한 번만 세므로 하루는 반드시 한 묶음에서
+통째로 압축한다: 묶음 경계는 자정이고, 경계에 걸친 세션(자정을 넘는 세션, 아직 열려 있거나
+보존 기간 경계를 넘는 세션)이 없도록 경계를 옮긴다.
+지운 행이 남긴 빈 페이지는 auto_vacuum=INCREMENTAL 상태에서
+PRAGMA incremental_vacuum으로 조금씩 파일에서 잘라낸다 (vacuum_step).
+auto_vacuum이 꺼진 기존 DB는 파일 전체를 다시 쓰는 VACUUM이 필요하므로 자동으로 하지 않고
+사용자가 요청할 때(설정 메뉴, 명령줄)만 한 번 전환한다 (convert_to_incremental).
+
+    python src/retention.py comtime.db --days 365
+"""
+from datetime import datetime, date, timedelta
+
+from db import _union_seconds
+
+DEFAULT_BATCH_DAYS = 7  # compact_step 한 번(트랜잭션 하나)에 처리할 날 수
+DEFAULT_VACUUM_PAGES = 256  # vacuum_step 한 번에 돌려줄 페이지 수 (4KB 페이지 기준 1MB)
+_AUTO_VACUUM_INCREMENTAL = 2
+_OPEN_END = "9999"  # 아직 열린 세션의 end_ts 대신 (어떤 시각보다도 뒤)
+
+
+def retention_cutoff(days: int, today: date = None) -> datetime:
+    """이 시각 이전에 끝난 세션이 압축 대상 (오늘 포함 days일은 원본 유지)."""
+    today = today or date.today()
+    return datetime.combine(today - timedelta(days=days - 1), datetime.min.time())
+
+
+def _midnight(d: date) -> str:
+    return datetime.combine(d, datetime.min.time()).isoformat()
+
+
+def _batch_end(cur, profile_id: str, first_day: date, batch_days: int, cutoff: str):
+    """first_day부터 압축할 묶음의 끝 (자정, cutoff 이하). 그 시각에 걸친 세션이 없도록
+    걸친 세션이 끝나는 날까지 늘리고, 늘릴 수 없으면(열린 세션, cutoff를 넘는 세션) 그 세션이
+    시작한 날로 줄인다. 압축할 수 있는 날이 없으면 None."""
+    end = min(_midnight(first_day + timedelta(days=batch_days)), cutoff)
+    shrinking = False
+    while True:
+        cur.execute(
+            "SELECT MIN(start_ts), MAX(COALESCE(end_ts, ?)) FROM sessions "
+            "WHERE profile_id = ? AND start_ts < ? AND COALESCE(end_ts, ?) > ?",
+            (_OPEN_END, profile_id, end, _OPEN_END, end),
+        )
+        lo, hi = cur.fetchone()
+        if lo is None:
+            break
+        if not shrinking and hi <= cutoff:
+            # 걸친 세션이 끝나는 날의 다음 자정까지 (cutoff는 자정이라 넘지 않는다)
+            hi_day = date.fromisoformat(hi[:10])
+            end = hi if hi == _midnight(hi_day) else _midnight(hi_day + timedelta(days=1))
+        else:
+            shrinking = True  # 한 번 줄이기 시작하면 계속 줄이기만 해서 반드시 끝난다
+            end = _midnight(date.fromisoformat(lo[:10]))
+    return end if end > _midnight(first_day) else None
+
+
+def compact_step(db, days: int, today: date = None, batch_days: int = DEFAULT_BATCH_DAYS) -> int:
+    """압축할 기록이 남은 첫 프로필의 가장 오래된 batch_days일(경계에 걸친 세션이 있으면 조정)을
+    압축. 압축한 세션 수를 반환 (0이면 끝)."""
+    if days <= 0:
+        return 0
+    cutoff = retention_cutoff(days, today).isoformat()
+    cur = db.conn.cursor()
+    for profile in db.get_profiles():
+        profile_id = profile["id"]
+        cur.execute(
+            "SELECT MIN(start_ts) FROM sessions "
+            "WHERE profile_id = ? AND start_ts < ? AND end_ts IS NOT NULL AND end_ts <= ?",
+            (profile_id, cutoff, cutoff),
+        )
+        first = cur.fetchone()[0]
+        if first is None:
+            continue
+        batch_end = _batch_end(cur, profile_id, date.fromisoformat(first[:10]), batch_days, cutoff)
+        if batch_end is None:
+            continue
+        # 이전 묶음도 같은 규칙으로 끝났으므로 batch_end 이전에 시작한 세션은 모두 이 묶음의 날에 속한다
+        bounds = (profile_id, batch_end)
+        ids = "SELECT id FROM sessions WHERE profile_id = ? AND start_ts < ? AND end_ts IS NOT NULL"
+        count = _compact(db, cur, profile_id, ids, bounds)
+        mark_cutoff(db, days, today)
+        return count
+    return 0
+
+
+def _compact(db, cur, profile_id, ids, bounds) -> int:
+    cur.execute(f"SELECT start_ts, end_ts FROM sessions WHERE id IN ({ids})", bounds)
+    per_day = {}
+    count = 0
+    for row in cur.fetchall():
+        count += 1
+        try:
+            s = datetime.fromisoformat(row["start_ts"])
+            e = datetime.fromisoformat(row["end_ts"])
+        except (TypeError, ValueError):
+            continue
+        # 자정을 넘는 세션은 날짜별로 나눈다 (get_daily_totals와 같은 방식)
+        while s < e:
+            seg_end = min(e, datetime.combine(s.date() + timedelta(days=1), datetime.min.time()))
+            per_day.setdefault(s.date(), []).append((s, seg_end))
+            s = seg_end
+    try:
+        cur.executemany(
+            """
+            INSERT INTO daily_totals (profile_id, day, total_seconds) VALUES (?,?,?)
+            ON CONFLICT(profile_id, day) DO UPDATE SET total_seconds = total_seconds + excluded.total_seconds
+            """,
+            [(profile_id, d.isoformat(), _union_seconds(iv)) for d, iv in per_day.items()],
+        )
+        cur.execute(
+            f"""
+            INSERT INTO daily_app_totals (profile_id, day, app_name, category, total_seconds)
+            SELECT s.profile_id, substr(s.start_ts, 1, 10), au.app_name, au.category,
+                   SUM(COALESCE(au.duration_seconds, 0))
+            FROM app_usage au
+            JOIN sessions s ON au.session_id = s.id
+            WHERE s.id IN ({ids})
+            GROUP BY s.profile_id, substr(s.start_ts, 1, 10), au.app_name
+            ON CONFLICT(profile_id, day, app_name) DO UPDATE SET
+                total_seconds = total_seconds + excluded.total_seconds
+            """,
+            bounds,
+        )
+        cur.execute(f"DELETE FROM app_usage WHERE session_id IN ({ids})", bounds)
+        cur.execute(f"DELETE FROM sessions WHERE id IN ({ids})", bounds)
+        db.conn.commit()
+    except Exception:
+        db.conn.rollback()
+        raise
+    db.notify_changed("sessions")
+    db.notify_changed("app_usage")
+    return count
+
+
+def needs_conversion(db) -> bool:
+    """auto_vacuum=INCREMENTAL 이전에 만든 DB라 vacuum_step이 공간을 돌려줄 수 없는지."""
+    return db.conn.execute("PRAGMA auto_vacuum").fetchone()[0] != _AUTO_VACUUM_INCREMENTAL
+
+
+def convert_to_incremental(db) -> int:
+    """기존 DB를 auto_vacuum=INCREMENTAL로 전환 (모드 변경은 VACUUM 때 적용된다).
+    파일 전체를 다시 쓰므로 사용자가 요청할 때만 부른다. 돌려준 빈 페이지 수를 반환."""
+    conn = db.conn
+    free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    conn.commit()
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM")
+    return free
+
+
+def vacuum_step(db, pages: int = DEFAULT_VACUUM_PAGES) -> int:
+    """빈 페이지를 최대 pages개 파일에서 잘라낸다. 돌려준 페이지 수를 반환 (0이면 끝).
+    전환 전 DB(needs_conversion)는 아무것도 하지 않는다."""
+    conn = db.conn
+    free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    if free == 0 or needs_conversion(db):
+        return 0
+    # incremental_vacuum은 결과 행을 끝까지 읽어야 지정한 만큼 진행된다
+    conn.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+    conn.commit()
+    return min(free, pages)
+
+
+def apply_retention(db, days: int, today: date = None, batch_days: int = DEFAULT_BATCH_DAYS,
+                    vacuum_pages: int = DEFAULT_VACUUM_PAGES) -> dict:
+    """압축과 공간 회수를 끝까지 실행 (명령줄용). ComTime 앱은 step 함수를 유휴 중에 나눠 호출한다."""
+    sessions = 0
+    while True:
+        n = compact_step(db, days, today, batch_days)
+        if not n:
+            break
+        sessions += n
+    pages = convert_to_incremental(db) if needs_conversion(db) else 0
+    while True:
+        n = vacuum_step(db, vacuum_pages)
+        if not n:
+            break
+        pages += n
+    return {"sessions": sessions, "pages": pages}
+
+
+def mark_cutoff(db, days: int, today: date = None):
+    """병합(merge.py)이 이미 압축된 기간의 원본을 다시 가져오지 않도록 경계 기록."""
+    cutoff = retention_cutoff(days, today).date().isoformat()
+    prev = db.get_setting("retention_cutoff")
+    if not prev or prev < cutoff:
+        db.set_setting("retention_cutoff", cutoff)
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import sys
+    from db import Database
+
+    parser = argparse.ArgumentParser(description="보존 기간이 지난 ComTime 기록을 일별 합계로 압축")
+    parser.add_argument("db", help="comtime.db 경로")
+    parser.add_argument("--days", type=int, default=365, help="원본 기록을 남길 일 수 (기본 365)")
+    args = parser.parse_args()
+    if args.days <= 0:
+        parser.error("--days는 1 이상이어야 합니다")
+    before = os.path.getsize(args.db)
+    result = apply_retention(Database(args.db), args.days)
+    after = os.path.getsize(args.db)
+    print(f"압축한 세션: {result['sessions']}개, 파일 크기: {before:,} → {after:,} 바이트")
+    sys.exit(0)
@@ -0,0 +1,418 @@
+"""세션 상태 머신 시뮬레이션 (가상 시계 + 가상 QTimer).
+
+잠금 유예(60초), 자정 분할, 하트비트 복구, 5초 앱 샘플링을 실제 시간을 기다리지 않고
+재현한다. 실제 MainWindow와 Database를 오프스크린 Qt에서 그대로 사용하고,
+시간(datetime/date)과 QTimer, 포그라운드 앱/유휴 소스만 가상 구현으로 바꾼다.
+
+    QT_QPA_PLATFORM=offscreen python src/simulate.py --days 7
+    QT_QPA_PLATFORM=offscreen python src/simulate.py --days 7 --json
+
+결과로 날짜별 총 사용 시간, 프로그램별 사용 시간, 시뮬레이션 시각 기준 시간대별
+DB 쓰기 횟수를 보고한다. 1초 화면 갱신 타이머는 기본적으로 60초로 늘려 실행한다
+(--ui-interval 1 로 실제와 같게 실행 가능, 대신 느려짐).
+"""
+import heapq
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, date, timedelta
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+class VirtualClock:
+    def __init__(self, start: datetime):
+        self.now = start
+
+
+def _make_time_classes(clock):
+    class SimDateTime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return clock.now
+
+    class SimDate(date):
+        @classmethod
+        def today(cls):
+            return clock.now.date()
+
+    return SimDateTime, SimDate
+
+
+class _Signal:
+    def __init__(self):
+        self._slots = []
+
+    def connect(self, slot):
+        self._slots.append(slot)
+
+    def emit(self):
+        for slot in list(self._slots):
+            slot()
+
+
+class VirtualScheduler:
+    """가상 시계 위에서 VirtualTimer들을 due 순서대로 실행."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self._queue = []  # (due, seq, timer, generation)
+        self._seq = 0
+        self.interval_overrides = {}  # 실제 interval(ms) -> 시뮬레이션 interval(ms)
+
+    def schedule(self, timer, due):
+        self._seq += 1
+        heapq.heappush(self._queue, (due, self._seq, timer, timer._generation))
+
+    def run_until(self, until: datetime):
+        while self._queue and self._queue[0][0] <= until:
+            due, _, timer, gen = heapq.heappop(self._queue)
+            if not timer._active or gen != timer._generation:
+                continue
+            self.clock.now = due
+            if timer._single_shot:
+                timer._active = False
+            else:
+                self.schedule(timer, due + timedelta(milliseconds=timer._effective_interval()))
+            timer.timeout.emit()
+        self.clock.now = max(self.clock.now, until)
+
+    def suspend_until(self, until: datetime):
+        """절전: 타이머를 실행하지 않고 시계만 이동. 밀린 타이머는 깨어난 시각에 한 번만 실행."""
+        pending = self._queue
+        self._queue = []
+        for due, seq, timer, gen in pending:
+            heapq.heappush(self._queue, (max(due, until), seq, timer, gen))
+        self.clock.now = until
+
+
+def _make_timer_class(scheduler):
+    class VirtualTimer:
+        def __init__(self, parent=None):
+            self.timeout = _Signal()
+            self._interval = 0
+            self._single_shot = False
+            self._active = False
+            self._generation = 0
+
+        def setInterval(self, ms):
+            self._interval = ms
+
+        def interval(self):
+            return self._interval
+
+        def setSingleShot(self, single):
+            self._single_shot = single
+
+        def isActive(self):
+            return self._active
+
+        def _effective_interval(self):
+            return scheduler.interval_overrides.get(self._interval, self._interval)
+
+        def start(self, ms=None):
+            if ms is not None:
+                self._interval = ms
+            self._generation += 1
+            self._active = True
+            scheduler.schedule(self, scheduler.clock.now + timedelta(milliseconds=self._effective_interval()))
+
+        def stop(self):
+            self._active = False
+            self._generation += 1
+
+        @staticmethod
+        def singleShot(ms, callback):
+            t = VirtualTimer()
+            t.setSingleShot(True)
+            t.timeout.connect(callback)
+            t.start(ms)
+
+    return VirtualTimer
+
+
+class ScriptedForeground:
+    """시나리오가 지정한 앱 이름을 반환하는 포그라운드 앱 소스."""
+
+    def __init__(self):
+        self.app = None
+
+    def __call__(self):
+        return self.app
+
+
+class WriteCounter:
+    """sqlite trace callback으로 INSERT/UPDATE/DELETE 횟수를 시뮬레이션 시간대별로 집계."""
+
+    _WRITE_PREFIXES = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.per_hour = {}
+
+    def attach(self, conn):
+        conn.set_trace_callback(self._trace)
+
+    def _trace(self, sql):
+        if sql.lstrip().upper().startswith(self._WRITE_PREFIXES):
+            hour = self.clock.now.replace(minute=0, second=0, microsecond=0)
+            self.per_hour[hour] = self.per_hour.get(hour, 0) + 1
+
+
+def default_week(start: date, days: int = 7, seed: int = 0):
+    """기본 시나리오: 매일 오후 사용, 짧은 잠금(유예), 긴 잠금, 자리 비움, 밤새 절전.
+    하루는 자정을 넘겨 사용하고, 하루는 강제 종료 후 재실행한다.
+
+    (시각, 이벤트, 인자) 리스트. 이벤트: launch, crash, lock, unlock, app, away, back, sleep, end
+    """
+    rng = random.Random(seed)
+    apps = ["Chrome", "Minecraft", "YouTube", "Word", "KakaoTalk", "Roblox"]
+    events = []
+    for i in range(days):
+        day = datetime.combine(start + timedelta(days=i), datetime.min.time())
+        t = day + timedelta(hours=15, minutes=rng.randint(0, 59))
+        events.append((t, "launch" if i == 0 else "wake", None))
+        end = day + timedelta(hours=21, minutes=rng.randint(0, 59))
+        if i == 2:
+            end = day + timedelta(days=1, hours=0, minutes=40)  # 자정 넘김
+        next_lock = t + timedelta(minutes=rng.randint(40, 90))
+        while t < end:
+            events.append((t, "app", rng.choice(apps)))
+            t += timedelta(minutes=rng.randint(3, 25))
+            if t >= end:
+                break
+            if t >= next_lock:
+                # 절반은 1분 유예 안의 짧은 잠금
+                pause = timedelta(seconds=30) if rng.random() < 0.5 else timedelta(minutes=rng.randint(5, 30))
+                if t + pause < end:
+                    events.append((t, "lock", None))
+                    t += pause
+                    events.append((t, "unlock", None))
+                next_lock = t + timedelta(minutes=rng.randint(40, 90))
+            elif rng.random() < 0.1:
+                away = timedelta(minutes=rng.randint(6, 20))
+                if t + away < end:
+                    events.append((t, "away", None))
+                    t += away
+                    events.append((t, "back", None))
+        if i == 4:
+            events.append((end, "crash", None))
+            events.append((end + timedelta(minutes=10), "launch", None))
+            end += timedelta(minutes=10, seconds=30)
+        events.append((end, "lock", None))
+        if i == days - 1:
+            # 마지막 날은 잠금 유예가 끝난 뒤 종료 (다음 날 깨어나는 시각까지 가지 않음)
+            events.append((end + timedelta(minutes=5), "end", None))
+            break
+        wake_next = datetime.combine(day.date() + timedelta(days=1), datetime.min.time()) + timedelta(hours=15)
+        events.append((end + timedelta(minutes=5), "sleep", wake_next))
+    return events
+
+
+class Simulation:
+    def __init__(self, events, ui_interval_ms=60000, db_path=None):
+        import main
+        import db as db_module
+        from idle import FakeIdleSource
+
+        self.events = sorted(events, key=lambda e: e[0])
+        self.clock = VirtualClock(self.events[0][0])
+        self.scheduler = VirtualScheduler(self.clock)
+        if ui_interval_ms != 1000:
+            self.scheduler.interval_overrides[1000] = ui_interval_ms
+        self.foreground = ScriptedForeground()
+        self.idle = FakeIdleSource()
+        self.writes = WriteCounter(self.clock)
+        self._away_since = None
+        self._main = main
+        self._db_module = db_module
+        self._tmpdir = None
+        if db_path is None:
+            self._tmpdir = tempfile.TemporaryDirectory()
+            db_path = os.path.join(self._tmpdir.name, "comtime.db")
+        self.db_path = db_path
+        self.win = None
+        self._patches = []
+
+    # ── 패치 ──
+
+    def _patch(self, obj, name, value):
+        self._patches.append((obj, name, getattr(obj, name)))
+        setattr(obj, name, value)
+
+    def _install(self):
+        import ipc
+        import startup
+        sim_datetime, sim_date = _make_time_classes(self.clock)
+        main = self._main
+        self._patch(main, "datetime", sim_datetime)
+        self._patch(main, "date", sim_date)
+        self._patch(self._db_module, "datetime", sim_datetime)
+        self._patch(startup, "datetime", sim_datetime)
+        self._patch(main, "QTimer", _make_timer_class(self.scheduler))
+        self._patch(main, "get_foreground_app", self.foreground)
+        self._patch(main, "get_foreground_title", lambda: None)
+        self._patch(main, "_DB_PATH", self.db_path)
+        sock = os.path.join(tempfile.gettempdir(), f"comtime-sim-{os.getpid()}")
+        self._patch(ipc, "server_name", lambda *args: sock)
+
+    def _uninstall(self):
+        while self._patches:
+            obj, name, value = self._patches.pop()
+            setattr(obj, name, value)
+
+    # ── 이벤트 ──
+
+    def _launch(self):
+        main = self._main
+        pre = main.Database(self.db_path)
+        if pre.get_setting("pin_sha256") is None:
+            pre.set_pin("0000")
+        if pre.get_setting("backup_interval_hours") is None:
+            pre.set_setting("backup_interval_hours", "0")  # 백업 스레드는 상태 머신과 무관
+        pre.conn.close()
+        self.win = main.MainWindow()
+        self.win._idle_source = self.idle
+        self.win._finish_startup()  # 창을 그리지 않으므로 첫 화면 표시 후 작업을 바로 실행
+        self.writes.attach(self.win.db.conn)
+
+    def _crash(self):
+        """closeEvent 없이 창을 버림 (강제 종료). 타이머도 더 이상 실행되지 않음."""
+        win = self.win
+        timer_class = self._main.QTimer
+        for t in list(vars(win).values()):
+            if isinstance(t, timer_class):
+                t.stop()
+        win.kiosk.dispose()
+        win._control_server.close()
+        win.db.conn.close()
+        win.deleteLater()
+        self.win = None
+
+    def _apply(self, kind, arg):
+        win = self.win
+        if kind == "launch":
+            self._launch()
+        elif kind == "crash":
+            self._crash()
+        elif kind == "lock":
+            win.on_stop()
+        elif kind in ("unlock", "wake"):
+            if not win.running:
+                win.kiosk.unlock()
+        elif kind == "app":
+            self.foreground.app = arg
+            self._away_since = None
+        elif kind == "away":
+            self._away_since = self.clock.now
+        elif kind == "back":
+            self._away_since = None
+        elif kind == "sleep":
+            self.scheduler.suspend_until(arg)
+
+    def _update_idle(self):
+        self.idle.idle = (
+            (self.clock.now - self._away_since).total_seconds() if self._away_since else 0.0
+        )
+
+    def run(self) -> dict:
+        from PyQt6.QtCore import qInstallMessageHandler
+        from PyQt6.QtWidgets import QApplication
+        app = QApplication.instance() or QApplication([])
+        # 오프스크린 플러그인의 "does not support raise()" 등 경고 숨김
+        prev_handler = qInstallMessageHandler(lambda *_args: None)
+        self._install()
+        wall_start = time.perf_counter()
+        try:
+            for when, kind, arg in self.events:
+                # 이벤트 사이의 타이머 실행 (유휴 값은 1분 단위로 갱신)
+                while self.clock.now < when:
+                    step = min(when, self.clock.now + timedelta(minutes=1))
+                    self._update_idle()
+                    self.scheduler.run_until(step)
+                self.clock.now = max(self.clock.now, when)
+                if kind == "end":
+                    break
+                self._apply(kind, arg)
+                app.processEvents()
+            report = self._report(time.perf_counter() - wall_start)
+        finally:
+            if self.win:
+                self._crash()
+            self._uninstall()
+            qInstallMessageHandler(prev_handler)
+        return report
+
+    def _report(self, wall_seconds) -> dict:
+        from db import Database
+        db = Database(self.db_path, readonly=True)
+        first = self.events[0][0].date()
+        last = self.events[-1][0].date()
+        if self.events[-1][0] == datetime.combine(last, datetime.min.time()) and last > first:
+            last -= timedelta(days=1)  # 자정에 끝난 시나리오는 그 날을 포함하지 않음
+        per_hour = self.writes.per_hour
+        active = [n for n in per_hour.values() if n]
+        report = {
+            "simulated_days": (last - first).days + 1,
+            "wall_seconds": round(wall_seconds, 3),
+            "daily_totals": self._with_sim_now(db.get_daily_totals, first, last),
+            "apps": self._with_sim_now(db.get_app_usage_for_range, first, last),
+            "sessions": db.conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0],
+            "writes_total": sum(per_hour.values()),
+            "writes_max_per_hour": max(active) if active else 0,
+            "writes_mean_per_active_hour": round(sum(active) / len(active), 1) if active else 0,
+            "writes_per_hour": {k.isoformat(timespec="minutes"): v for k, v in sorted(per_hour.items())},
+        }
+        db.conn.close()
+        return report
+
+    def _with_sim_now(self, fn, *args):
+        """진행 중 세션 계산이 실제 시각이 아닌 시뮬레이션 종료 시각을 쓰도록."""
+        sim_datetime, _ = _make_time_classes(self.clock)
+        saved = self._db_module.datetime
+        self._db_module.datetime = sim_datetime
+        try:
+            return fn(*args)
+        finally:
+            self._db_module.datetime = saved
+
+
+def _fmt(seconds):
+    return f"{seconds // 3600:02d}:{(seconds % 3600) // 60:02d}:{seconds % 60:02d}"
+
+
+def main_cli(argv=None):
+    import argparse
+    import json
+    parser = argparse.ArgumentParser(description="ComTime 세션 상태 머신 시뮬레이션")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--start", help="시작 날짜 YYYY-MM-DD (기본: 2주 전 월요일)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ui-interval", type=float, default=60.0, help="화면 갱신 타이머 간격(초)")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+    if args.start:
+        start = date.fromisoformat(args.start)
+    else:
+        today = date.today()
+        start = today - timedelta(days=today.weekday() + 14)
+    sim = Simulation(default_week(start, args.days, args.seed), int(args.ui_interval * 1000))
+    report = sim.run()
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return 0
+    print(f"{report['simulated_days']}일 시뮬레이션: {report['wall_seconds']}초 소요, 세션 {report['sessions']}개")
+    for d in report["daily_totals"]:
+        print(f"  {d['date']}  {_fmt(d['total_seconds'])}")
+    print("프로그램별:")
+    for a in report["apps"]:
+        print(f"  {a['app_name']:<12} {_fmt(a['total_seconds'] or 0)}")
+    print(f"DB 쓰기: 총 {report['writes_total']}회, 시간당 최대 {report['writes_max_per_hour']}회, "
+          f"활성 시간당 평균 {report['writes_mean_per_active_hour']}회")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
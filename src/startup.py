@@ -0,0 +1,232 @@
+"""빠른 시작: PyQt6를 불러오기 전에 세션을 기록하고, 시작 단계별 시간을 잰다.
+
+부팅 직후 자동 시작되면 느린 컴퓨터에서는 PyQt6 로딩과 창 생성에 수백 ms가 걸린다.
+main.py는 중복 실행을 확인한 뒤 boot_session으로 세션(또는 복구한 세션)을 먼저 기록하고,
+그 다음에 PyQt6를 불러와 창을 만든다. 이력 조회, 트레이, 잠금 화면, 유휴 감지,
+원격 조회 서버는 창이 처음 그려진 뒤 준비한다 (MainWindow._finish_startup).
+
+--startup-timing 옵션(또는 COMTIME_STARTUP_TIMING=1)으로 실행하면 단계별 경과 시간과
+모듈별 import 시간(-X importtime 형식, 자체/누적 µs)을 stderr에 출력한다.
+이 모듈은 표준 라이브러리만 쓴다.
+"""
+import builtins
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+_SHUTDOWN_GAP = 120  # 마지막 하트비트 후 2분 넘게 지났으면 꺼져 있었던 것으로 판단
+_TIMING_FLAG = "--startup-timing"
+_IMPORT_REPORT_MIN_US = 1000  # 이보다 짧은 import는 보고서에서 생략
+
+
+def current_os_user() -> str:
+    try:
+        import getpass
+        return getpass.getuser()
+    except Exception:
+        return ""
+
+
+def _user_name(uid: int) -> str:
+    import pwd
+    return pwd.getpwuid(uid).pw_name
+
+
+def _windows_console_user() -> str:
+    import ctypes
+    from ctypes import wintypes
+    wts = ctypes.windll.wtsapi32
+    session = ctypes.windll.kernel32.WTSGetActiveConsoleSessionId()
+    if session == 0xFFFFFFFF:
+        return ""  # 콘솔에 연결된 세션 없음 (전환 중)
+    buf = wintypes.LPWSTR()
+    size = wintypes.DWORD()
+    # WTS_CURRENT_SERVER_HANDLE=0, WTSUserName=5
+    if not wts.WTSQuerySessionInformationW(None, session, 5, ctypes.byref(buf), ctypes.byref(size)):
+        return ""
+    try:
+        return buf.value or ""
+    finally:
+        wts.WTSFreeMemory(buf)
+
+
+def active_os_user() -> str:
+    """지금 화면(콘솔)을 쓰고 있는 OS 계정. 빠른 사용자 전환 때 추적기 프로세스의 계정과 다를 수 있다.
+    알 수 없으면 이 프로세스의 계정, 전환 중이라 아무도 없으면 ""."""
+    try:
+        if sys.platform == "win32":
+            return _windows_console_user()
+        if sys.platform == "darwin":
+            return _user_name(os.stat("/dev/console").st_uid)
+        # systemd-logind: 첫 번째 좌석의 활성 사용자
+        with open("/run/systemd/seats/seat0", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("ACTIVE_UID="):
+                    return _user_name(int(line.split("=", 1)[1]))
+        return ""
+    except (OSError, ValueError, KeyError, AttributeError, ImportError):
+        return current_os_user()
+
+
+# ── 세션 복구/시작 (PyQt6 불필요) ──
+
+def close_stale_profile_sessions(db, profile_id):
+    """다른 프로필로 쓰다가 비정상 종료된 세션을 그 프로필의 마지막 하트비트에 종료.
+    하트비트가 _SHUTDOWN_GAP 안이면 아직 살아 있는 세션이므로 그대로 둔다."""
+    last_hb = db.last_heartbeat(profile_id)
+    try:
+        end_at = datetime.fromisoformat(last_hb) if last_hb else datetime.min
+    except ValueError:
+        end_at = datetime.min
+    if (datetime.now() - end_at).total_seconds() <= _SHUTDOWN_GAP:
+        return
+    db.end_open_sessions(end_at, [profile_id])
+
+
+def end_if_shut_down(db, session_id, session_start: datetime) -> bool:
+    """비정상 종료 여부를 하트비트로 감지.
+    마지막 하트비트와 현재 시각의 차이가 2분을 초과하면 컴퓨터가 꺼져 있었던 것으로 판단하고
+    세션을 하트비트 시각(세션 시작보다 이르면 시작 시각)에 종료. 종료했으면 True."""
+    last_hb_str = db.last_heartbeat()
+    end_at = None
+    if last_hb_str:
+        try:
+            last_hb = datetime.fromisoformat(last_hb_str)
+            if (datetime.now() - last_hb).total_seconds() > _SHUTDOWN_GAP:
+                end_at = max(last_hb, session_start)
+        except Exception:
+            end_at = session_start
+    else:
+        # 하트비트 기록 없음 → 이전 버전에서 업그레이드된 경우 등, 비정상으로 간주
+        end_at = session_start
+    if end_at is None:
+        return False
+    db.end_session(session_id, end_at.isoformat())
+    return True
+
+
+def split_at_midnight(db, session_id, session_start: datetime, now: datetime):
+    """열린 세션이 자정을 넘긴 경우 날짜 경계(00:00)마다 끊고 새 세션으로 이어 간다.
+    (마지막 세션 ID, 그 시작 시각)을 반환."""
+    next_midnight = datetime.combine(session_start.date() + timedelta(days=1), datetime.min.time())
+    while next_midnight <= now:
+        db.end_session(session_id, next_midnight.isoformat())
+        session_id = db.start_session(next_midnight.isoformat())
+        session_start = next_midnight
+        next_midnight += timedelta(days=1)
+    return session_id, session_start
+
+
+def boot_session(db, os_user: str):
+    """시작 직후 세션 기록: 지난 실행의 이벤트 로그 반영, OS 계정의 프로필 선택,
+    열린 세션 복구(없거나 꺼져 있었으면 새 세션), 하트비트 기록까지. (세션 ID, 시작 시각)을 반환."""
+    # 마지막 스냅샷 이후 이벤트만 다시 적용 (앱 샘플, 마지막 생존 시각)
+    db.snapshot_events()
+    profile_id = db.profile_for_os_user(os_user)
+    if profile_id:
+        db.set_profile(profile_id)
+    for p in db.get_profiles():
+        if p["id"] != db.profile_id:
+            close_stale_profile_sessions(db, p["id"])
+
+    session_id = session_start = None
+    open_s = db.get_open_session()
+    if open_s:
+        try:
+            session_id, session_start = open_s["id"], datetime.fromisoformat(open_s["start_ts"])
+        except (TypeError, ValueError):
+            session_id = None
+    if session_id and end_if_shut_down(db, session_id, session_start):
+        session_id = None
+    now = datetime.now()
+    if session_id:
+        session_id, session_start = split_at_midnight(db, session_id, session_start, now)
+    else:
+        session_start = now
+        session_id = db.start_session(now.isoformat())
+    db.heartbeat(now)
+    return session_id, session_start
+
+
+# ── 시작 단계 시간 측정 ──
+
+class _ImportTimer:
+    """builtins.__import__를 감싸 처음 import되는 모듈마다 자체/누적 시간을 기록 (-X importtime과 같은 형식)."""
+
+    def __init__(self):
+        self.rows = []  # (깊이, 모듈, 자체 µs, 누적 µs) - import가 끝난 순서
+        self._children = [0.0]
+        self._original = builtins.__import__
+        builtins.__import__ = self._import
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self._original(name, globals, locals, fromlist, level)
+        self._children.append(0.0)
+        t0 = time.perf_counter()
+        try:
+            return self._original(name, globals, locals, fromlist, level)
+        finally:
+            total = time.perf_counter() - t0
+            children = self._children.pop()
+            self._children[-1] += total
+            self.rows.append((len(self._children) - 1, name, (total - children) * 1e6, total * 1e6))
+
+    def stop(self):
+        if builtins.__import__ is self._import:
+            builtins.__import__ = self._original
+
+
+class StartupTimer:
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.phases = []
+        self._t0 = self._last = time.perf_counter()
+        self._imports = _ImportTimer() if enabled else None
+        self._reported = False
+
+    def mark(self, phase: str):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self._last) * 1000, (now - self._t0) * 1000))
+        self._last = now
+
+    def report(self, file=None):
+        if not self.enabled or self._reported:
+            return
+        self._reported = True
+        file = file or sys.stderr
+        if self._imports:
+            self._imports.stop()
+            print("import time: self [us] | cumulative | imported package", file=file)
+            for depth, name, own, cumulative in self._imports.rows:
+                if cumulative >= _IMPORT_REPORT_MIN_US:
+                    print(f"import time: {own:9.0f} | {cumulative:10.0f} | {'  ' * depth}{name}", file=file)
+        print("ComTime 시작 단계:   단계 ms |   누적 ms | 단계", file=file)
+        for phase, elapsed, total in self.phases:
+            print(f"ComTime 시작 단계: {elapsed:9.1f} | {total:9.1f} | {phase}", file=file)
+        file.flush()
+
+
+timer = StartupTimer(False)
+
+
+def init_timing(argv) -> StartupTimer:
+    """argv에 --startup-timing이 있거나 COMTIME_STARTUP_TIMING=1이면 측정 시작 (옵션은 argv에서 제거)."""
+    global timer
+    enabled = os.environ.get("COMTIME_STARTUP_TIMING") == "1"
+    if _TIMING_FLAG in argv:
+        argv.remove(_TIMING_FLAG)
+        enabled = True
+    timer = StartupTimer(enabled)
+    return timer
+
+
+def mark(phase: str):
+    timer.mark(phase)
+
+
+def report():
+    timer.report()
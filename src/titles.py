@@ -0,0 +1,80 @@
+"""창 제목(사이트/문서)별 사용 시간 - 메모리 고정형 top-K 추적.
+
+브라우저 탭 제목처럼 종류가 끝없이 늘어나는 값을 전부 저장하지 않고,
+앱/날짜마다 Space-Saving 스케치(카운터 K개)로 자주 쓰인 제목만 남긴다.
+각 항목의 실제 사용 시간은 [seconds - error, seconds] 범위 안에 있다.
+"""
+from datetime import date
+
+DEFAULT_K = 20
+_MAX_TITLE_LEN = 200
+
+
+class SpaceSaving:
+    """Space-Saving top-K 스케치. counters: 제목 -> [추정 초, 오차 상한]."""
+
+    def __init__(self, k: int = DEFAULT_K):
+        self.k = k
+        self.counters = {}
+
+    def add(self, key: str, weight: int):
+        c = self.counters.get(key)
+        if c is not None:
+            c[0] += weight
+        elif len(self.counters) < self.k:
+            self.counters[key] = [weight, 0]
+        else:
+            # 가장 작은 카운터를 새 항목으로 교체, 그 값을 오차로 기록
+            victim = min(self.counters, key=lambda t: self.counters[t][0])
+            floor = self.counters.pop(victim)[0]
+            self.counters[key] = [floor + weight, floor]
+
+    def top(self):
+        """[(제목, 추정 초, 오차)] 사용 시간 내림차순."""
+        return sorted(
+            ((t, c[0], c[1]) for t, c in self.counters.items()),
+            key=lambda r: r[1], reverse=True,
+        )
+
+
+class TitleTracker:
+    """한 프로필의 오늘 날짜 앱별 스케치를 유지하고 주기적으로 DB에 저장.
+    만들 때의 프로필에 고정되므로 프로필을 바꾸면 새로 만든다 (그 전에 flush)."""
+
+    def __init__(self, db, k: int = DEFAULT_K):
+        self.db = db
+        self.k = k
+        self.profile_id = db.profile_id
+        self._day = None
+        self._sketches = {}
+        self._dirty = set()
+
+    def _switch_day(self, day: date):
+        if self._day == day:
+            return
+        self.flush()
+        self._day = day
+        self._sketches = {}
+        # 재시작 시 오늘 저장된 스케치를 이어서 사용
+        for row in self.db.get_app_titles_for_date(day, profile_id=self.profile_id):
+            sk = self._sketches.setdefault(row["app_name"], SpaceSaving(self.k))
+            if len(sk.counters) < self.k:
+                sk.counters[row["title"]] = [row["seconds"], row["error"]]
+
+    def record(self, app_name: str, title: str, seconds: int, day: date = None):
+        title = " ".join(title.split())[:_MAX_TITLE_LEN]
+        if not title:
+            return
+        self._switch_day(day or date.today())
+        sk = self._sketches.get(app_name)
+        if sk is None:
+            sk = self._sketches[app_name] = SpaceSaving(self.k)
+        sk.add(title, seconds)
+        self._dirty.add(app_name)
+
+    def flush(self):
+        if not self._dirty or self._day is None:
+            return
+        for app_name in self._dirty:
+            self.db.replace_app_titles(self._day, app_name, self._sketches[app_name].top(), self.profile_id)
+        self._dirty.clear()